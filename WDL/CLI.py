@@ -87,6 +87,8 @@ def main(args=None):
             zip_wdl(**vars(args))
         elif args.command in ("input_template", "input-template"):
             input_template(**vars(args))
+        elif args.command == "cache":
+            cache_admin(**vars(args))
         else:
             assert False
     except (
@@ -129,6 +131,7 @@ def create_arg_parser():
     fill_common(fill_zip_subparser(subparsers))
     fill_common(fill_localize_subparser(subparsers))
     fill_common(fill_eval_subparser(subparsers))
+    fill_cache_subparser(subparsers)
     return parser
 
 
@@ -246,6 +249,7 @@ def check(
         Lint._shellcheck_available = False
 
     shown = [0]
+    load_cache_opts = load_cache_options()
     for uri1 in uri or []:
         try:
             doc = load(
@@ -253,6 +257,7 @@ def check(
                 path or [],
                 check_quant=check_quant,
                 read_source=make_read_source(no_outside_imports),
+                **load_cache_opts,
             )
         except (Error.SyntaxError, Error.ValidationError, Error.MultipleValidationErrors) as exn:
             if not getattr(exn, "declared_wdl_version", None):
@@ -418,6 +423,25 @@ def print_error(exn: Optional[BaseException]) -> None:
                 quant_warning = True
 
 
+def load_cache_options(cfg=None):
+    """
+    Keyword arguments for load() to use the parsed document cache, if enabled in the configuration
+    """
+    from . import runtime, _parser
+
+    if cfg is None:
+        cfg = runtime.config.Loader(logging.getLogger("miniwdl-load"))
+    parser_dir = cfg["load_cache"].get("parser_dir", "")
+    if parser_dir:
+        _parser.tables_cache_dir = os.path.expanduser(parser_dir)
+    if not cfg["load_cache"]["dir"]:
+        return {}
+    return {
+        "cache_dir": cfg["load_cache"]["dir"],
+        "cache_max_bytes": cfg["load_cache"].get_int("max_mb") * 1024 * 1024,
+    }
+
+
 def make_read_source(no_outside_imports):
     top_dir = None
 
@@ -465,7 +489,9 @@ def fill_run_subparser(subparsers):
         description="For details & configuration see:\n"
         "https://miniwdl.readthedocs.io/en/latest/runner_reference.html",
     )
-    run_parser.add_argument("uri", metavar="URI", type=str, help="WDL document filename/URI")
+    run_parser.add_argument(
+        "uri", metavar="URI", type=str, nargs="?", help="WDL document filename/URI"
+    )
     run_parser.add_argument(
         "inputs",
         metavar="input_key=value",
@@ -517,6 +543,15 @@ def fill_run_subparser(subparsers):
             " working directory); supply '.' or 'some/dir/.' to instead run in this directory exactly"
         ),
     )
+    group.add_argument(
+        "--resume",
+        metavar="RUN_DIR",
+        help=(
+            "resume the interrupted workflow run in RUN_DIR from its checkpoint (see"
+            " [scheduler] checkpoint_period_seconds), relaunching only unfinished calls; omit the"
+            " URI and inputs"
+        ),
+    )
     group.add_argument(
         "--error-json",
         action="store_true",
@@ -627,8 +662,20 @@ def runner(
     stdout_file=None,
     stderr_file=None,
     no_outside_imports=False,
+    resume=None,
     **kwargs,
 ):
+    if resume:
+        if uri or inputs or input_file or task or run_dir:
+            die(
+                "--resume RUN_DIR restores the URI, inputs, and run directory of the interrupted run"
+            )
+        if not os.path.isfile(os.path.join(resume, "checkpoint.pickle")):
+            die(f"no workflow checkpoint to resume in {resume}")
+        run_dir = os.path.join(resume, ".")
+    elif not uri:
+        die("miniwdl run: missing URI (or --resume RUN_DIR)")
+
     # set up logging
     level = NOTICE_LEVEL
     if kwargs["verbose"]:
@@ -733,44 +780,59 @@ def runner(
             )
             sys.exit(2)
 
-        # unpack zip & manifest, if applicable
-        uri, manifest_input_file = unpack_source_zip(logger, cleanup, uri, cfg["file_io"]["root"])
-        if manifest_input_file:
-            if input_file:
-                logger.warning("specified --input file replacing source zip's")
-            else:
-                input_file = manifest_input_file
-
-        try:
-            # load WDL document
-            doc = load(
-                uri,
-                path or [],
-                check_quant=check_quant,
-                read_source=make_read_source(no_outside_imports),
+        if resume:
+            # restore the workflow and inputs from the checkpoint
+            checkpoint = runtime.workflow.load_checkpoint(resume)
+            target = checkpoint.workflow
+            doc = getattr(target, "parent")
+            input_env = checkpoint.inputs
+            input_json = values_to_json(input_env, namespace=target.name)
+        else:
+            # unpack zip & manifest, if applicable
+            uri, manifest_input_file = unpack_source_zip(
+                logger, cleanup, uri, cfg["file_io"]["root"]
             )
+            if manifest_input_file:
+                if input_file:
+                    logger.warning("specified --input file replacing source zip's")
+                else:
+                    input_file = manifest_input_file
 
-            # parse and validate the provided inputs
-            eff_root = (
-                cfg["file_io"]["root"] if not cfg["file_io"].get_bool("copy_input_files") else "/"
-            )
+            try:
+                # load WDL document
+                doc = load(
+                    uri,
+                    path or [],
+                    check_quant=check_quant,
+                    read_source=make_read_source(no_outside_imports),
+                    **load_cache_options(cfg),
+                )
 
-            target, input_env, input_json = runner_input(
-                doc,
-                inputs,
-                input_file,
-                empty,
-                none,
-                task=task,
-                downloadable=lambda fn, is_dir: runtime.download.able(cfg, fn, directory=is_dir),
-                root=eff_root,  # if copy_input_files is set, then input files need not reside under the configured root
-            )
-        except Error.InputError as exn:
-            runner_standard_output(runtime.error_json(exn), stdout_file, error_json, log_json)
-            die(exn.args[0])
-        except Exception as exn:
-            runner_standard_output(runtime.error_json(exn), stdout_file, error_json, log_json)
-            raise
+                # parse and validate the provided inputs
+                eff_root = (
+                    cfg["file_io"]["root"]
+                    if not cfg["file_io"].get_bool("copy_input_files")
+                    else "/"
+                )
+
+                target, input_env, input_json = runner_input(
+                    doc,
+                    inputs,
+                    input_file,
+                    empty,
+                    none,
+                    task=task,
+                    downloadable=lambda fn, is_dir: runtime.download.able(
+                        cfg, fn, directory=is_dir
+                    ),
+                    root=eff_root,  # if copy_input_files is set, then input files need not reside under the configured root
+                )
+            except Error.InputError as exn:
+                runner_standard_output(runtime.error_json(exn), stdout_file, error_json, log_json)
+                die(exn.args[0])
+            except Exception as exn:
+                runner_standard_output(runtime.error_json(exn), stdout_file, error_json, log_json)
+                raise
 
         if json_only:
             print(json.dumps(input_json, indent=(None if log_json else 2)))
@@ -815,7 +877,9 @@ def runner(
         cache = cleanup.enter_context(runtime.cache.new(cfg, logger))
         rundir = None
         try:
-            rundir, output_env = runtime.run(cfg, target, input_env, run_dir=run_dir, _cache=cache)
+            rundir, output_env = runtime.run(
+                cfg, target, input_env, run_dir=run_dir, _cache=cache, _resume=bool(resume)
+            )
         except Exception as exn:
             runner_standard_output(runtime.error_json(exn), stdout_file, error_json, log_json)
             exit_status = 2
@@ -854,8 +918,11 @@ def runner(
                 # whether success or fail, leave some artifacts in the run directory.
                 # this should be done under the flock held open within the cache context so that
                 # other waiting processes know when we're really finished with the run directory.
-                with open(os.path.join(rundir, "rerun"), "w") as rerunfile:
-                    print(rerun_sh, file=rerunfile)
+                # (A resumed run keeps the interrupted run's rerun script, if it got to write one,
+                # since that reproduces the run from scratch.)
+                if not (resume and os.path.exists(os.path.join(rundir, "rerun"))):
+                    with open(os.path.join(rundir, "rerun"), "w") as rerunfile:
+                        print(rerun_sh, file=rerunfile)
                 copy_source(doc, os.path.join(rundir, "wdl"))
             cfg.log_unused_options()
 
@@ -1653,6 +1720,7 @@ def localize(
                 path or [],
                 check_quant=check_quant,
                 read_source=make_read_source(no_outside_imports),
+                **load_cache_options(cfg),
             )
 
             try:
@@ -1762,6 +1830,127 @@ def localize(
             )
 
 
+def fill_cache_subparser(subparsers):
+    cache_parser = subparsers.add_parser(
+        "cache",
+        help="Maintain the local call cache",
+        description="Maintain the local call cache directory (per configuration section call_cache)",
+    )
+    cache_subparsers = cache_parser.add_subparsers(dest="cache_command", metavar="COMMAND")
+    cache_subparsers.required = True
+    migrate_parser = cache_subparsers.add_parser(
+        "migrate",
+        help="Copy call cache entries from JSON files into the SQLite database",
+        description="Copy existing call cache entries, stored as JSON files in the call cache directory, into "
+        "the SQLite database used by [call_cache] backend = sqlite (skipping any already present).",
+    )
+    migrate_parser.add_argument(
+        "--remove",
+        action="store_true",
+        help="remove each JSON file once copied",
+    )
+    gc_parser = cache_subparsers.add_parser(
+        "gc",
+        help="Evict least-recently-used content from the download & call caches",
+        description="Evict least-recently-used files & directories from the download cache, and entries from the "
+        "call cache (along with outputs referenced only by them), until each cache is within its size budget "
+        "([download_cache] max_gb and [call_cache] max_gb). Content in use by any concurrent run is skipped. "
+        "Prints the bytes reclaimed from each cache.",
+    )
+    gc_parser.add_argument(
+        "--download-max-gb",
+        metavar="GB",
+        type=float,
+        default=None,
+        help="download cache budget (overrides [download_cache] max_gb; 0 = unbounded)",
+    )
+    gc_parser.add_argument(
+        "--call-max-gb",
+        metavar="GB",
+        type=float,
+        default=None,
+        help="call cache budget (overrides [call_cache] max_gb; 0 = unbounded)",
+    )
+    for subparser in (migrate_parser, gc_parser):
+        subparser.add_argument(
+            "--cfg",
+            metavar="FILE",
+            type=str,
+            default=None,
+            help=(
+                "configuration file to load (in preference to file named by MINIWDL_CFG environment, "
+                "or XDG_CONFIG_{HOME,DIRS}/miniwdl.cfg)"
+            ),
+        )
+        group = subparser.add_argument_group("logging")
+        group.add_argument(
+            "-v",
+            "--verbose",
+            action="store_true",
+            help="increase logging detail",
+        )
+        group.add_argument(
+            "--debug", action="store_true", help="maximally verbose logging & exception tracebacks"
+        )
+        group.add_argument(
+            "--no-color",
+            action="store_true",
+            help="disable colored logging on terminal (also set by NO_COLOR environment variable)",
+        )
+    return cache_parser
+
+
+def cache_admin(
+    cache_command, cfg=None, remove=False, download_max_gb=None, call_max_gb=None, **kwargs
+):
+    level = NOTICE_LEVEL
+    logging.raiseExceptions = False
+    if kwargs["verbose"]:
+        level = VERBOSE_LEVEL
+    if kwargs["debug"]:
+        level = logging.DEBUG
+    if kwargs["no_color"]:
+        os.environ["NO_COLOR"] = os.environ.get("NO_COLOR", "")
+    logging.basicConfig(level=level)
+    logger = logging.getLogger("miniwdl-cache")
+    with configure_logger():
+        from . import runtime
+        from .runtime import cache_sqlite, cache_gc
+
+        cfg_arg = None
+        if cfg:
+            assert os.path.isfile(cfg), "--cfg file not found"
+            cfg_arg = [cfg]
+        cfg = runtime.config.Loader(logger, filenames=cfg_arg)
+
+        if cache_command == "migrate":
+            cache_sqlite.migrate_dir(cfg, logger, remove=remove)
+            if cfg["call_cache"]["backend"] != "sqlite":
+                logger.warning(
+                    """future runs won't use the migrated entries unless configuration section "call_cache", """
+                    """key "backend" (env MINIWDL__CALL_CACHE__BACKEND) is set to sqlite"""
+                )
+        elif cache_command == "gc":
+            if download_max_gb is not None:
+                cfg.override({"download_cache": {"max_gb": download_max_gb}})
+            if call_max_gb is not None:
+                cfg.override({"call_cache": {"max_gb": call_max_gb}})
+            download_max_bytes = cache_gc.max_bytes(cfg, "download_cache")
+            call_max_bytes = cache_gc.max_bytes(cfg, "call_cache")
+            if download_max_bytes is None and call_max_bytes is None:
+                logger.warning(
+                    "no cache size budget configured; see [download_cache] max_gb and [call_cache] max_gb"
+                )
+            print(
+                json.dumps(
+                    cache_gc.gc(cfg, logger, download_max_bytes, call_max_bytes),
+                    indent=2,
+                )
+            )
+        else:
+            assert False
+
+
 def fill_configure_subparser(subparsers):
     configure_parser = subparsers.add_parser(
         "configure",
@@ -2171,6 +2360,7 @@ def input_template(
         path=path,
         check_quant=check_quant,
         read_source=make_read_source(no_outside_imports),
+        **load_cache_options(),
     )
 
     try:
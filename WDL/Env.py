@@ -2,7 +2,7 @@
 Environments, for identifier resolution during WDL typechecking and evaluation.
 """
 
-from typing import Optional, TypeVar, Generic, Any, Callable, Set, Iterator
+from typing import Optional, TypeVar, Generic, Any, Callable, Set, Iterator, Dict, Tuple
 
 T = TypeVar("T")
 S = TypeVar("S")
@@ -56,11 +56,20 @@ class Bindings(Generic[T]):
         print(env["x"])                             # 1
         print(",".join(str(b.value) for b in env))  # 1,42
 
+    Name lookups are served from a hash index built lazily upon the first lookup in a given
+    environment, by inserting the bindings prepended since its nearest indexed ancestor into that
+    ancestor's index. The index is a persistent hash trie, so each insertion copies only the few
+    small nodes on the path to the new entry, sharing the rest with the ancestor. This keeps
+    ``bind()`` constant-time while making lookups logarithmic, even when binding and looking up
+    are interleaved (as when evaluating a workflow). Namespace lookups are similarly served from a
+    persistent hash trie, extended incrementally, mapping each namespace to the chain of bindings
+    within it.
     """
 
     _binding: Optional[Binding[T]]
     _next: "Optional[Bindings[T]]"
-    _namespaces: Optional[Set[str]] = None
+    _index: "Optional[_HashTrie[Binding[T]]]" = None
+    _namespace_index: "Optional[_HashTrie[Bindings[T]]]" = None
 
     def __init__(
         self,
@@ -84,7 +93,53 @@ class Bindings(Generic[T]):
             pos = pos._next
 
     def __len__(self) -> int:
-        return sum(1 for _ in self)
+        return len(self._lookup_index())
+
+    def _lookup_index(self) -> "_HashTrie[Binding[T]]":
+        # index of the effective (unshadowed) binding for each name
+        if self._index is None:
+            chain = []
+            pos: Optional[Bindings[T]] = self
+            while pos is not None and pos._index is None:
+                chain.append(pos)
+                pos = pos._next
+            index: _HashTrie[Binding[T]] = (
+                pos._index if pos is not None and pos._index else _HashTrie()
+            )
+            for node in reversed(chain):
+                if isinstance(node._binding, Binding):
+                    index = index.set(node._binding.name, node._binding)
+            self._index = index
+        return self._index
+
+    def _namespaces_index(self) -> "_HashTrie[Bindings[T]]":
+        # for each namespace (with trailing dot), the bindings within it (including any shadowed,
+        # which iteration skips); extended from the nearest indexed ancestor like _lookup_index()
+        if self._namespace_index is None:
+            chain = []
+            pos: Optional[Bindings[T]] = self
+            while pos is not None and pos._namespace_index is None:
+                chain.append(pos)
+                pos = pos._next
+            index: _HashTrie[Bindings[T]] = (
+                pos._namespace_index if pos is not None and pos._namespace_index else _HashTrie()
+            )
+            for node in reversed(chain):
+                b = node._binding
+                if isinstance(b, Binding):
+                    names = b.name.split(".")
+                    for i in range(len(names) - 1):
+                        namespace = ".".join(names[: i + 1]) + "."
+                        index = index.set(namespace, Bindings(b, index.get(namespace)))
+            self._namespace_index = index
+        return self._namespace_index
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # omit the lookup indices, which are cheaply rebuilt
+        ans = dict(self.__dict__)
+        ans.pop("_index", None)
+        ans.pop("_namespace_index", None)
+        return ans
 
     def bind(self, name: str, value: T, info: Any = None) -> "Bindings[T]":
         """
@@ -100,10 +155,10 @@ class Bindings(Generic[T]):
 
         :raise KeyError: no such binding
         """
-        for b in self:
-            if b.name == name:
-                return b
-        raise KeyError()
+        b = self._lookup_index().get(name)
+        if b is None:
+            raise KeyError()
+        return b
 
     def resolve(self, name: str) -> T:
         """
@@ -130,11 +185,7 @@ class Bindings(Generic[T]):
         """
         Determine existence of a binding for the name. Equivalently, ``name in env``
         """
-        try:
-            self.resolve(name)
-            return True
-        except KeyError:
-            return False
+        return self._lookup_index().get(name) is not None
 
     def __contains__(self, name: str) -> bool:
         if isinstance(name, str):
@@ -160,14 +211,7 @@ class Bindings(Generic[T]):
     def subtract(self, rhs: "Bindings[S]") -> "Bindings[T]":
         "Copy the environment excluding any binding for which ``rhs`` has a binding with the same name"
 
-        def flt(b: Binding[T]) -> bool:
-            try:
-                rhs.resolve(b.name)
-                return False
-            except KeyError:
-                return True
-
-        return self.filter(flt)
+        return self.filter(lambda b: not rhs.has_binding(b.name))
 
     @property
     def namespaces(self) -> Set[str]:
@@ -176,22 +220,14 @@ class Bindings(Generic[T]):
         Return the environment's namespaces, all the distinct dot-separated prefixes of the binding
         names. Each element ends with a dot.
         """
-        if self._namespaces is None:
-            self._namespaces = self._next.namespaces if self._next is not None else set()
-            if isinstance(self._binding, Binding):
-                names = self._binding.name.split(".")
-                if len(names) > 1:
-                    for i in range(len(names) - 1):
-                        ns = ".".join(names[: i + 1]) + "."
-                        self._namespaces.add(ns)
-        return self._namespaces.copy()
+        return set(self._namespaces_index().keys())
 
     def has_namespace(self, namespace: str) -> bool:
         "Determine existence of a namespace in the environment"
         assert namespace
         if not namespace.endswith("."):
             namespace += "."
-        return namespace in (self._namespaces if self._namespaces else self.namespaces)
+        return self._namespaces_index().get(namespace) is not None
 
     def enter_namespace(self, namespace: str) -> "Bindings[T]":
         """
@@ -201,13 +237,10 @@ class Bindings(Generic[T]):
         assert namespace
         if not namespace.endswith("."):
             namespace += "."
-
-        def enter(b: Binding[T]) -> Optional[Binding[T]]:
-            if b.name.startswith(namespace):
-                return Binding(b.name[len(namespace) :], b.value, b.info)
-            return None
-
-        return self.map(enter)
+        ans: Bindings[T] = Bindings()
+        for b in self._namespaces_index().get(namespace) or []:
+            ans = Bindings(Binding(b.name[len(namespace) :], b.value, b.info), ans)
+        return _rev(ans)
 
     def wrap_namespace(self, namespace: str) -> "Bindings[T]":
         "Copy the environment with the given namespace prefixed to each binding name"
@@ -236,6 +269,77 @@ def merge(*args: Bindings[T]) -> Bindings[T]:
     ans = args[-1] if args else Bindings()
     for env in reversed(args[:-1]):
         assert isinstance(env, Bindings)
-        for b in _rev(env):
+        for b in reversed(list(env)):
             ans = Bindings(b, ans)
     return ans
+
+
+class _HashTrie(Generic[T]):
+    # Minimal persistent (immutable) hash map from str keys, for Bindings lookup indices: a trie
+    # branching on successive 5-bit chunks of the key hash. Each node is a dict from chunk to
+    # either a child node, or a leaf tuple (hash, ((key, value), ...)) holding the entries whose
+    # hashes coincide. set() returns a new trie copying only the nodes along the key's path.
+
+    __slots__ = ("_root", "_len")
+
+    _root: Dict[int, Any]
+    _len: int
+
+    def __init__(self, root: Optional[Dict[int, Any]] = None, length: int = 0) -> None:
+        self._root = root or {}
+        self._len = length
+
+    def __len__(self) -> int:
+        return self._len
+
+    def get(self, key: str) -> Optional[T]:
+        h = hash(key)
+        node = self._root
+        shift = 0
+        while True:
+            entry = node.get((h >> shift) & 31)
+            if entry is None:
+                return None
+            if isinstance(entry, dict):
+                node = entry
+                shift += 5
+                continue
+            for k, v in entry[1]:
+                if k == key:
+                    return v
+            return None
+
+    def set(self, key: str, value: T) -> "_HashTrie[T]":
+        root, added = _trie_set(self._root, hash(key), 0, key, value)
+        return _HashTrie(root, self._len + (1 if added else 0))
+
+    def keys(self) -> Iterator[str]:
+        nodes = [self._root]
+        while nodes:
+            for entry in nodes.pop().values():
+                if isinstance(entry, dict):
+                    nodes.append(entry)
+                else:
+                    yield from (k for k, _v in entry[1])
+
+
+def _trie_set(
+    node: Dict[int, Any], h: int, shift: int, key: str, value: Any
+) -> Tuple[Dict[int, Any], bool]:
+    # copy of node with key set to value, and whether the key is new
+    chunk = (h >> shift) & 31
+    ans = dict(node)
+    entry = node.get(chunk)
+    added = True
+    if entry is None:
+        ans[chunk] = (h, ((key, value),))
+    elif isinstance(entry, dict):
+        ans[chunk], added = _trie_set(entry, h, shift + 5, key, value)
+    elif entry[0] == h:
+        pairs = tuple(kv for kv in entry[1] if kv[0] != key)
+        added = len(pairs) == len(entry[1])
+        ans[chunk] = (h, pairs + ((key, value),))
+    else:
+        # push the existing leaf down a level, alongside the new entry
+        ans[chunk], _ = _trie_set({(entry[0] >> (shift + 5)) & 31: entry}, h, shift + 5, key, value)
+    return ans, added
@@ -13,7 +13,7 @@ given a suitable ``WDL.Env.Bindings[Value.Base]``.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Tuple, Union, Iterable, Set, TYPE_CHECKING
+from typing import List, Optional, Dict, Tuple, Union, Iterable, Set, Callable, TYPE_CHECKING
 import codecs
 import regex
 from .Error import SourcePosition, SourceNode
@@ -22,6 +22,12 @@ from . import Type, Value, Env, Error, StdLib, Any
 if TYPE_CHECKING:
     from . import Tree
 
+Compiled = Callable[[Env.Bindings[Value.Base], "StdLib.Base"], Value.Base]
+"""
+Type of the closures produced by :meth:`WDL.Expr.Base.compile`, evaluating the expression given
+``(env, stdlib)``
+"""
+
 
 class Base(SourceNode, ABC):
     """Superclass of all expression AST nodes"""
@@ -30,6 +36,8 @@ class Base(SourceNode, ABC):
     _check_quant: bool = True
     _stdlib: "Optional[StdLib.Base]" = None
     _struct_types: Optional[Env.Bindings[Dict[str, Type.Base]]] = None
+    _compiled: Optional[Compiled] = None
+    _folded: Optional[Value.Base] = None
 
     @property
     def type(self) -> Type.Base:
@@ -126,6 +134,9 @@ class Base(SourceNode, ABC):
 
         :param stdlib: a context-specific standard function library implementation
         """
+        if self._folded is not None:
+            self._folded.expr = self
+            return self._folded
         try:
             ans = self._eval(env, stdlib, **kwargs)
             ans.expr = self
@@ -135,17 +146,91 @@ class Base(SourceNode, ABC):
         except Exception as exn:
             raise Error.EvalError(self, str(exn)) from exn
 
+    def compile(self) -> Compiled:
+        """
+        Compile the typechecked expression into a Python closure ``f(env, stdlib)``, which evaluates
+        it just like ``eval(env, stdlib)``, producing the same values and errors.
+
+        The closure avoids re-interpreting the syntax tree upon each evaluation: literal values
+        are pre-built and string literal escapes pre-decoded, identifiers are resolved directly
+        from the environment's lookup index, and each stdlib function implementation is looked up
+        once per stdlib instance. The closure is built upon first use and retained, so it's cheap
+        to call ``compile()`` before each evaluation of an expression evaluated repeatedly (e.g.
+        within a scatter body).
+        """
+        ans = self._compiled
+        if ans is None:
+            ans = self._compiled = (
+                _compiled_literal(self) if self._folded is not None else self._compile()
+            )
+        return ans
+
+    def _compile(self) -> Compiled:
+        # to be overridden by subclasses with a specialized closure; by default, fall back to
+        # tree-walking eval()
+        return self.eval
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # omit the compiled closure, which is rebuilt upon use
+        ans = dict(self.__dict__)
+        ans.pop("_compiled", None)
+        return ans
+
     @property
     def literal(self) -> Optional[Value.Base]:
         """
         If the expression is a literal constant, return its value; otherwise return None. The
         result can be an instance of ``WDL.Value.Null`` which is distinct from None.
+
+        Once the document is typechecked, this also covers constant expressions composing
+        literals with operators, string interpolation, and pure standard library functions (e.g.
+        ``3 * 1024``, ``"~{"sample"}.bam"``, ``sub("a_b", "_", "-")``), which are evaluated in
+        advance, and whose values :meth:`eval` and :meth:`compile` then reuse.
         """
+        if self._folded is not None:
+            return self._folded
+        return self._literal()
+
+    def _literal(self) -> Optional[Value.Base]:
+        # to be overridden by subclasses able to compose a literal value without evaluation
         if isinstance(self, (Boolean, Int, Float)):
             return self._eval(Env.Bindings(), None)  # type: ignore
         return None
 
 
+def _compiled_node(node: Base, impl: Compiled) -> Compiled:
+    # wrap the closure implementing a compiled node with the same error handling & value
+    # annotation as Base.eval()
+    def f(env: Env.Bindings[Value.Base], stdlib: StdLib.Base) -> Value.Base:
+        try:
+            ans = impl(env, stdlib)
+            ans.expr = node
+            return ans
+        except Error.RuntimeError:
+            raise
+        except Exception as exn:
+            raise Error.EvalError(node, str(exn)) from exn
+
+    return f
+
+
+def _compiled_literal(node: Base) -> Compiled:
+    # closure returning the pre-built value of a constant literal (or folded constant expression)
+    value = node._folded
+    if value is None:
+        try:
+            value = node._eval(Env.Bindings(), None)  # type: ignore
+        except Exception:
+            # leave it to eval() to raise the error upon evaluation
+            return node.eval
+
+    def f(env: Env.Bindings[Value.Base], stdlib: StdLib.Base) -> Value.Base:
+        value.expr = node
+        return value
+
+    return f
+
+
 class Boolean(Base):
     """
     Boolean literal
@@ -172,6 +257,9 @@ class Boolean(Base):
         """"""
         return Value.Boolean(self.value)
 
+    def _compile(self) -> Compiled:
+        return _compiled_literal(self)
+
 
 class Int(Base):
     """
@@ -199,6 +287,9 @@ class Int(Base):
         """"""
         return Value.Int(self.value)
 
+    def _compile(self) -> Compiled:
+        return _compiled_literal(self)
+
 
 # Float literal
 
@@ -229,6 +320,9 @@ class Float(Base):
         """"""
         return Value.Float(self.value)
 
+    def _compile(self) -> Compiled:
+        return _compiled_literal(self)
+
 
 class Null(Base):
     """
@@ -256,6 +350,9 @@ class Null(Base):
         """"""
         return Value.Null()
 
+    def _compile(self) -> Compiled:
+        return _compiled_literal(self)
+
 
 class Placeholder(Base):
     """Holds an expression interpolated within a string or command"""
@@ -334,7 +431,9 @@ class Placeholder(Base):
 
     def _eval_impl(self, env: Env.Bindings[Value.Base], stdlib: StdLib.Base) -> Value.String:
         """"""
-        v = self.expr.eval(env, stdlib)
+        return self._stringify(self.expr.eval(env, stdlib))
+
+    def _stringify(self, v: Value.Base) -> Value.String:
         if isinstance(v, Value.Null):
             if "default" in self.options:
                 return Value.String(self.options["default"])
@@ -352,7 +451,9 @@ class Placeholder(Base):
         return Value.String(str(v))
 
     def _eval(self, env: Env.Bindings[Value.Base], stdlib: StdLib.Base) -> Value.String:
-        ans = self._eval_impl(env, stdlib)
+        return self._check_regex(self._eval_impl(env, stdlib), stdlib)
+
+    def _check_regex(self, ans: Value.String, stdlib: StdLib.Base) -> Value.String:
         placeholder_regex = stdlib.eval_context.placeholder_regex
         if placeholder_regex and not placeholder_regex.fullmatch(ans.value):
             raise Error.InputError(
@@ -360,6 +461,12 @@ class Placeholder(Base):
             )
         return ans
 
+    def _compile(self) -> Compiled:
+        expr = self.expr.compile()
+        return _compiled_node(
+            self, lambda env, stdlib: self._check_regex(self._stringify(expr(env, stdlib)), stdlib)
+        )
+
 
 class String(Base):
     """String literal, possibly interleaved with expression placeholders for interpolation"""
@@ -418,8 +525,14 @@ class String(Base):
         assert len(parts) >= 2 and parts[0] in ("'", '"') and parts[-1] == parts[0]
         return Value.String("".join(parts)[1:-1])
 
-    @property
-    def literal(self) -> Optional[Value.Base]:
+    def _compile(self) -> Compiled:
+        if not any(isinstance(part, Placeholder) for part in self.parts):
+            return _compiled_literal(self)
+        assert len(self.parts) >= 2 and self.parts[0] in ("'", '"')
+        assert self.parts[-1] == self.parts[0]
+        return _compiled_parts(self, self.parts[1:-1], True)
+
+    def _literal(self) -> Optional[Value.Base]:
         if next((p for p in self.parts if not isinstance(p, str)), None):
             return None
         return self._eval(Env.Bindings(), None)  # type: ignore
@@ -485,6 +598,34 @@ class String(Base):
         return parts2
 
 
+def _compiled_parts(
+    node: String, parts: List[Union[str, Placeholder]], decode_escapes: bool
+) -> Compiled:
+    # compile string literal parts (without delimiters) to concatenate with the evaluated
+    # placeholders
+    try:
+        pieces: List[Union[str, Compiled]] = [
+            part.compile()
+            if isinstance(part, Placeholder)
+            else (String._decode_escapes(node.pos, part) if decode_escapes else part)
+            for part in parts
+        ]
+    except Error._BadCharacterEncoding:
+        # leave it to eval() to raise the error upon evaluation
+        return node.eval
+    if all(isinstance(piece, str) for piece in pieces):
+        return _compiled_literal(node)
+
+    def impl(env: Env.Bindings[Value.Base], stdlib: StdLib.Base) -> Value.Base:
+        return Value.String(
+            "".join(
+                [piece if isinstance(piece, str) else piece(env, stdlib).value for piece in pieces]
+            )
+        )
+
+    return _compiled_node(node, impl)
+
+
 class TaskCommand(String):
     """
     Specialization of ``String`` for task commands, with slightly different evaluation rules:
@@ -511,6 +652,10 @@ class TaskCommand(String):
             )
         )
 
+    def _compile(self) -> Compiled:
+        # (with the default dedent=True)
+        return _compiled_parts(self, String._dedent(self.parts), False)
+
 
 class MultiLineString(String):
     """
@@ -521,6 +666,20 @@ class MultiLineString(String):
 
     def _eval(self, env: Env.Bindings[Value.Base], stdlib: StdLib.Base) -> Value.String:
         """"""
+        # dedent (without delimiters), eval placeholders, decode escape sequences, concatenate
+        return Value.String(
+            "".join(
+                part.eval(env, stdlib).value
+                if isinstance(part, Placeholder)
+                else String._decode_escapes(self.pos, part)
+                for part in String._dedent(self._trimmed_parts()[1:-1])
+            )
+        )
+
+    def _compile(self) -> Compiled:
+        return _compiled_parts(self, String._dedent(self._trimmed_parts()[1:-1]), True)
+
+    def _trimmed_parts(self) -> List[Union[str, Placeholder]]:
         # From each str part, remove escaped newlines and any whitespace following them. Escaped
         # newlines are preceded by an odd number of backslashes.
         parts: List[Union[str, Placeholder]] = []
@@ -550,16 +709,7 @@ class MultiLineString(String):
             parts[-2] = parts[-2].rstrip(" \t")
             if parts[-2] and parts[-2][-1] == "\n":
                 parts[-2] = parts[-2][:-1]
-
-        # dedent (without delimiters), eval placeholders, decode escape sequences, concatenate
-        return Value.String(
-            "".join(
-                part.eval(env, stdlib).value
-                if isinstance(part, Placeholder)
-                else String._decode_escapes(self.pos, part)
-                for part in String._dedent(parts[1:-1])
-            )
-        )
+        return parts
 
 
 class Array(Base):
@@ -620,8 +770,18 @@ class Array(Base):
             [item.eval(env, stdlib).coerce(self.type.item_type) for item in self.items],
         )
 
-    @property
-    def literal(self) -> Optional[Value.Base]:
+    def _compile(self) -> Compiled:
+        assert isinstance(self.type, Type.Array)
+        item_type = self.type.item_type
+        items = [item.compile() for item in self.items]
+        return _compiled_node(
+            self,
+            lambda env, stdlib: Value.Array(
+                item_type, [item(env, stdlib).coerce(item_type) for item in items]
+            ),
+        )
+
+    def _literal(self) -> Optional[Value.Base]:
         assert isinstance(self.type, Type.Array)
         ans = []
         for item in self.items:
@@ -674,8 +834,17 @@ class Pair(Base):
         rv = self.right.eval(env, stdlib)
         return Value.Pair(self.left.type, self.right.type, (lv, rv))
 
-    @property
-    def literal(self) -> Optional[Value.Base]:
+    def _compile(self) -> Compiled:
+        left_type, right_type = self.left.type, self.right.type
+        left, right = self.left.compile(), self.right.compile()
+        return _compiled_node(
+            self,
+            lambda env, stdlib: Value.Pair(
+                left_type, right_type, (left(env, stdlib), right(env, stdlib))
+            ),
+        )
+
+    def _literal(self) -> Optional[Value.Base]:
         assert isinstance(self.type, Type.Pair)
         lv = self.left.literal
         rv = self.right.literal
@@ -743,20 +912,31 @@ class Map(Base):
 
     def _eval(self, env: Env.Bindings[Value.Base], stdlib: StdLib.Base) -> Value.Base:
         """"""
+        return self._eval_items([(k.eval, v.eval) for k, v in self.items], env, stdlib)
+
+    def _compile(self) -> Compiled:
+        items = [(k.compile(), v.compile()) for k, v in self.items]
+        return _compiled_node(self, lambda env, stdlib: self._eval_items(items, env, stdlib))
+
+    def _eval_items(
+        self,
+        items: List[Tuple[Compiled, Compiled]],
+        env: Env.Bindings[Value.Base],
+        stdlib: StdLib.Base,
+    ) -> Value.Base:
         assert isinstance(self.type, Type.Map)
         keystrs = set()
         eitems = []
-        for k, v in self.items:
-            ek = k.eval(env, stdlib)
+        for k, v in items:
+            ek = k(env, stdlib)
             sk = str(ek)
             if sk in keystrs:
                 raise Error.EvalError(self, "duplicate keys in Map literal")
-            eitems.append((ek, v.eval(env, stdlib)))
+            eitems.append((ek, v(env, stdlib)))
             keystrs.add(sk)
         return Value.Map(self.type.item_type, eitems)
 
-    @property
-    def literal(self) -> Optional[Value.Base]:
+    def _literal(self) -> Optional[Value.Base]:
         assert isinstance(self.type, Type.Map)
         items = []
         for k, v in self.items:
@@ -861,8 +1041,24 @@ class Struct(Base):
                 ans[k] = ans[k].coerce(self.type.members[k])
         return Value.Struct(self.type, ans)  # type: ignore
 
-    @property
-    def literal(self) -> Optional[Value.Base]:
+    def _compile(self) -> Compiled:
+        ty = self.type
+        assert isinstance(ty, (Type.Object, Type.StructInstance))
+        member_types = ty.members if isinstance(ty, Type.StructInstance) else None
+        assert member_types or not isinstance(ty, Type.StructInstance)
+        members = [(k, v.compile()) for k, v in self.members.items()]
+
+        def impl(env: Env.Bindings[Value.Base], stdlib: StdLib.Base) -> Value.Base:
+            ans = {}
+            for k, v in members:
+                ans[k] = v(env, stdlib)
+                if member_types is not None:
+                    ans[k] = ans[k].coerce(member_types[k])
+            return Value.Struct(ty, ans)  # type: ignore
+
+        return _compiled_node(self, impl)
+
+    def _literal(self) -> Optional[Value.Base]:
         ans = {}
         for k, v in self.members.items():
             vl = v.literal
@@ -950,6 +1146,20 @@ class IfThenElse(Base):
             ans = self.alternative.eval(env, stdlib)
         return ans
 
+    def _compile(self) -> Compiled:
+        condition = self.condition.compile()
+        consequent = self.consequent.compile()
+        alternative = self.alternative.compile()
+        boolean = Type.Boolean()
+        return _compiled_node(
+            self,
+            lambda env, stdlib: (
+                consequent(env, stdlib)
+                if condition(env, stdlib).expect(boolean).value
+                else alternative(env, stdlib)
+            ),
+        )
+
 
 class Ident(Base):
     """
@@ -1006,6 +1216,10 @@ class Ident(Base):
         """"""
         return env[self.name]
 
+    def _compile(self) -> Compiled:
+        name = self.name
+        return _compiled_node(self, lambda env, stdlib: env.resolve_binding(name).value)
+
     @property
     def _ident(self) -> str:
         return self.name
@@ -1159,7 +1373,27 @@ class Get(Base):
         raise Error.NoSuchMember(self, self.member)
 
     def _eval(self, env: Env.Bindings[Value.Base], stdlib: StdLib.Base) -> Value.Base:
-        innard_value = self.expr.eval(env, stdlib)
+        return self._get_member(self.expr.eval(env, stdlib))
+
+    def _compile(self) -> Compiled:
+        node = self
+        if isinstance(self.expr, Ident) and not self.member:
+            # fast path for a plain identifier, which is the most common expression of all
+            ident, name = self.expr, self.expr.name
+
+            def f(env: Env.Bindings[Value.Base], stdlib: StdLib.Base) -> Value.Base:
+                try:
+                    ans = env.resolve_binding(name).value
+                    ans.expr = node
+                    return ans
+                except Exception as exn:
+                    raise Error.EvalError(ident, str(exn)) from exn
+
+            return f
+        expr = self.expr.compile()
+        return _compiled_node(self, lambda env, stdlib: self._get_member(expr(env, stdlib)))
+
+    def _get_member(self, innard_value: Value.Base) -> Value.Base:
         if not self.member:
             return innard_value
         if isinstance(innard_value, Value.Pair):
@@ -1286,6 +1520,32 @@ class Apply(Base):
         assert isinstance(f, StdLib.Function)
         return f(self, env, stdlib)
 
+    def _compile(self) -> Compiled:
+        node, function_name = self, self.function_name
+        arguments = [arg.compile() for arg in self.arguments]
+
+        def f(env: Env.Bindings[Value.Base], stdlib: StdLib.Base) -> Value.Base:
+            try:
+                # The function implementation compiled from each stdlib is kept by the stdlib
+                # itself rather than here, as it may refer to the stdlib (through the function
+                # object), which shouldn't outlive its evaluations on our account. (Keyed by
+                # id(node), with the node retained in the entry so that its id stays unique.)
+                calls = stdlib._compiled_calls
+                entry = calls.get(id(node), None)
+                if entry is None:
+                    function = getattr(stdlib, function_name, None)
+                    assert isinstance(function, StdLib.Function)
+                    entry = calls[id(node)] = (node, function._compile(node, arguments))
+                ans = entry[1](env, stdlib)
+                ans.expr = node
+                return ans
+            except Error.RuntimeError:
+                raise
+            except Exception as exn:
+                raise Error.EvalError(node, str(exn)) from exn
+
+        return f
+
 
 def _meta_value_to_json(v: Any) -> Any:
     if isinstance(v, Int):
@@ -1,11 +1,13 @@
 # pylint: disable=protected-access,exec-used
 from dataclasses import dataclass, replace
 import math
+import mmap
 import os
+import stat
 import posixpath
 import json
 import tempfile
-from typing import List, Tuple, Dict, Callable, IO, Optional, Union, Any
+from typing import List, Tuple, Dict, Callable, IO, Optional, Union, Any, Iterable, Iterator
 from abc import ABC, abstractmethod
 from contextlib import suppress
 import regex
@@ -58,7 +60,10 @@ class Base:
 
     wdl_version: str
     _write_dir: str  # directory in which write_* functions create files
+    _read_max_bytes: int = 0  # size limit on files read by read_* functions (0 = unlimited)
     eval_context: EvalContext
+    # compiled function applications (see Expr.Apply._compile) bound to this instance's functions
+    _compiled_calls: Dict[int, Tuple["Expr.Apply", "Expr.Compiled"]]
 
     def __init__(
         self, wdl_version: str, write_dir: str = "", *, eval_context: Optional[EvalContext] = None
@@ -66,6 +71,7 @@ class Base:
         self.wdl_version = wdl_version
         self._write_dir = write_dir if write_dir else tempfile.gettempdir()
         self.eval_context = eval_context or EvalContext()
+        self._compiled_calls = {}
 
         # language built-ins
         self._at = _At(self)
@@ -155,16 +161,18 @@ class Base:
             self._read(lambda s: Value.Float(float(s)))
         )
         static([Type.File()], Type.Map((Type.String(), Type.String())), "read_map")(
-            self._read(_parse_map)
+            self._read_lines("read_map", _parse_map)
+        )
+        static([Type.File()], Type.Array(Type.String()), "read_lines")(
+            self._read_lines("read_lines", _parse_lines)
         )
-        static([Type.File()], Type.Array(Type.String()), "read_lines")(self._read(_parse_lines))
         self.read_tsv = _ReadTsv(self)
-        static([Type.File()], Type.Any(), "read_json")(self._read(_parse_json))
+        static([Type.File()], Type.Any(), "read_json")(self._read_json)
         static([Type.File()], Type.Map((Type.String(), Type.String())), "read_object")(
-            self._read(_parse_object)
+            self._read_lines("read_object", _parse_object)
         )
         static([Type.File()], Type.Array(Type.Map((Type.String(), Type.String()))), "read_objects")(
-            self._read(_parse_tsv_objects)
+            self._read_lines("read_objects", _parse_tsv_objects)
         )
 
         # polymorphically typed stdlib functions which require specialized
@@ -206,11 +214,59 @@ class Base:
         "generate read_* function implementation based on parse"
 
         def f(file: Value.File) -> Value.Base:
-            with open(self._devirtualize_filename(file.value), "r") as infile:
+            with open(self._read_filename(file.value), "r") as infile:
                 return parse(infile.read())
 
         return f
 
+    def _read_lines(
+        self, function_name: str, parse: Callable[[Iterable[str]], Value.Base]
+    ) -> Callable[[Value.File], Value.Base]:
+        """
+        generate read_* function implementation based on parse of the file's lines, which are
+        streamed from a memory map instead of reading the whole file into one string
+        """
+
+        def f(file: Value.File) -> Value.Base:
+            return self._read_parsed(
+                file.value, (function_name,), lambda host_path: parse(_mapped_lines(host_path))
+            )
+
+        return f
+
+    def _read_json(self, file: Value.File) -> Value.Base:
+        def parse(host_path: str) -> Value.Base:
+            with open(host_path, "rb") as infile:
+                j = json.load(infile)
+            # (the file contents are freed before we build up the WDL value)
+            return Value.from_json(Type.Any(), j)
+
+        return self._read_parsed(file.value, ("read_json",), parse)
+
+    def _read_parsed(
+        self, filename: str, key: Tuple[Any, ...], parse: Callable[[str], Value.Base]
+    ) -> Value.Base:
+        """
+        Parse a file for a read_* function. ``parse`` receives the host path of ``filename``, and
+        ``key`` identifies the function along with any arguments affecting its result.
+
+        Runtime subclasses may memoize the parsed value for the file & key, returning it to
+        subsequent calls; it must therefore not be mutated.
+        """
+        return parse(self._read_filename(filename))
+
+    def _read_filename(self, filename: str) -> str:
+        # devirtualize filename for read_*, checking its size against _read_max_bytes
+        ans = self._devirtualize_filename(filename)
+        if self._read_max_bytes > 0:
+            size = os.path.getsize(ans)
+            if size > self._read_max_bytes:
+                raise Error.InputError(
+                    f"file size ({size} bytes) exceeds the limit on files read_*() functions may"
+                    f" read ({self._read_max_bytes} bytes): {filename}"
+                )
+        return ans
+
     def _devirtualize_filename(self, filename: str) -> str:
         """
         Convert a File/Directory value to the local host path needed for direct I/O.
@@ -327,6 +383,11 @@ class Function(ABC):
         # Invoke the function, evaluating the arguments as needed
         pass
 
+    def _compile(self, expr: "Expr.Apply", arguments: List["Expr.Compiled"]) -> "Expr.Compiled":
+        # Return a closure invoking the function given the compiled argument expressions (see
+        # Expr.Base.compile). By default, defer to __call__ to evaluate the argument expressions.
+        return lambda env, stdlib: self(expr, env, stdlib)
+
 
 class EagerFunction(Function):
     # Function helper providing boilerplate for eager argument evaluation.
@@ -342,6 +403,12 @@ class EagerFunction(Function):
     ) -> Value.Base:
         return self._call_eager(expr, [arg.eval(env, stdlib=stdlib) for arg in expr.arguments])
 
+    def _compile(self, expr: "Expr.Apply", arguments: List["Expr.Compiled"]) -> "Expr.Compiled":
+        if type(self).__call__ is not EagerFunction.__call__:
+            return super()._compile(expr, arguments)
+        call_eager = self._call_eager
+        return lambda env, stdlib: call_eager(expr, [arg(env, stdlib) for arg in arguments])
+
 
 class StaticFunction(EagerFunction):
     # Function helper for static argument and return types.
@@ -425,13 +492,61 @@ def basename(*args) -> Value.String:
     return Value.String(os.path.basename(path))
 
 
-def _parse_lines(s: str) -> Value.Array:
-    ans: List[Value.Base] = []
-    if s:
-        ans = [
-            Value.String(line.rstrip("\r"))
-            for line in (s[:-1] if s.endswith("\n") else s).split("\n")
-        ]
+_MAPPED_BLOCK_BYTES = 8 << 20
+
+
+def _mapped_lines(filename: str) -> Iterator[str]:
+    """
+    Iterate the lines of the text file (without terminators), decoding it block-by-block through a
+    memory map instead of reading it all into one string. As in text-mode open(), lines may be
+    terminated by \\n, \\r\\n, or \\r.
+    """
+    with open(filename, "rb") as infile:
+        st = os.fstat(infile.fileno())
+        if not stat.S_ISREG(st.st_mode):
+            # e.g. a named pipe, which can't be mapped
+            yield from _lines(
+                infile.read().decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+            )
+            return
+        if not st.st_size:
+            return
+        with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, "madvise"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            # pages already decoded are dropped from the mapping as we go (they remain in the page
+            # cache), so that they don't add up to the file size in our RSS
+            release = hasattr(mm, "madvise") and hasattr(mmap, "MADV_DONTNEED")
+            size = len(mm)
+            pos = 0
+            while pos < size:
+                # take a block of whole lines (including the last one's terminator)
+                end = mm.rfind(b"\n", pos, pos + _MAPPED_BLOCK_BYTES)
+                if end < 0:
+                    end = mm.find(b"\n", pos + _MAPPED_BLOCK_BYTES)
+                end = end + 1 if end >= 0 else size
+                block = mm[pos:end].decode("utf-8")
+                if release:
+                    lo = pos - pos % mmap.PAGESIZE
+                    if end - lo >= mmap.PAGESIZE:
+                        mm.madvise(mmap.MADV_DONTNEED, lo, end - end % mmap.PAGESIZE - lo)
+                pos = end
+                if "\r" in block:
+                    block = block.replace("\r\n", "\n").replace("\r", "\n")
+                yield from (block[:-1] if block.endswith("\n") else block).split("\n")
+
+
+def _lines(s: Union[str, Iterable[str]]) -> Iterable[str]:
+    # lines of the string, or the given lines as-is
+    if not isinstance(s, str):
+        return s
+    if not s:
+        return []
+    return (line.rstrip("\r") for line in (s[:-1] if s.endswith("\n") else s).split("\n"))
+
+
+def _parse_lines(s: Union[str, Iterable[str]]) -> Value.Array:
+    ans: List[Value.Base] = [Value.String(line) for line in _lines(s)]
     return Value.Array(Type.String(), ans)
 
 
@@ -444,39 +559,39 @@ def _parse_boolean(s: str) -> Value.Boolean:
     raise Error.InputError('read_boolean(): file content is not "true" or "false"')
 
 
-def _parse_tsv(s: str) -> Value.Array:
-    ans: List[Value.Base] = [
-        Value.Array(Type.String(), [Value.String(field) for field in line.value.split("\t")])
-        for line in _parse_lines(s).value
-    ]
+def _parse_tsv_row(line: str) -> Value.Array:
+    return Value.Array(Type.String(), [Value.String(field) for field in line.split("\t")])
+
+
+def _parse_tsv(s: Union[str, Iterable[str]]) -> Value.Array:
+    ans: List[Value.Base] = [_parse_tsv_row(line) for line in _lines(s)]
     return Value.Array(Type.Array(Type.String()), ans)
 
 
 def _parse_tsv_objects(
-    s: str,
+    s: Union[str, Iterable[str]],
     *,
     header: bool = True,
     keys: Optional[List[Value.Base]] = None,
     function_name: str = "read_objects",
     filename: Optional[str] = None,
 ) -> Value.Array:
-    strmat = _parse_tsv(s)
+    lines = iter(_lines(s))
     if keys is None:
-        if len(strmat.value) < 1 or len(strmat.value[0].value) < 1:
+        first = next(lines, None)
+        if first is None:
             return Value.Array(Type.Map((Type.String(), Type.String())), [])
-        keys = strmat.value[0].value
-        rows = strmat.value[1:]
-    else:
-        if header and strmat.value and len(strmat.value[0].value) != len(keys):
+        keys = _parse_tsv_row(first).value
+    elif header:
+        first = next(lines, None)
+        columns = len(first.split("\t")) if first is not None else len(keys)
+        if columns != len(keys):
             raise Error.InputError(
-                f"{function_name}(): file header has {len(strmat.value[0].value)} columns, "
+                f"{function_name}(): file header has {columns} columns, "
                 f"but {len(keys)} column names were specified"
                 + (f": {filename}" if filename else "")
             )
-        rows = strmat.value[1:] if header else strmat.value
     assert all(isinstance(key, Value.String) for key in keys)
-    if not keys and not rows:
-        return Value.Array(Type.Map((Type.String(), Type.String())), [])
     literal_keys = set()
     for key in keys:
         if not key.value:
@@ -491,14 +606,15 @@ def _parse_tsv_objects(
             )
         literal_keys.add(key.value)
     maps: List[Value.Base] = []
-    for row in rows:
-        if len(row.value) != len(keys):
+    for line in lines:
+        row = _parse_tsv_row(line).value
+        if len(row) != len(keys):
             raise Error.InputError(f"{function_name}(): file's tab-separated lines are ragged")
-        maps.append(Value.Map((Type.String(), Type.String()), list(zip(keys, row.value))))
+        maps.append(Value.Map((Type.String(), Type.String()), list(zip(keys, row))))
     return Value.Array(Type.Map((Type.String(), Type.String())), maps)
 
 
-def _parse_object(s: str) -> Value.Map:
+def _parse_object(s: Union[str, Iterable[str]]) -> Value.Map:
     maps = _parse_tsv_objects(s)
     if len(maps.value) != 1:
         raise Error.InputError("read_object(): file must have exactly one object")
@@ -507,17 +623,17 @@ def _parse_object(s: str) -> Value.Map:
     return map0
 
 
-def _parse_map(s: str) -> Value.Map:
+def _parse_map(s: Union[str, Iterable[str]]) -> Value.Map:
     keys = set()
-    ans = []
-    for line in _parse_tsv(s).value:
-        assert isinstance(line, Value.Array)
-        if len(line.value) != 2:
+    ans: List[Tuple[Value.Base, Value.Base]] = []
+    for line in _lines(s):
+        fields = line.split("\t")
+        if len(fields) != 2:
             raise Error.InputError("read_map(): each line must have two fields")
-        if line.value[0].value in keys:
+        if fields[0] in keys:
             raise Error.InputError("read_map(): duplicate key")
-        keys.add(line.value[0].value)
-        ans.append((line.value[0], line.value[1]))
+        keys.add(fields[0])
+        ans.append((Value.String(fields[0]), Value.String(fields[1])))
     return Value.Map((Type.String(), Type.String()), ans)
 
 
@@ -813,6 +929,15 @@ class _And(Function):
             return Value.Boolean(False)
         return expr.arguments[1].eval(env, stdlib=stdlib).expect(Type.Boolean())
 
+    def _compile(self, expr: "Expr.Apply", arguments: List["Expr.Compiled"]) -> "Expr.Compiled":
+        lhs, rhs = arguments
+        boolean = Type.Boolean()
+        return lambda env, stdlib: (
+            Value.Boolean(False)
+            if not lhs(env, stdlib).expect(boolean).value
+            else rhs(env, stdlib).expect(boolean)
+        )
+
 
 class _Or(Function):
     # logical || with short-circuit evaluation
@@ -833,6 +958,15 @@ class _Or(Function):
             return Value.Boolean(True)
         return expr.arguments[1].eval(env, stdlib=stdlib).expect(Type.Boolean())
 
+    def _compile(self, expr: "Expr.Apply", arguments: List["Expr.Compiled"]) -> "Expr.Compiled":
+        lhs, rhs = arguments
+        boolean = Type.Boolean()
+        return lambda env, stdlib: (
+            Value.Boolean(True)
+            if lhs(env, stdlib).expect(boolean).value
+            else rhs(env, stdlib).expect(boolean)
+        )
+
 
 class _ArithmeticOperator(EagerFunction):
     # arithmetic infix operators
@@ -862,7 +996,17 @@ class _ArithmeticOperator(EagerFunction):
         return rt
 
     def _call_eager(self, expr: "Expr.Apply", arguments: List[Value.Base]) -> Value.Base:
+        return self._apply(self.infer_type(expr), expr, arguments)
+
+    def _compile(self, expr: "Expr.Apply", arguments: List["Expr.Compiled"]) -> "Expr.Compiled":
+        # the result type follows from the operand types, so needn't be inferred upon each call
         ans_type = self.infer_type(expr)
+        apply = self._apply
+        return lambda env, stdlib: apply(ans_type, expr, [arg(env, stdlib) for arg in arguments])
+
+    def _apply(
+        self, ans_type: Type.Base, expr: "Expr.Apply", arguments: List[Value.Base]
+    ) -> Value.Base:
         ans = self.op(arguments[0].coerce(ans_type).value, arguments[1].coerce(ans_type).value)
         if isinstance(ans_type, Type.Int):
             assert isinstance(ans, int)
@@ -877,8 +1021,9 @@ class _DivisionOperator(_ArithmeticOperator):
     def __init__(self) -> None:
         super().__init__("/", lambda l, r: l // r)
 
-    def _call_eager(self, expr: "Expr.Apply", arguments: List[Value.Base]) -> Value.Base:
-        ans_type = self.infer_type(expr)
+    def _apply(
+        self, ans_type: Type.Base, expr: "Expr.Apply", arguments: List[Value.Base]
+    ) -> Value.Base:
         lhs = arguments[0].coerce(ans_type).value
         rhs = arguments[1].coerce(ans_type).value
         if isinstance(ans_type, Type.Float):
@@ -896,8 +1041,9 @@ class _ExponentiationOperator(_ArithmeticOperator):
     def __init__(self) -> None:
         super().__init__("**", lambda l, r: l**r)
 
-    def _call_eager(self, expr: "Expr.Apply", arguments: List[Value.Base]) -> Value.Base:
-        ans_type = self.infer_type(expr)
+    def _apply(
+        self, ans_type: Type.Base, expr: "Expr.Apply", arguments: List[Value.Base]
+    ) -> Value.Base:
         lhs = arguments[0].coerce(ans_type).value
         rhs = arguments[1].coerce(ans_type).value
         if isinstance(ans_type, Type.Int) and rhs < 0:
@@ -935,10 +1081,11 @@ class _AddOperator(_ArithmeticOperator):
             )
         return Type.String()
 
-    def _call_eager(self, expr: "Expr.Apply", arguments: List[Value.Base]) -> Value.Base:
-        ans_type = self.infer_type(expr)
+    def _apply(
+        self, ans_type: Type.Base, expr: "Expr.Apply", arguments: List[Value.Base]
+    ) -> Value.Base:
         if not isinstance(ans_type, Type.String):
-            return super()._call_eager(expr, arguments)
+            return super()._apply(ans_type, expr, arguments)
         ans = self.op(
             str(arguments[0].coerce(Type.String()).value),
             str(arguments[1].coerce(Type.String()).value),
@@ -963,10 +1110,12 @@ class _InterpolationAddOperator(_AddOperator):
             else super().infer_type(expr)
         )
 
-    def _call_eager(self, expr: "Expr.Apply", arguments: List[Value.Base]) -> Value.Base:
+    def _apply(
+        self, ans_type: Type.Base, expr: "Expr.Apply", arguments: List[Value.Base]
+    ) -> Value.Base:
         if sum(1 for arg in arguments if isinstance(arg, Value.Null)):
             return Value.Null()
-        return super()._call_eager(expr, arguments)
+        return super()._apply(ans_type, expr, arguments)
 
 
 class _EqualityOperator(EagerFunction):
@@ -1170,22 +1319,33 @@ class _ReadTsv(EagerFunction):
     def _call_eager(self, expr: "Expr.Apply", arguments: List[Value.Base]) -> Value.Base:
         file = arguments[0].coerce(Type.File())
         assert isinstance(file, Value.File)
-        with open(self.stdlib._devirtualize_filename(file.value), "r") as infile:
-            contents = infile.read()
         if len(arguments) == 1:
-            return _parse_tsv(contents)
+            return self.stdlib._read_parsed(
+                file.value, ("read_tsv",), lambda host_path: _parse_tsv(_mapped_lines(host_path))
+            )
         header = arguments[1].coerce(Type.Boolean())
         assert isinstance(header, Value.Boolean)
         if len(arguments) == 2:
-            return _parse_tsv_objects(contents, function_name="read_tsv", filename=file.value)
+            return self.stdlib._read_parsed(
+                file.value,
+                ("read_tsv", True),
+                lambda host_path: _parse_tsv_objects(
+                    _mapped_lines(host_path), function_name="read_tsv", filename=file.value
+                ),
+            )
         keys = arguments[2].coerce(Type.Array(Type.String()))
         assert isinstance(keys, Value.Array)
-        return _parse_tsv_objects(
-            contents,
-            header=header.value,
-            keys=[key.coerce(Type.String()) for key in keys.value],
-            function_name="read_tsv",
-            filename=file.value,
+        key_strings = [key.coerce(Type.String()) for key in keys.value]
+        return self.stdlib._read_parsed(
+            file.value,
+            ("read_tsv", header.value, tuple(str(key.value) for key in key_strings)),
+            lambda host_path: _parse_tsv_objects(
+                _mapped_lines(host_path),
+                header=header.value,
+                keys=key_strings,
+                function_name="read_tsv",
+                filename=file.value,
+            ),
         )
 
 
@@ -31,7 +31,7 @@ from typing import (
 )
 from abc import ABC, abstractmethod
 from .Error import SourcePosition, SourceNode
-from . import Type, Expr, Env, Error, StdLib, Value, _parser, _util
+from . import Type, Expr, Env, Error, StdLib, Value, _parser, _util, _load_cache
 from ._util import WDLVersion, wdl_version_geq
 
 
@@ -1526,7 +1526,8 @@ class Document(SourceNode):
             yield self.workflow
 
     def typecheck(self, check_quant: bool = True) -> None:
-        """Typecheck each task in the document, then the workflow, if any.
+        """Typecheck each task in the document, then the workflow, if any. Then evaluate their
+        constant expressions in advance (see :attr:`WDL.Expr.Base.literal`).
 
         Documents returned by :func:`~WDL.load` have already been typechecked."""
         names = set()
@@ -1566,6 +1567,7 @@ class Document(SourceNode):
                     "Workflow name collides with a task also named " + self.workflow.name,
                 )
             self.workflow.typecheck(self, check_quant=check_quant)
+        _fold_constants(self)
 
 
 async def resolve_file_import(uri: str, path: List[str], importer: Optional[Document]) -> str:
@@ -1616,58 +1618,156 @@ async def _load_async(
     ] = None,
     import_max_depth: int = 10,
     importer: Optional[Document] = None,
+    cache_dir: Optional[str] = None,
+    cache_max_bytes: int = _load_cache.DEFAULT_MAX_BYTES,
 ) -> Document:
     path = list(path) if path is not None else []
     read_source = read_source or read_source_default
     uri = uri if uri != "-" else "/dev/stdin"
     read_rslt = await read_source(uri, path, importer)
-    # parse the document
-    try:
-        doc = _parser.parse_document(read_rslt.source_text, uri=uri, abspath=read_rslt.abspath)
-    except Exception as exn:
-        setattr(exn, "source_text", read_rslt.source_text)
-        raise
-    assert doc.pos.uri == uri and doc.pos.abspath.endswith(os.path.basename(doc.pos.uri))
-    # recursively descend into document's imports, and store the imported
-    # documents into doc.imports
-    # TODO: are we supposed to do something smart for relative imports
-    #       within a document loaded by URI?
-    # TODO: concurrent imports
-    for i in range(len(doc.imports)):
-        imp = doc.imports[i]
-        if import_max_depth <= 1:
+    if cache_dir:
+        # look for a previously cached copy of the whole document tree
+        cache_key = _load_cache.entry_key(
+            uri, read_rslt.abspath, read_rslt.source_text, check_quant
+        )
+        cached = _load_cache.get(cache_dir, cache_key)
+        if cached and await _load_cache.validate(cached, path, read_source):
+            return cached
+    doc = await _DocumentLoader(path, check_quant, read_source).load(
+        uri, read_rslt, import_max_depth
+    )
+    if cache_dir:
+        _load_cache.put(cache_dir, cache_key, doc, max_bytes=cache_max_bytes)
+    return doc
+
+
+class _DocumentLoader:
+    """
+    State for loading a document and its transitive imports. Each document's imports are read &
+    loaded concurrently, and a document imported from several places (identified by its resolved
+    abspath) is parsed & typechecked only once, the resulting Document object being shared. (So
+    such a document has no one importing document; see ``WDL.Walker.SetParents``.)
+    """
+
+    path: List[str]
+    check_quant: bool
+    read_source: Callable[[str, List[str], Optional[Document]], Awaitable[ReadSourceResult]]
+    # abspath => eventual Document (done or in progress)
+    documents: Dict[str, "asyncio.Future[Document]"]
+    # abspath of a document in progress => abspaths of the imports it's awaiting (with the number
+    # of its imports awaiting each, as it may import the same document more than once); a cycle in
+    # this graph would be a deadlock, so we check for one before awaiting an in-progress document
+    awaiting: Dict[str, Dict[str, int]]
+
+    def __init__(
+        self,
+        path: List[str],
+        check_quant: bool,
+        read_source: Callable[[str, List[str], Optional[Document]], Awaitable[ReadSourceResult]],
+    ) -> None:
+        self.path = path
+        self.check_quant = check_quant
+        self.read_source = read_source
+        self.documents = {}
+        self.awaiting = {}
+
+    async def load(self, uri: str, read_rslt: ReadSourceResult, import_max_depth: int) -> Document:
+        future = asyncio.get_running_loop().create_future()
+        self.documents[read_rslt.abspath] = future
+        try:
+            doc = await self._load(uri, read_rslt, import_max_depth)
+            future.set_result(doc)
+            return doc
+        except Exception as exn:
+            future.set_exception(exn)
+            future.exception()  # (suppress warning if no other importer awaits it)
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+
+    async def _load(self, uri: str, read_rslt: ReadSourceResult, import_max_depth: int) -> Document:
+        # parse the document
+        try:
+            doc = _parser.parse_document(read_rslt.source_text, uri=uri, abspath=read_rslt.abspath)
+        except Exception as exn:
+            setattr(exn, "source_text", read_rslt.source_text)
+            raise
+        assert doc.pos.uri == uri and doc.pos.abspath.endswith(os.path.basename(doc.pos.uri))
+        # recursively descend into document's imports, and store the imported
+        # documents into doc.imports
+        # TODO: are we supposed to do something smart for relative imports
+        #       within a document loaded by URI?
+        if doc.imports and import_max_depth <= 1:
             raise Error.ImportError(
-                imp.pos, imp.uri, "exceeded import_max_depth; circular imports?"
+                doc.imports[0].pos, doc.imports[0].uri, "exceeded import_max_depth"
             )
-        try:
-            subdoc = await _load_async(
-                imp.uri,
-                path=path,
-                check_quant=check_quant,
-                read_source=read_source,
-                importer=doc,
-                import_max_depth=(import_max_depth - 1),
+        subdocs = await asyncio.gather(
+            *(self._import(doc, imp, import_max_depth - 1) for imp in doc.imports),
+            return_exceptions=True,
+        )
+        for i, subdoc in enumerate(subdocs):
+            if isinstance(subdoc, BaseException):
+                raise subdoc  # the first failure in import order
+            imp = doc.imports[i]
+            doc.imports[i] = DocImport(
+                pos=imp.pos, uri=imp.uri, namespace=imp.namespace, aliases=imp.aliases, doc=subdoc
             )
+        try:
+            doc.typecheck(check_quant=self.check_quant)
+        except Error.ValidationError as exn:
+            exn.source_text = read_rslt.source_text
+            exn.declared_wdl_version = doc.wdl_version
+            raise
+        except Error.MultipleValidationErrors as multi:
+            for exn1 in multi.exceptions:
+                if not exn1.source_text:
+                    exn1.source_text = read_rslt.source_text
+                    exn1.declared_wdl_version = doc.wdl_version
+            multi.source_text = read_rslt.source_text
+            multi.declared_wdl_version = doc.wdl_version
+            raise multi
+        return doc
+
+    async def _import(self, importer: Document, imp: DocImport, import_max_depth: int) -> Document:
+        try:
+            read_rslt = await self.read_source(imp.uri, self.path, importer)
+            abspath = read_rslt.abspath
+            future = self.documents.get(abspath, None)
+            if future and future.done():
+                return future.result()
+            if future and self._reaches(abspath, importer.pos.abspath):
+                raise Error.ImportError(imp.pos, imp.uri, "circular import")
+            awaiting = self.awaiting.setdefault(importer.pos.abspath, {})
+            awaiting[abspath] = awaiting.get(abspath, 0) + 1
+            try:
+                if not future:
+                    return await self.load(imp.uri, read_rslt, import_max_depth)
+                await asyncio.wait([future])
+                return future.result()
+            finally:
+                awaiting[abspath] -= 1
+                if not awaiting[abspath]:
+                    del awaiting[abspath]
+        except Error.ImportError as exn:
+            if exn.pos is imp.pos:
+                raise
+            raise Error.ImportError(imp.pos, imp.uri) from exn
         except Exception as exn:
             raise Error.ImportError(imp.pos, imp.uri) from exn
-        doc.imports[i] = DocImport(
-            pos=imp.pos, uri=imp.uri, namespace=imp.namespace, aliases=imp.aliases, doc=subdoc
-        )
-    try:
-        doc.typecheck(check_quant=check_quant)
-    except Error.ValidationError as exn:
-        exn.source_text = read_rslt.source_text
-        exn.declared_wdl_version = doc.wdl_version
-        raise
-    except Error.MultipleValidationErrors as multi:
-        for exn1 in multi.exceptions:
-            if not exn1.source_text:
-                exn1.source_text = read_rslt.source_text
-                exn1.declared_wdl_version = doc.wdl_version
-        multi.source_text = read_rslt.source_text
-        multi.declared_wdl_version = doc.wdl_version
-        raise multi
-    return doc
+
+    def _reaches(self, src: str, dst: str) -> bool:
+        # whether the in-progress document src is (transitively) awaiting dst
+        visited = set()
+        queue = [src]
+        while queue:
+            node = queue.pop()
+            if node == dst:
+                return True
+            if node not in visited:
+                visited.add(node)
+                queue.extend(self.awaiting.get(node, ()))
+        return False
 
 
 def _load(
@@ -1679,6 +1779,8 @@ def _load(
     ] = None,
     import_max_depth: int = 10,
     importer: Optional[Document] = None,
+    cache_dir: Optional[str] = None,
+    cache_max_bytes: int = _load_cache.DEFAULT_MAX_BYTES,
 ) -> Document:
     return asyncio.run(
         _load_async(
@@ -1688,6 +1790,8 @@ def _load(
             check_quant=check_quant,
             read_source=read_source,
             import_max_depth=import_max_depth,
+            cache_dir=cache_dir,
+            cache_max_bytes=cache_max_bytes,
         )
     )
 
@@ -2146,6 +2250,70 @@ def _check_serializable_map_keys(t: Type.Base, name: str, node: SourceNode) -> N
         _check_serializable_map_keys(p, name, node)
 
 
+# Standard library functions whose results depend only on their argument values, and which may
+# therefore be applied to constant arguments in advance. Excludes functions doing file I/O, and
+# range() & ** which could take unbounded time/memory even given small literal arguments.
+_PURE_FUNCTIONS = frozenset(
+    (
+        "_at _land _lor _negate _add _interpolation_add _sub _mul _div _rem _eqeq _neq _lt _lte"
+        " _gt _gte floor ceil round length sub find matches basename defined sep prefix suffix"
+        " select_first select_all zip unzip cross flatten transpose min max quote squote keys"
+        " as_map as_pairs collect_by_key contains chunk values contains_key"
+    ).split()
+)
+
+
+def _fold_constants(doc: Document) -> None:
+    # Post-typecheck pass evaluating the constant subexpressions in the document's tasks & workflow
+    # (imported documents having been folded upon their own typecheck), attaching each value to
+    # its node for Expr.Base to reuse on every evaluation.
+    exes: List[Union[Task, Workflow]] = list(doc.tasks)
+    if doc.workflow:
+        exes.append(doc.workflow)
+    for exe in exes:
+        stdlib = StdLib.Base(exe.effective_wdl_version)
+        nodes: List[SourceNode] = list(exe.children)
+        while nodes:
+            node = nodes.pop()
+            if isinstance(node, Expr.Base):
+                _fold_expr(node, stdlib, isinstance(node, Expr.TaskCommand))
+            else:
+                nodes.extend(node.children)
+
+
+def _fold_expr(expr: Expr.Base, stdlib: StdLib.Base, command: bool) -> bool:
+    # Fold the constant subexpressions of expr, returning whether expr is itself constant. Within
+    # the task command, placeholders aren't folded since their values must also be checked against
+    # [task_runtime] placeholder_regex.
+    constant = True
+    for ch in expr.children:
+        assert isinstance(ch, Expr.Base)
+        constant = _fold_expr(ch, stdlib, command) and constant
+    if (
+        not constant
+        or isinstance(expr, (Expr.Ident, Expr._LeftName, Expr.TaskCommand))
+        or (command and isinstance(expr, Expr.Placeholder))
+        or (isinstance(expr, Expr.Apply) and expr.function_name not in _PURE_FUNCTIONS)
+        # File & Directory values may be relative paths, resolved depending on where they're used
+        or _type_has_paths(expr.type)
+    ):
+        return False
+    try:
+        expr._folded = expr.eval(Env.Bindings(), stdlib)
+    except Exception:
+        # leave any error to be raised upon evaluation at runtime
+        return False
+    return True
+
+
+def _type_has_paths(t: Type.Base) -> bool:
+    if isinstance(t, (Type.File, Type.Directory)):
+        return True
+    if isinstance(t, Type.Object):
+        return any(_type_has_paths(mt) for mt in t.members.values())
+    return any(_type_has_paths(p) for p in t.parameters)
+
+
 def _describe_struct_types(exe: Union[Task, Workflow]) -> Dict[str, str]:
     """
     Traverse the task/workflow AST to find all struct types used; produce a mapping from struct
@@ -62,6 +62,7 @@ class Base(ABC):
     """The "raw" Python value"""
 
     _expr: "Optional[Expr.Base]"
+    _digest: Optional[bytes] = None
 
     def __init__(self, type: Type.Base, value: Any, expr: "Optional[Expr.Base]" = None) -> None:
         assert isinstance(type, Type.Base)
@@ -138,6 +139,29 @@ class Base(ABC):
     def children(self) -> "Iterable[Base]":
         return []
 
+    @property
+    def digest(self) -> bytes:
+        """
+        SHA-256 digest of the value, computed from the digests of any child values (Merkle-style).
+        It's remembered on first use, so the value mustn't be modified in-place thereafter; and
+        it's reused wherever the same value object is passed along (e.g. an array shared among
+        many calls).
+
+        Like the value's JSON representation, the digest doesn't depend on the order of struct
+        members or map entries, nor on the value's expression or the item types of an array. But
+        it does distinguish e.g. a ``File`` from a ``String`` with the same text.
+        """
+        ans = self._digest
+        if ans is None:
+            hasher = hashlib.sha256(self.__class__.__name__.encode() + b"\0")
+            for part in self._digest_parts():
+                hasher.update(part)
+            ans = self._digest = hasher.digest()
+        return ans
+
+    def _digest_parts(self) -> Iterable[bytes]:
+        return (json.dumps(self.value).encode("utf-8"),)
+
 
 class Boolean(Base):
     """``value`` has Python type ``bool``"""
@@ -196,6 +220,9 @@ class String(Base):
             raise Error.EvalError(self.expr, msg) if self.expr else Error.RuntimeError(msg)
         return super().coerce(desired_type)
 
+    def _digest_parts(self) -> Iterable[bytes]:
+        return (self.value.encode("utf-8", "surrogatepass"),)
+
 
 class File(String):
     """``value`` has Python type ``str``"""
@@ -243,6 +270,9 @@ class Array(Base):
     def children(self) -> Iterable[Base]:
         return self.value
 
+    def _digest_parts(self) -> Iterable[bytes]:
+        return (item.digest for item in self.value)
+
     def coerce(self, desired_type: Optional[Type.Base] = None) -> Base:
         """"""
         if isinstance(desired_type, Type.Array):
@@ -304,6 +334,9 @@ class Map(Base):
             yield k
             yield v
 
+    def _digest_parts(self) -> Iterable[bytes]:
+        return sorted(k.digest + v.digest for k, v in self.value)
+
     def coerce(self, desired_type: Optional[Type.Base] = None) -> Base:
         """"""
         if isinstance(desired_type, Type.Map) and desired_type != self.type:
@@ -391,6 +424,9 @@ class Pair(Base):
         yield self.value[0]
         yield self.value[1]
 
+    def _digest_parts(self) -> Iterable[bytes]:
+        return (self.value[0].digest, self.value[1].digest)
+
     def coerce(self, desired_type: Optional[Type.Base] = None) -> Base:
         """"""
         if isinstance(desired_type, Type.Pair) and desired_type != self.type:
@@ -573,6 +609,10 @@ class Struct(Base):
     def children(self) -> Iterable[Base]:
         return self.value.values()
 
+    def _digest_parts(self) -> Iterable[bytes]:
+        for k in sorted(self.value):
+            yield k.encode("utf-8") + b"\0" + self.value[k].digest
+
 
 def from_json(type: Type.Base, value: Any) -> Base:
     """
@@ -723,6 +763,7 @@ def rewrite_paths(v: Base, f: Callable[[Union[File, Directory]], Optional[str]])
 
     def map_paths(w: Base) -> Base:
         w = copy.copy(w)
+        w._digest = None
         if isinstance(w, (File, Directory)):
             fw = f(w)
             if fw is None:
@@ -1,5 +1,5 @@
 # pylint: disable=assignment-from-no-return
-from typing import Any, List, Optional
+from typing import Any, List, Optional, Set
 from . import Error, Expr, Tree, Type
 
 
@@ -31,12 +31,24 @@ class Base:
 
     auto_descend: bool
     descend_imports: bool
+    # ids of imported documents visited so far in the current traversal: a document imported from
+    # several places is one shared object, which should be visited only once
+    _visited_documents: Optional[Set[int]] = None
 
     def __init__(self, auto_descend: bool = False, descend_imports: bool = True) -> None:
         self.auto_descend = auto_descend
         self.descend_imports = descend_imports
 
     def __call__(self, obj: Error.SourceNode, descend: Optional[bool] = None) -> Any:
+        if self._visited_documents is not None:
+            return self._call(obj, descend)
+        self._visited_documents = set()
+        try:
+            return self._call(obj, descend)
+        finally:
+            self._visited_documents = None
+
+    def _call(self, obj: Error.SourceNode, descend: Optional[bool]) -> Any:
         ans = None
         if isinstance(obj, Tree.Document):
             ans = self.document(obj)
@@ -64,16 +76,27 @@ class Base:
             descend = self.auto_descend
         if descend:
             for ch in obj.children:
-                if not isinstance(ch, Tree.Document) or self.descend_imports:
+                if self._should_descend(ch):
                     self(ch)
         return ans
 
     def _descend(self, obj: Error.SourceNode) -> Any:
         if not self.auto_descend:
             for ch in obj.children:
-                if not isinstance(ch, Tree.Document) or self.descend_imports:
+                if self._should_descend(ch):
                     self(ch)
 
+    def _should_descend(self, ch: Error.SourceNode) -> bool:
+        if not isinstance(ch, Tree.Document):
+            return True
+        if not self.descend_imports:
+            return False
+        if self._visited_documents is not None:
+            if id(ch) in self._visited_documents:
+                return False
+            self._visited_documents.add(id(ch))
+        return True
+
     def document(self, obj: Tree.Document) -> Any:
         self._descend(obj)
 
@@ -165,7 +188,9 @@ class SetParents(Base):
     """
     Add ``parent`` to each node.
 
-    On Document, the document which imports this document (None at top level)
+    On Document, the document which imports this document (None at top level). A document
+    imported from several places is one shared object, whose parent is the first of its importers
+    visited (in import order, depth-first).
 
     On Workflow and Task, the containing document.
 
@@ -183,7 +208,9 @@ class SetParents(Base):
         super().document(obj)
         obj.parent = None
         for imp in obj.imports:
-            if imp.doc:
+            # (the imported document was just visited, setting its parent to None, unless it was
+            # already visited through an earlier importer)
+            if imp.doc and getattr(imp.doc, "parent", None) is None:
                 imp.doc.parent = obj
         for stb in obj.struct_typedefs:
             stb.value.parent = obj
@@ -11,7 +11,7 @@ documents. Simply ``import WDL`` once miniwdl has been installed.
 import sys
 import os
 from typing import List, Optional, Callable, Dict, Any, Awaitable, Union
-from . import _util, _parser, Error, Type, Value, Env, Expr, Tree, Walker
+from . import _util, _parser, _load_cache, Error, Type, Value, Env, Expr, Tree, Walker
 from .Tree import (  # noqa: F401
     Decl,
     StructTypeDef,
@@ -40,6 +40,8 @@ def load(
         Callable[[str, List[str], Optional[Document]], Awaitable["ReadSourceResult"]]
     ] = None,
     import_max_depth: int = 10,
+    cache_dir: Optional[str] = None,
+    cache_max_bytes: int = _load_cache.DEFAULT_MAX_BYTES,
 ) -> Document:
     """
     Parse a WDL document given filename/URI, recursively descend into imported documents, then typecheck the tasks and
@@ -58,6 +60,12 @@ def load(
     :param import_max_depth:
         to prevent recursive import infinite loops, fail when there are too many import nesting levels (default 10)
 
+    :param cache_dir:
+        directory in which to cache the parsed & typechecked document, speeding up subsequent loads of the same
+        document so long as neither it nor any of its transitive imports have changed. Disabled by default.
+
+    :param cache_max_bytes: size limit for ``cache_dir``, enforced by evicting the least-recently-used entries
+
     :raises WDL.Error.SyntaxError: when the document is syntactically invalid under the WDL grammar
     :raises WDL.Error.ValidationError:
         when the document is syntactically OK, but fails typechecking or other static validity checks
@@ -72,6 +80,8 @@ def load(
         check_quant=check_quant,
         read_source=read_source,
         import_max_depth=import_max_depth,
+        cache_dir=cache_dir,
+        cache_max_bytes=cache_max_bytes,
     )
     Walker.SetParents()(doc)
     return doc
@@ -85,6 +95,8 @@ async def load_async(
         Callable[[str, List[str], Optional[Document]], Awaitable["ReadSourceResult"]]
     ] = None,
     import_max_depth: int = 10,
+    cache_dir: Optional[str] = None,
+    cache_max_bytes: int = _load_cache.DEFAULT_MAX_BYTES,
 ) -> Document:
     """
     Async version of :func:`load`, with all the same arguments
@@ -95,6 +107,8 @@ async def load_async(
         check_quant=check_quant,
         read_source=read_source,
         import_max_depth=import_max_depth,
+        cache_dir=cache_dir,
+        cache_max_bytes=cache_max_bytes,
     )
     Walker.SetParents()(doc)
     return doc
@@ -0,0 +1,140 @@
+"""
+Optional on-disk cache of parsed & typechecked documents, for :func:`WDL.load` with ``cache_dir``
+
+Each entry is a pickled :class:`WDL.Tree.Document` (with its imported documents), stored under a
+key digesting the top-level document's URI & source text, the ``check_quant`` setting, and a
+fingerprint of the miniwdl code itself. Since the key can't cover the imports without parsing the
+document, a retrieved entry is validated by re-reading each transitive import (with the same
+``read_source`` routine) and checking that it still resolves to the same absolute path & source
+text as when the entry was stored. The cache directory is kept under a size limit by evicting the
+least-recently-used entries.
+"""
+
+import os
+import sys
+import glob
+import pickle
+import hashlib
+import tempfile
+import functools
+from contextlib import suppress
+from typing import Optional, List, Callable, Awaitable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .Tree import Document, ReadSourceResult
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+_SUFFIX = ".wdl.pickle"
+
+
+@functools.lru_cache(maxsize=1)
+def _code_fingerprint() -> str:
+    # identify the miniwdl version by digesting the names, sizes & mtimes of its own source files
+    # (which also covers development trees whose version number doesn't change)
+    hasher = hashlib.sha256(f"{sys.version} {pickle.HIGHEST_PROTOCOL}".encode())
+    pkg_dir = os.path.dirname(__file__)
+    for fn in sorted(glob.glob(os.path.join(pkg_dir, "**", "*.py"), recursive=True)):
+        st = os.stat(fn)
+        hasher.update(f"{os.path.relpath(fn, pkg_dir)} {st.st_size} {st.st_mtime_ns}\n".encode())
+    return hasher.hexdigest()
+
+
+def entry_key(uri: str, abspath: str, source_text: str, check_quant: bool) -> str:
+    """
+    Cache key for the top-level document (not covering its imports; see :func:`validate`)
+    """
+    hasher = hashlib.sha256(_code_fingerprint().encode())
+    for item in (uri, abspath, str(check_quant)):
+        hasher.update(b"\0" + item.encode())
+    hasher.update(b"\0" + source_text.encode())
+    return hasher.hexdigest()
+
+
+def get(cache_dir: str, key: str) -> "Optional[Document]":
+    """
+    Load the cached document, if any (to be validated before use)
+    """
+    fn = os.path.join(cache_dir, key + _SUFFIX)
+    try:
+        with open(fn, "rb") as infile:
+            doc = pickle.load(infile)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # corrupt or incompatible entry
+        with suppress(FileNotFoundError):
+            os.unlink(fn)
+        return None
+    # update mtime for LRU eviction
+    with suppress(FileNotFoundError):
+        os.utime(fn)
+    return doc
+
+
+async def validate(
+    doc: "Document",
+    path: List[str],
+    read_source: "Callable[[str, List[str], Optional[Document]], Awaitable[ReadSourceResult]]",
+) -> bool:
+    """
+    Check that each of the cached document's transitive imports still resolves to the same file
+    with the same source text
+    """
+    for imp in doc.imports:
+        assert imp.doc
+        try:
+            read_rslt = await read_source(imp.uri, path, doc)
+        except Exception:
+            return False
+        if (
+            read_rslt.abspath != imp.doc.pos.abspath
+            or read_rslt.source_text != imp.doc.source_text
+            or not await validate(imp.doc, path, read_source)
+        ):
+            return False
+    return True
+
+
+def put(cache_dir: str, key: str, doc: "Document", max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+    """
+    Store the document in the cache (best-effort: failure to pickle or write is ignored), then
+    evict least-recently-used entries if needed to bring the directory under max_bytes.
+    """
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=cache_dir, prefix="." + key, suffix=".tmp", delete=False
+        ) as outfile:
+            try:
+                pickle.dump(doc, outfile, protocol=pickle.HIGHEST_PROTOCOL)
+            except BaseException:
+                outfile.close()
+                os.unlink(outfile.name)
+                raise
+        # atomically publish the complete entry
+        os.replace(outfile.name, os.path.join(cache_dir, key + _SUFFIX))
+    except Exception:
+        return
+    evict(cache_dir, max_bytes)
+
+
+def evict(cache_dir: str, max_bytes: int) -> None:
+    """
+    Delete least-recently-used entries until the total size of the cache is at most max_bytes
+    """
+    entries = []
+    total = 0
+    with suppress(FileNotFoundError), os.scandir(cache_dir) as it:
+        for entry in it:
+            if entry.name.endswith(_SUFFIX):
+                with suppress(FileNotFoundError):
+                    st = entry.stat()
+                    entries.append((st.st_mtime_ns, st.st_size, entry.path))
+                    total += st.st_size
+    entries.sort()
+    for _mtime, size, fn in entries:
+        if total <= max_bytes:
+            break
+        with suppress(FileNotFoundError):
+            os.unlink(fn)
+        total -= size
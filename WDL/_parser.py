@@ -1,40 +1,86 @@
+import os
+import sys
 import inspect
+import hashlib
 import threading
 import regex
-from typing import List, Optional, Set, Tuple, Any, Union
+from typing import List, Optional, Set, Tuple, Any, Union, Dict
 import lark
 from .Error import SourcePosition
 from . import Error, Tree, Type, Expr, _grammar
 from ._util import WDLVersion, wdl_version_geq
 
 # memoize Lark parsers constructed for version & start symbol
-_lark_cache = {}
-_lark_comments_buffer: List[lark.Token] = []
-_lark_lock = threading.Lock()
+_lark_cache: Dict[Tuple[str, str], lark.Lark] = {}
+_lark_cache_lock = threading.Lock()
+# The memoized parsers are shared by all threads, but each thread parsing collects comments into
+# its own buffer (the memoized parsers' lexer_callbacks append to the current thread's)
+_lark_comments = threading.local()
+
+
+def _lark_comment(token: lark.Token) -> None:
+    _lark_comments.buffer.append(token)
+
+
+# Directory in which to cache the LALR parser tables across processes (None = disabled). Opt-in: set
+# by environment variable MINIWDL_PARSER_CACHE, or by the CLI from configuration option
+# [load_cache] parser_dir. Takes effect for parsers not yet memoized in this process.
+tables_cache_dir: Optional[str] = os.environ.get("MINIWDL_PARSER_CACHE", None) or None
+
+
+def _lark_tables_filename(grammar: str, start: str) -> Optional[str]:
+    """
+    Filename under which to cache the LALR tables for the grammar & start symbol, so that new
+    processes can skip constructing them; or None if tables_cache_dir isn't set.
+    """
+    cache_dir = tables_cache_dir
+    if not cache_dir:
+        return None
+    # include a digest of the grammar in the filename, so that different grammars (WDL versions)
+    # and Lark/Python versions don't clobber each other
+    digest = hashlib.sha256(
+        f"{grammar}\0{start}\0{lark.__version__}\0{sys.version_info[:2]}".encode()
+    ).hexdigest()
+    return os.path.join(cache_dir, f"lark_{start}_{digest[:32]}.tables")
+
+
+def _lark_parser(grammar: str, start: str) -> lark.Lark:
+    tables_fn = _lark_tables_filename(grammar, start)
+    if tables_fn:
+        try:
+            os.makedirs(os.path.dirname(tables_fn), exist_ok=True)
+        except OSError:
+            tables_fn = None
+    # Lark loads the tables from tables_fn if it exists and is valid; otherwise, constructs them
+    # and (over)writes the file. Lark validates the file against its own digest of the grammar &
+    # options, so a partial file, written concurrently by another process, just gets rebuilt.
+    return lark.Lark(
+        grammar,
+        start=start,
+        parser="lalr",
+        maybe_placeholders=False,
+        propagate_positions=True,
+        lexer_callbacks={"COMMENT": _lark_comment},
+        cache=tables_fn or False,
+    )
 
 
 def parse(grammar: str, txt: str, start: str) -> Tuple[lark.Tree, List[lark.Token]]:
-    with _lark_lock:
-        assert not _lark_comments_buffer
-        try:
+    parser = _lark_cache.get((grammar, start), None)
+    if parser is None:
+        with _lark_cache_lock:
             if (grammar, start) not in _lark_cache:
-                _lark_cache[(grammar, start)] = lark.Lark(
-                    grammar,
-                    start=start,
-                    parser="lalr",
-                    maybe_placeholders=False,
-                    propagate_positions=True,
-                    lexer_callbacks={"COMMENT": _lark_comments_buffer.append},
-                )
-            tree = _lark_cache[(grammar, start)].parse(
-                txt + ("\n" if not txt.endswith("\n") else "")
-            )
-            comments = _lark_comments_buffer.copy()
-            return (tree, comments)
-        finally:
-            # Wipe temp state (success or fail). It receives the side-effects of lark's
-            # lexer_callbacks, which we have to bind before memoizing the parser object.
-            _lark_comments_buffer.clear()
+                _lark_cache[(grammar, start)] = _lark_parser(grammar, start)
+            parser = _lark_cache[(grammar, start)]
+    # Fresh buffer for this parse (success or fail), receiving the side-effects of the parser's
+    # lexer_callbacks
+    comments: List[lark.Token] = []
+    _lark_comments.buffer = comments
+    try:
+        tree = parser.parse(txt + ("\n" if not txt.endswith("\n") else ""))
+        return (tree, comments)
+    finally:
+        _lark_comments.buffer = None
 
 
 def to_int(x):
@@ -11,6 +11,7 @@ import fcntl
 import shutil
 import uuid
 import decimal
+import re
 from time import sleep
 from datetime import datetime
 from enum import IntEnum
@@ -690,6 +691,54 @@ def path_really_within(lhs: str, rhs: str) -> bool:
     return len(lhs_cmp) >= len(rhs_cmp) and lhs_cmp[: len(rhs_cmp)] == rhs_cmp
 
 
+# filesystem types (per /proc/mounts) shared over the network among hosts
+_NETWORK_FILESYSTEMS = {
+    "nfs",
+    "nfs4",
+    "cifs",
+    "smb3",
+    "smbfs",
+    "afs",
+    "lustre",
+    "gpfs",
+    "beegfs",
+    "ceph",
+    "glusterfs",
+    "fuse.glusterfs",
+    "fuse.sshfs",
+    "9p",
+}
+
+
+@export
+def network_filesystem(path: str, mounts: str = "/proc/self/mounts") -> Optional[str]:
+    """
+    If path resides on a network filesystem (NFS, SMB, Lustre, etc.), return its type, according
+    to the longest mount point containing it; otherwise None. (Also None if the mount table isn't
+    available, e.g. on macOS.)
+    """
+    path_cmp = splitall(os.path.realpath(path))
+    fstype = None
+    depth = -1
+    try:
+        with open(mounts) as infile:
+            for line in infile:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                # mount points escape whitespace & backslash as octal
+                mount_cmp = splitall(
+                    re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), fields[1])
+                )
+                # (a later mount over the same point shadows earlier ones)
+                if len(mount_cmp) >= depth and path_cmp[: len(mount_cmp)] == mount_cmp:
+                    fstype = fields[2]
+                    depth = len(mount_cmp)
+    except OSError:
+        return None
+    return fstype if fstype in _NETWORK_FILESYSTEMS else None
+
+
 @export
 def chmod_R_plus(path: str, file_bits: int = 0, dir_bits: int = 0) -> None:
     """
@@ -0,0 +1,218 @@
+"""
+Process-wide asyncio event loop on which, with ``[scheduler] event_loop = true``, the workflow
+runner executes tasks as coroutines instead of occupying a thread per task.
+
+A task coroutine awaits its container (see :meth:`WDL.runtime.task_container.TaskContainer.run_async`)
+without occupying any thread, so thousands of tasks can be in flight at once. Meanwhile blocking
+work (dockerd requests, filesystem operations, expression evaluation involving file I/O, etc.) is
+offloaded to a bounded thread pool.
+
+The same coroutines also serve the ordinary, thread-per-task mode: without the event loop, each
+:func:`offload` simply calls its function directly, so the coroutine never suspends and
+:func:`run_sync` completes it on the calling thread.
+"""
+
+import asyncio
+import contextlib
+import functools
+import heapq
+import itertools
+import threading
+import time
+from concurrent import futures
+from typing import (
+    Optional,
+    Callable,
+    Awaitable,
+    Coroutine,
+    ContextManager,
+    Set,
+    List,
+    Tuple,
+    Any,
+    TypeVar,
+)
+
+T = TypeVar("T")
+
+_lock = threading.Lock()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_executor: Optional[futures.ThreadPoolExecutor] = None
+_tasks: "Set[asyncio.Future[Any]]" = set()
+
+
+def start(blocking_concurrency: int) -> None:
+    """
+    Start the event loop thread and the thread pool for blocking work, if not already started.
+    They live for the rest of the process.
+    """
+    global _loop, _executor
+    with _lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="miniwdl_event_loop", daemon=True
+            ).start()
+            _executor = futures.ThreadPoolExecutor(
+                max_workers=blocking_concurrency, thread_name_prefix="miniwdl_blocking"
+            )
+            _loop = loop
+
+
+def current() -> bool:
+    """
+    Whether the caller is running on the event loop (as opposed to a thread of its own)
+    """
+    try:
+        return _loop is not None and asyncio.get_running_loop() is _loop
+    except RuntimeError:
+        return False
+
+
+class PrioritySemaphore:
+    """
+    Semaphore for use on the event loop, whose waiters acquire it in priority order (highest
+    first, then first-come first-served)
+    """
+
+    _value: int
+    _waiters: "List[Tuple[float, int, asyncio.Future[None]]]"
+    _seq: "itertools.count[int]"
+
+    def __init__(self, value: int) -> None:
+        self._value = value
+        self._waiters = []
+        self._seq = itertools.count()
+
+    async def acquire(self, priority: float = 0.0) -> None:
+        if self._value > 0 and not self._waiters:
+            self._value -= 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (-priority, next(self._seq), waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # release() handed us the slot just as we were cancelled; pass it on
+                self.release()
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = heapq.heappop(self._waiters)[2]
+            if not waiter.done():
+                # hand the slot directly to the highest-priority waiter
+                waiter.set_result(None)
+                return
+        self._value += 1
+
+
+def semaphore(value: int) -> PrioritySemaphore:
+    "Create a semaphore for use on the event loop"
+
+    async def new() -> PrioritySemaphore:
+        return PrioritySemaphore(value)
+
+    assert _loop is not None
+    return asyncio.run_coroutine_threadsafe(new(), _loop).result()
+
+
+def submit(
+    coroutine_function: Callable[[], Awaitable[T]],
+    slots: Optional[PrioritySemaphore] = None,
+    priority: float = 0.0,
+) -> "futures.Future[T]":
+    """
+    Schedule a coroutine on the event loop, optionally awaiting a slot from the semaphore (with the
+    given priority) before starting it. Returns a future with the same semantics as
+    ``ThreadPoolExecutor.submit()``'s: cancelling it prevents the coroutine from starting, but
+    doesn't interrupt it once started.
+    """
+    assert _loop is not None
+    future: "futures.Future[T]" = futures.Future()
+
+    async def run() -> None:
+        if slots is not None:
+            await slots.acquire(priority)
+        try:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                result = await coroutine_function()
+            except BaseException as exn:
+                future.set_exception(exn)
+            else:
+                future.set_result(result)
+        finally:
+            if slots is not None:
+                slots.release()
+
+    def create_task() -> None:
+        # hold a reference to the asyncio task until it's done (the loop keeps only weak refs)
+        task = asyncio.ensure_future(run())
+        _tasks.add(task)
+        task.add_done_callback(_tasks.discard)
+
+    _loop.call_soon_threadsafe(create_task)
+    return future
+
+
+async def offload(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    On the event loop, await ``fn(*args, **kwargs)`` run on the thread pool for blocking work;
+    otherwise just call it.
+    """
+    if not current():
+        return fn(*args, **kwargs)
+    assert _loop is not None and _executor is not None
+    return await _loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+
+
+async def enter_context(stack: contextlib.AsyncExitStack, cm: ContextManager[T]) -> T:
+    """
+    Enter a context manager which does blocking work (e.g. opening files) using :func:`offload`,
+    pushing onto the stack its exit, likewise offloaded
+    """
+    ans = await offload(cm.__enter__)
+
+    async def exit(*exc_details: Any) -> Optional[bool]:
+        return await offload(cm.__exit__, *exc_details)
+
+    stack.push_async_exit(exit)
+    return ans
+
+
+def notify(waiter: "asyncio.Future[None]") -> None:
+    """
+    From any thread, complete a future created on the event loop, which a coroutine awaits for
+    something to happen on another thread (unless it's already done)
+    """
+
+    def set_result() -> None:
+        if not waiter.done():
+            waiter.set_result(None)
+
+    assert _loop is not None
+    _loop.call_soon_threadsafe(set_result)
+
+
+async def sleep(seconds: float) -> None:
+    "On the event loop, suspend the coroutine for the given time; otherwise block the thread"
+    if current():
+        await asyncio.sleep(seconds)
+    else:
+        time.sleep(seconds)
+
+
+def run_sync(coroutine: Coroutine[Any, Any, T]) -> T:
+    """
+    Run to completion, on the calling thread, a coroutine which doesn't suspend when it's not on
+    the event loop (because it only awaits :func:`offload` and the like)
+    """
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    coroutine.close()
+    raise RuntimeError("coroutine suspended outside of the event loop")
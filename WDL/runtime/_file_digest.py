@@ -0,0 +1,213 @@
+"""
+Content digests (SHA-256) of local files & directories, for content-addressed call cache keys
+([call_cache] content_digest). Each file's digest is remembered in a SQLite database keyed by the
+file's (device, inode, size, mtime), so that it's read & hashed only once for as long as it isn't
+modified. Files are hashed through read-only memory maps, with many files hashed in parallel
+(hashlib releases the GIL while digesting large buffers).
+"""
+
+import os
+import mmap
+import stat
+import time
+import sqlite3
+import hashlib
+import threading
+from concurrent import futures
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+_CHUNK_BYTES = 8 << 20
+
+# Don't persist the digest of a file modified so recently that it might be modified again without
+# changing its mtime (given coarse filesystem timestamp granularity).
+_RACY_NS = 2_000_000_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_digests (
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    PRIMARY KEY (dev, ino, size, mtime_ns)
+) WITHOUT ROWID;
+"""
+
+
+def sha256_file(path: str) -> str:
+    """
+    Hex SHA-256 digest of the file's contents, streamed through a read-only memory map
+    """
+    hasher = hashlib.sha256()
+    with open(path, "rb") as infile:
+        if os.fstat(infile.fileno()).st_size:
+            with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, "madvise"):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                with memoryview(mm) as view:
+                    for ofs in range(0, len(view), _CHUNK_BYTES):
+                        hasher.update(view[ofs : ofs + _CHUNK_BYTES])
+    return hasher.hexdigest()
+
+
+class FileDigestIndex:
+    """
+    Computes content digests of local files & directories, remembering each file's digest in the
+    database (shared by concurrent miniwdl processes on the same host). Concurrent requests for
+    the same file are coalesced.
+    """
+
+    _db_filename: str
+    _db: Optional[sqlite3.Connection]
+    _threads: int
+    _pool: Optional[futures.ThreadPoolExecutor]
+    _lock: threading.Lock
+    _pending: Dict[Tuple[int, int, int, int], "futures.Future[str]"]
+
+    def __init__(self, db_filename: str, threads: int) -> None:
+        self._db_filename = db_filename
+        self._db = None
+        self._threads = max(threads, 1)
+        self._pool = None
+        self._lock = threading.Lock()
+        self._pending = {}
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+            db, self._db = self._db, None
+        if pool:
+            pool.shutdown()
+        if db:
+            db.close()
+
+    def _executor(self) -> futures.ThreadPoolExecutor:
+        with self._lock:
+            if not self._pool:
+                self._pool = futures.ThreadPoolExecutor(
+                    max_workers=self._threads, thread_name_prefix="miniwdl_digest"
+                )
+            return self._pool
+
+    def _query(self, sql: str, params: tuple) -> Optional[tuple]:
+        with self._lock:
+            if self._db is None:
+                os.makedirs(os.path.dirname(self._db_filename), exist_ok=True)
+                self._db = sqlite3.connect(
+                    self._db_filename, timeout=60.0, isolation_level=None, check_same_thread=False
+                )
+                from .cache_sqlite import sqlite_journal
+
+                sqlite_journal(self._db, self._db_filename)
+                self._db.executescript(_SCHEMA)
+            return self._db.execute(sql, params).fetchone()
+
+    def file_digest(self, path: str) -> Optional[str]:
+        """
+        Hex SHA-256 digest of the file's contents, or None if it isn't an existing (regular) file
+        """
+        try:
+            st = os.stat(path)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+        row = self._query(
+            "SELECT sha256 FROM file_digests WHERE dev = ? AND ino = ? AND size = ? AND mtime_ns = ?",
+            key,
+        )
+        if row:
+            return row[0]
+
+        with self._lock:
+            fut = self._pending.get(key, None)
+            owner = fut is None
+            if fut is None:
+                fut = futures.Future()
+                self._pending[key] = fut
+        if owner:
+            try:
+                digest = sha256_file(path)
+                st2 = os.stat(path)
+                if (st2.st_ino, st2.st_size, st2.st_mtime_ns) == key[1:] and (
+                    time.time_ns() - st2.st_mtime_ns > _RACY_NS
+                ):
+                    self._query(
+                        "INSERT OR REPLACE INTO file_digests (dev, ino, size, mtime_ns, sha256)"
+                        " VALUES (?, ?, ?, ?, ?)",
+                        key + (digest,),
+                    )
+                fut.set_result(digest)
+            except Exception as exn:
+                fut.set_exception(exn)
+            finally:
+                with self._lock:
+                    del self._pending[key]
+        try:
+            return fut.result()
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+
+    def directory_digest(self, path: str) -> Optional[str]:
+        """
+        Hex SHA-256 digest over the relative paths of the directory's contents, and the digests of
+        the files therein; or None if it isn't an existing directory. Like symlinks to files,
+        symlinks to subdirectories are followed, except those leading back to an enclosing
+        directory (which contribute only their relative paths).
+        """
+        entries: List[Tuple[str, Optional[int]]] = []
+        files: List[str] = []
+        try:
+            st = os.stat(path)
+            # (dev, ino) of the directories enclosing each one to be walked, to detect cycles
+            ancestors: Dict[str, FrozenSet[Tuple[int, int]]] = {
+                path: frozenset([(st.st_dev, st.st_ino)])
+            }
+            for root, subdirs, subfiles in os.walk(path, onerror=_raise, followlinks=True):
+                rel = os.path.relpath(root, path)
+                enclosing = ancestors.pop(root)
+                subdirs.sort()
+                walk = []
+                for subdir in subdirs:
+                    entries.append((os.path.join(rel, subdir) + "/", None))
+                    st = os.stat(os.path.join(root, subdir))
+                    if (st.st_dev, st.st_ino) not in enclosing:
+                        ancestors[os.path.join(root, subdir)] = enclosing | {(st.st_dev, st.st_ino)}
+                        walk.append(subdir)
+                subdirs[:] = walk
+                for fn in sorted(subfiles):
+                    entries.append((os.path.join(rel, fn), len(files)))
+                    files.append(os.path.join(root, fn))
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        digests = list(self._executor().map(self.file_digest, files, chunksize=16))
+        hasher = hashlib.sha256()
+        for rel, i in entries:
+            hasher.update(rel.encode("utf-8"))
+            hasher.update(b"\t")
+            if i is not None:
+                # (a dangling symlink or other special file contributes an empty digest)
+                hasher.update((digests[i] or "").encode())
+            hasher.update(b"\n")
+        return hasher.hexdigest()
+
+    def digest_all(self, paths: List[Tuple[str, bool]]) -> List[Optional[str]]:
+        """
+        Digest each of the (path, directory) pairs; the files in parallel, then each directory
+        (hashing its files in parallel)
+        """
+        ans: List[Optional[str]] = [None] * len(paths)
+        files = [i for i, (_path, directory) in enumerate(paths) if not directory]
+        for i, digest in zip(
+            files, self._executor().map(lambda i: self.file_digest(paths[i][0]), files)
+        ):
+            ans[i] = digest
+        for i, (path, directory) in enumerate(paths):
+            if directory:
+                ans[i] = self.directory_digest(path)
+        return ans
+
+
+def _raise(exn: OSError) -> None:
+    raise exn
@@ -0,0 +1,571 @@
+"""
+In-process HTTP(S) downloads ([download_http] in_process), used by the built-in http/https
+downloader plugins (see ``download.http_downloader``) instead of an aria2c task container.
+
+Connections are kept alive and pooled per host for reuse by later downloads in the same process.
+A large file is fetched in byte-range segments over several parallel connections, written in place
+into a partial file. Given a deterministic download directory (as under the download cache's
+``ops/`` area), an interrupted download resumes from the segments already completed, provided the
+server's ETag or Last-Modified validator shows the file hasn't changed in the meantime.
+
+URIs that can't be downloaded this way (e.g. through a proxy, or redirecting to another URI
+scheme) raise ``Unsupported``, upon which the caller should fall back to a container downloader.
+"""
+
+import os
+import ssl
+import json
+import time
+import fcntl
+import base64
+import logging
+import tempfile
+import threading
+import http.client
+import urllib.request
+from concurrent import futures
+from urllib.parse import urlparse, urljoin, unquote
+from typing import Optional, Callable, Dict, Any, List, Tuple
+
+from . import config
+from .error import Terminated
+from ._file_digest import sha256_file
+from .._util import write_atomic
+from .._util import StructuredLogMessage as _
+
+_BUFFER_BYTES = 1 << 20
+_MAX_REDIRECTS = 10
+_REDIRECTS = (301, 302, 303, 307, 308)
+
+
+class Unsupported(Exception):
+    """
+    The URI can't be downloaded in-process
+    """
+
+
+class HTTPError(Exception):
+    """
+    Unsuccessful HTTP response status
+    """
+
+    status: int
+
+    def __init__(self, uri: str, status: int, reason: str) -> None:
+        super().__init__(f"HTTP {status} {reason}: {uri}")
+        self.status = status
+
+    @property
+    def retryable(self) -> bool:
+        return self.status >= 500 or self.status in (408, 429)
+
+
+class _Changed(Exception):
+    # the remote file changed during a segmented/resumed download
+    pass
+
+
+class _ConnectionPool:
+    """
+    Idle keep-alive connections, keyed by (scheme, host, port)
+    """
+
+    _idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]]
+    _lock: threading.Lock
+    _ssl_context: Optional[ssl.SSLContext]
+
+    def __init__(self, max_idle: int = 16) -> None:
+        self._idle = {}
+        self._lock = threading.Lock()
+        self._ssl_context = None
+        self.max_idle = max_idle
+
+    def get(self, scheme: str, host: str, port: int, timeout: float) -> http.client.HTTPConnection:
+        with self._lock:
+            idle = self._idle.get((scheme, host, port), None)
+            if idle:
+                conn = idle.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn
+            if scheme == "https" and self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+        if scheme == "https":
+            return http.client.HTTPSConnection(
+                host, port, timeout=timeout, context=self._ssl_context
+            )
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def put(self, scheme: str, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault((scheme, conn.host, conn.port), [])
+            if len(idle) < self.max_idle:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def clear(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+_connections = _ConnectionPool()
+
+
+class _Response:
+    """
+    Response to a GET request, whose connection returns to the pool once the body is read fully
+    """
+
+    def __init__(
+        self,
+        url: str,
+        scheme: str,
+        conn: http.client.HTTPConnection,
+        resp: http.client.HTTPResponse,
+    ) -> None:
+        self.url = url
+        self.status = resp.status
+        self.reason = resp.reason
+        self.headers = resp.headers
+        self._scheme = scheme
+        self._conn: Optional[http.client.HTTPConnection] = conn
+        self._resp = resp
+
+    def readinto(self, buf: memoryview) -> int:
+        n = self._resp.readinto(buf)
+        if not n:
+            self.close(reuse=True)
+        return n
+
+    def drain(self) -> None:
+        self._resp.read()
+        self.close(reuse=True)
+
+    def close(self, reuse: bool = False) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            if reuse and not self._resp.will_close and self._resp.isclosed():
+                _connections.put(self._scheme, conn)
+            else:
+                conn.close()
+
+
+def _get(url: str, headers: Dict[str, str], timeout: float) -> _Response:
+    # GET url, following redirects; raises Unsupported if the request can't be made directly
+    for _redirect in range(_MAX_REDIRECTS + 1):
+        parts = urlparse(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise Unsupported(f"unsupported URI: {url}")
+        proxies = urllib.request.getproxies()
+        if parts.scheme in proxies and not urllib.request.proxy_bypass(parts.hostname):
+            raise Unsupported(f"{parts.scheme} proxy configured")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        req_headers = {
+            "Host": parts.netloc.rpartition("@")[2],
+            "User-Agent": "miniwdl",
+            "Accept-Encoding": "identity",
+        }
+        if parts.username is not None:
+            # HTTP Basic authentication with the URI userinfo (which urljoin() keeps on relative
+            # redirects, but not on redirects to another host)
+            userinfo = unquote(parts.username) + ":" + unquote(parts.password or "")
+            req_headers["Authorization"] = "Basic " + base64.b64encode(userinfo.encode()).decode()
+        req_headers.update(headers)
+        # a pooled connection might have been closed by the server in the meantime; retry once on
+        # a new connection if so
+        for attempt in (0, 1):
+            conn = _connections.get(parts.scheme, parts.hostname, port, timeout)
+            try:
+                conn.request("GET", path, headers=req_headers)
+                resp = conn.getresponse()
+                break
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                conn.close()
+                if attempt:
+                    raise
+            except BaseException:
+                conn.close()
+                raise
+        ans = _Response(url, parts.scheme, conn, resp)
+        location = resp.headers.get("Location", None)
+        if resp.status not in _REDIRECTS or not location:
+            return ans
+        ans.drain()
+        url = urljoin(url, location)
+    raise Unsupported(f"too many redirects: {url}")
+
+
+class _State:
+    """
+    Progress of a (possibly segmented) download into a partial file, saved alongside it for
+    resumption
+    """
+
+    def __init__(self, uri: str, filename: Optional[str]) -> None:
+        self.uri = uri
+        self.filename = filename
+        self.size: Optional[int] = None
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.done: List[Tuple[int, int]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def validator(self) -> Optional[str]:
+        # strong validator for If-Range
+        if self.etag and not self.etag.startswith("W/"):
+            return self.etag
+        return self.last_modified
+
+    @classmethod
+    def load(cls, uri: str, filename: str) -> "_State":
+        ans = cls(uri, filename)
+        try:
+            with open(filename) as infile:
+                state = json.load(infile)
+            if state["uri"] == uri and isinstance(state["size"], int):
+                ans.size = state["size"]
+                ans.etag = state.get("etag", None)
+                ans.last_modified = state.get("last_modified", None)
+                ans.done = [(int(lo), int(hi)) for lo, hi in state["done"]]
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            pass
+        return ans
+
+    def reset(self) -> None:
+        self.size = self.etag = self.last_modified = None
+        self.done = []
+        self._remove()
+
+    def set_validators(self, headers: Any) -> None:
+        self.etag = headers.get("ETag", None)
+        self.last_modified = headers.get("Last-Modified", None)
+
+    def add(self, lo: int, hi: int) -> None:
+        # record completion of bytes [lo, hi)
+        with self._lock:
+            self.done.append((lo, hi))
+            self.done.sort()
+            merged: List[Tuple[int, int]] = []
+            for lo2, hi2 in self.done:
+                if merged and lo2 <= merged[-1][1]:
+                    merged[-1] = (merged[-1][0], max(hi2, merged[-1][1]))
+                else:
+                    merged.append((lo2, hi2))
+            self.done = merged
+            if self.filename and self.validator and self.size is not None:
+                write_atomic(
+                    json.dumps(
+                        {
+                            "uri": self.uri,
+                            "size": self.size,
+                            "etag": self.etag,
+                            "last_modified": self.last_modified,
+                            "done": self.done,
+                        }
+                    ),
+                    self.filename,
+                )
+
+    def missing(self, segment_bytes: int) -> List[Tuple[int, int]]:
+        # ranges not yet completed, split into segments
+        assert self.size is not None
+        ans = []
+        pos = 0
+        for lo, hi in self.done + [(self.size, self.size)]:
+            while pos < lo:
+                ans.append((pos, min(lo, pos + segment_bytes)))
+                pos = ans[-1][1]
+            pos = max(pos, hi)
+        return ans
+
+    def _remove(self) -> None:
+        if self.filename:
+            try:
+                os.unlink(self.filename)
+            except FileNotFoundError:
+                pass
+
+
+def _content_range(resp: _Response) -> Tuple[int, int, int]:
+    # parse Content-Range: bytes lo-hi/size
+    try:
+        unit, _sp, spec = resp.headers["Content-Range"].strip().partition(" ")
+        rng, _sl, size = spec.partition("/")
+        lo, _dash, hi = rng.partition("-")
+        assert unit == "bytes"
+        return (int(lo), int(hi) + 1, int(size))
+    except Exception:
+        raise Unsupported(f"unexpected Content-Range from {resp.url}") from None
+
+
+def _expected_sha256(headers: Any) -> Optional[str]:
+    # hex SHA-256 digest of the whole file, if given by the Repr-Digest (RFC 9530) or Digest
+    # (RFC 3230) header
+    for item in (headers.get("Repr-Digest", "") + "," + headers.get("Digest", "")).split(","):
+        alg, _eq, value = item.strip().partition("=")
+        if alg.lower() == "sha-256" and value:
+            try:
+                return base64.b64decode(value.strip(":")).hex()
+            except ValueError:
+                pass
+    return None
+
+
+def _filename(uri: str) -> str:
+    fn = os.path.basename(unquote(urlparse(uri).path).rstrip("/"))
+    return fn if fn and fn not in (".", "..") else "index.html"
+
+
+def download(
+    cfg: config.Loader,
+    logger: logging.Logger,
+    uri: str,
+    dest_dir: str,
+    terminating: Callable[[], bool] = lambda: False,
+) -> Dict[str, Any]:
+    """
+    Download the http(s) URI into dest_dir, resuming a previous partial download there if
+    possible. Returns a dict with the local ``file`` and its ``size``, ``sha256`` digest, and the
+    server's ``etag`` and ``last_modified`` validators (if any).
+
+    :raise Unsupported: if the URI should be downloaded some other way
+    :raise HTTPError: upon an unsuccessful response (after retries if applicable)
+    """
+    opts = cfg["download_http"]
+    connections = max(opts.get_int("connections"), 1)
+    segment_bytes = max(int(opts.get_float("segment_mb") * 1048576), _BUFFER_BYTES)
+    retries = opts.get_int("retries")
+    timeout = opts.get_float("timeout_seconds")
+
+    os.makedirs(dest_dir, exist_ok=True)
+    fn = _filename(uri)
+    part = os.path.join(dest_dir, fn + ".part")
+    fd = os.open(part, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        # another process is downloading into the same place; use a private directory
+        os.close(fd)
+        dest_dir = tempfile.mkdtemp(prefix="http.", dir=dest_dir)
+        part = os.path.join(dest_dir, fn + ".part")
+        fd = os.open(part, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        state = _State.load(uri, part + ".json")
+        if state.done and os.fstat(fd).st_size != state.size:
+            state.reset()
+        for attempt in (0, 1):
+            try:
+                expected = _download(
+                    uri,
+                    fd,
+                    state,
+                    connections,
+                    segment_bytes,
+                    retries,
+                    timeout,
+                    logger,
+                    terminating,
+                )
+                break
+            except _Changed:
+                if attempt:
+                    raise
+                logger.warning(_("remote file changed during download; restarting", uri=uri))
+                state.reset()
+    finally:
+        os.close(fd)
+
+    assert state.size is not None and os.path.getsize(part) == state.size
+    sha256 = sha256_file(part)
+    if expected and expected != sha256:
+        os.unlink(part)
+        state.reset()
+        raise ValueError(f"SHA-256 digest of download doesn't match server's: {uri}")
+    ans: Dict[str, Any] = {
+        "file": os.path.join(dest_dir, fn),
+        "size": state.size,
+        "sha256": sha256,
+        "etag": state.etag,
+        "last_modified": state.last_modified,
+    }
+    os.rename(part, ans["file"])
+    state.reset()
+    return ans
+
+
+def _download(
+    uri: str,
+    fd: int,
+    state: _State,
+    connections: int,
+    segment_bytes: int,
+    retries: int,
+    timeout: float,
+    logger: logging.Logger,
+    terminating: Callable[[], bool],
+) -> Optional[str]:
+    # Download into fd, updating state; returns the server's SHA-256 digest of the file, if any.
+    # The first request asks for the first missing segment (the whole file, if it's small); the
+    # Content-Range of the response tells us the full size, to request any other segments in
+    # parallel.
+    resuming = bool(state.done and state.validator)
+    if resuming:
+        assert state.size is not None
+        missing = state.missing(segment_bytes)
+        if not missing:
+            # a previous attempt finished the download but stopped short of renaming it
+            return None
+        first = missing[0]
+        headers = {"Range": f"bytes={first[0]}-{first[1] - 1}", "If-Range": str(state.validator)}
+    else:
+        state.reset()
+        headers = {"Range": f"bytes=0-{segment_bytes - 1}"}
+    resp = _request(uri, headers, retries, timeout, logger, terminating)
+    url = resp.url
+    expected = _expected_sha256(resp.headers)
+
+    if resp.status == 416 and not resuming:
+        # requested range not satisfiable: empty file
+        resp.drain()
+        os.ftruncate(fd, 0)
+        state.set_validators(resp.headers)
+        state.size = 0
+        return expected
+
+    if resp.status == 200:
+        # whole file (server doesn't do ranges, or the file changed since a previous partial
+        # download)
+        state.reset()
+        state.set_validators(resp.headers)
+        os.ftruncate(fd, 0)
+        size = _copy(resp, fd, 0, None, terminating)
+        content_length = resp.headers.get("Content-Length", None)
+        if content_length is not None and int(content_length) != size:
+            raise http.client.IncompleteRead(b"", int(content_length) - size)
+        state.size = size
+        return expected
+
+    lo, hi, size = _content_range(resp)
+    if resuming:
+        if size != state.size:
+            resp.close()
+            raise _Changed()
+        logger.info(_("resuming partial download", uri=uri, done=sum(b - a for a, b in state.done)))
+    else:
+        state.size = size
+        state.set_validators(resp.headers)
+        os.ftruncate(fd, size)
+    _copy(resp, fd, lo, hi, terminating)
+    state.add(lo, hi)
+
+    todo = state.missing(segment_bytes)
+    if todo:
+        validator = state.validator
+        failed = threading.Event()
+
+        def segment(rng: Tuple[int, int]) -> None:
+            try:
+                segment1(rng)
+            except BaseException:
+                failed.set()
+                raise
+
+        def segment1(rng: Tuple[int, int]) -> None:
+            pos, end = rng
+            for attempt in range(retries + 1):
+                if failed.is_set():
+                    return
+                try:
+                    headers = {"Range": f"bytes={pos}-{end - 1}"}
+                    if validator:
+                        headers["If-Range"] = validator
+                    resp = _request(url, headers, 0, timeout, logger, terminating)
+                    if resp.status != 206:
+                        resp.close()
+                        raise _Changed()
+                    lo2, hi2, size2 = _content_range(resp)
+                    if (lo2, size2) != (pos, size) or hi2 > end:
+                        resp.close()
+                        raise _Changed()
+                    pos += _copy(resp, fd, lo2, hi2, terminating)
+                    state.add(rng[0], pos)
+                    if pos >= end:
+                        return
+                except (OSError, http.client.HTTPException, HTTPError) as exn:
+                    if attempt >= retries or (isinstance(exn, HTTPError) and not exn.retryable):
+                        raise
+                    _backoff(attempt, terminating)
+
+        with futures.ThreadPoolExecutor(
+            max_workers=min(connections, len(todo)), thread_name_prefix="miniwdl_http"
+        ) as pool:
+            # (once any segment fails, the others stop)
+            for op in [pool.submit(segment, rng) for rng in todo]:
+                op.result()
+    return expected
+
+
+def _request(
+    url: str,
+    headers: Dict[str, str],
+    retries: int,
+    timeout: float,
+    logger: logging.Logger,
+    terminating: Callable[[], bool],
+) -> _Response:
+    # GET with retries upon connection errors & server errors; raises HTTPError for any other
+    # unsuccessful status
+    for attempt in range(retries + 1):
+        if terminating():
+            raise Terminated()
+        try:
+            resp = _get(url, headers, timeout)
+            if resp.status in (200, 206) or (resp.status == 416 and "If-Range" not in headers):
+                return resp
+            resp.close()
+            raise HTTPError(url, resp.status, resp.reason)
+        except (OSError, http.client.HTTPException, HTTPError) as exn:
+            if attempt >= retries or (isinstance(exn, HTTPError) and not exn.retryable):
+                raise
+            logger.warning(_("retrying HTTP request", url=url, error=str(exn)))
+            _backoff(attempt, terminating)
+    assert False
+
+
+def _copy(
+    resp: _Response, fd: int, lo: int, hi: Optional[int], terminating: Callable[[], bool]
+) -> int:
+    # write the response body into fd from offset lo, returning the number of bytes written
+    buf = memoryview(bytearray(_BUFFER_BYTES))
+    pos = lo
+    try:
+        while True:
+            if terminating():
+                raise Terminated()
+            n = resp.readinto(buf)
+            if not n:
+                break
+            os.pwrite(fd, buf[:n], pos)
+            pos += n
+    finally:
+        resp.close(reuse=True)
+    if hi is not None and pos != hi:
+        raise http.client.IncompleteRead(b"", hi - pos)
+    return pos - lo
+
+
+def _backoff(attempt: int, terminating: Callable[[], bool]) -> None:
+    deadline = time.time() + min(2**attempt, 30)
+    while time.time() < deadline:
+        if terminating():
+            raise Terminated()
+        time.sleep(0.1)
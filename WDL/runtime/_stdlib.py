@@ -2,11 +2,15 @@
 Runtime StdLib implementations for tasks and workflows.
 """
 
+import copy
 import glob
 import hashlib
 import logging
 import os
-from typing import TYPE_CHECKING, Optional
+import stat
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Optional, Tuple
 
 from .. import Env, Error, StdLib, Type, Value
 from .._util import WDLVersion, wdl_version_geq
@@ -20,6 +24,7 @@ from ._io_helpers import resolve_source_relative_path, _resolve_workflow_path
 if TYPE_CHECKING:
     from .task_container import TaskContainer
     from ._workflow_state import StateMachine
+    from .workflow import _InputDownloads
 
 
 class TaskStdLib(StdLib.Base):
@@ -47,6 +52,7 @@ class TaskStdLib(StdLib.Base):
         )
         self.logger = logger
         self.container = container
+        self._read_max_bytes = _read_max_bytes(container.cfg)
         self.inputs_only = inputs_only
         self.source_dir = source_dir
         self.cache_add_paths = cache_add_paths or CallCacheAddPaths()
@@ -215,6 +221,8 @@ class WorkflowStdLib(StdLib.Base):
     cfg: config.Loader
     state: "StateMachine"
     cache: CallCache
+    input_downloads: "Optional[_InputDownloads]"  # workflow input URIs possibly still downloading
+    read_memo: "Optional[ReadMemo]"  # run-scoped memo of read_* results
 
     def __init__(
         self,
@@ -224,6 +232,8 @@ class WorkflowStdLib(StdLib.Base):
         cache: CallCache,
         *,
         eval_context: Optional[StdLib.EvalContext] = None,
+        input_downloads: "Optional[_InputDownloads]" = None,
+        read_memo: "Optional[ReadMemo]" = None,
     ) -> None:
         super().__init__(
             wdl_version,
@@ -233,6 +243,9 @@ class WorkflowStdLib(StdLib.Base):
         self.cfg = cfg
         self.state = state
         self.cache = cache
+        self.input_downloads = input_downloads
+        self.read_memo = read_memo
+        self._read_max_bytes = _read_max_bytes(cfg)
 
     def _source_relative_host_path(self, filename: str, desc: str) -> str:
         directory = filename.endswith("/")
@@ -249,6 +262,8 @@ class WorkflowStdLib(StdLib.Base):
     def _devirtualize_filename(self, filename: str) -> str:
         directory = filename.endswith("/")
         if downloadable(self.cfg, filename, directory=directory):
+            if self.input_downloads:
+                self.input_downloads.wait(filename, directory)
             cached = self.cache.get_download(filename)
             if cached:
                 return cached
@@ -304,6 +319,13 @@ class WorkflowStdLib(StdLib.Base):
             return ans
         return filename
 
+    def _read_parsed(
+        self, filename: str, key: Tuple[Any, ...], parse: Callable[[str], Value.Base]
+    ) -> Value.Base:
+        if self.read_memo is None:
+            return super()._read_parsed(filename, key, parse)
+        return self.read_memo.get(self._read_filename(filename), key, parse)
+
     def _join_paths_default_directory(self) -> str:
         source = self.state.workflow.pos.abspath
         if not source or source == "(buffer)":
@@ -343,3 +365,77 @@ class WorkflowStdLib(StdLib.Base):
         # whichever path we took: allow-list the filename
         self.state.fspath_allowlist.add(filename)
         return filename
+
+
+def _read_max_bytes(cfg: config.Loader) -> int:
+    return int(cfg["file_io"].get_float("read_max_gb", 0.0) * (1 << 30))
+
+
+class ReadMemo:
+    """
+    Run-scoped memo of the values parsed by read_* functions in a workflow and its subworkflows,
+    so that e.g. read_tsv() of a manifest within a scatter body, or in each of many subworkflow
+    calls, parses the file only once.
+
+    Entries are keyed by the file's host path, size, and mtime, along with the function and any of
+    its arguments affecting the result. They're retained up to a budget on the total size of the
+    files they were parsed from, evicting the least recently used. Each caller gets its own deep copy
+    of the memoized value, since evaluation goes on to modify it in-place (setting the ``expr`` of
+    the value and its children, and caching digests).
+    """
+
+    _lock: threading.Lock
+    _entries: "OrderedDict[Tuple[Any, ...], Tuple[Value.Base, int]]"
+    _budget: int
+    _bytes: int
+    hits: int
+    misses: int
+
+    def __init__(self, cfg: config.Loader) -> None:
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._budget = int(cfg["file_io"].get_float("read_memo_mb", 0.0) * (1 << 20))
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self, host_path: str, key: Tuple[Any, ...], parse: Callable[[str], Value.Base]
+    ) -> Value.Base:
+        """
+        Get the memoized value for the host file & key, or else parse the file and memoize it
+        """
+        st = os.stat(host_path)
+        if not stat.S_ISREG(st.st_mode) or not 0 < st.st_size <= self._budget:
+            return parse(host_path)
+        memo_key = (host_path, st.st_size, st.st_mtime_ns) + key
+        with self._lock:
+            entry = self._entries.get(memo_key)
+            if entry is not None:
+                self._entries.move_to_end(memo_key)
+                self.hits += 1
+                return copy.deepcopy(entry[0])
+            self.misses += 1
+        # parse outside of the lock; concurrent misses on the same file may parse it redundantly
+        ans = parse(host_path)
+        with self._lock:
+            if memo_key not in self._entries:
+                self._entries[memo_key] = (ans, st.st_size)
+                self._bytes += st.st_size
+                while self._bytes > self._budget:
+                    _key, (_value, evicted_size) = self._entries.popitem(last=False)
+                    self._bytes -= evicted_size
+        return copy.deepcopy(ans)
+
+    def log_stats(self, logger: logging.Logger) -> None:
+        with self._lock:
+            if self.hits or self.misses:
+                logger.info(
+                    _(
+                        "read_* memo",
+                        hits=self.hits,
+                        misses=self.misses,
+                        entries=len(self._entries),
+                        bytes=self._bytes,
+                    )
+                )
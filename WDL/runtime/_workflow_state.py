@@ -2,6 +2,7 @@
 Workflow state machine and graph helpers.
 """
 
+import heapq
 import itertools
 import json
 import logging
@@ -11,7 +12,7 @@ from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Se
 import regex
 
 from .. import Env, Error, StdLib, Tree, Type, Value
-from .._util import WDLVersion, wdl_version_geq
+from .._util import WDLVersion, wdl_version_geq, topsort
 from .._util import StructuredLogMessage as _
 from . import config
 from ._io_helpers import (
@@ -96,7 +97,18 @@ class StateMachine:
     finished: Set[str]
     running: Set[str]
     waiting: Set[str]
-    runnable: List[str]
+    # heap of (-priority, job ID)
+    runnable: List[Tuple[float, str]]
+
+    # incremental scheduling bookkeeping: for each waiting job, the number of its dependencies
+    # not yet finished; for each (possibly not-yet-scheduled) job ID, the waiting jobs depending on
+    # it; and the set of waiting jobs whose dependencies are all finished, but which haven't yet
+    # been pushed onto the runnable heap.
+    _unmet_dependencies: Dict[str, int]
+    _dependents: Dict[str, Set[str]]
+    _ready: Set[str]
+    # priority of each workflow node ID (see critical_paths()); absent = 0
+    _priorities: Dict[str, float]
 
     # File/Directory paths that were either expressly supplied as workflow inputs, or were
     # generated by this workflow execution. By default, these are the only local paths the workflow
@@ -114,9 +126,14 @@ class StateMachine:
         run_dir: str,
         workflow: Tree.Workflow,
         inputs: Env.Bindings[Value.Base],
+        priorities: Optional[Dict[str, float]] = None,
     ) -> None:
         """
         Initialize the workflow state machine from the workflow AST and inputs
+
+        :param priorities: priority of each workflow node ID, e.g. from :func:`critical_paths`.
+                           Among runnable jobs, ``step()`` launches the highest-priority first,
+                           then in job ID order.
         """
         self.logger_id = logger_id
         self.run_dir = run_dir
@@ -128,6 +145,10 @@ class StateMachine:
         self.running = set()
         self.waiting = set()
         self.runnable = []
+        self._unmet_dependencies = {}
+        self._dependents = {}
+        self._ready = set()
+        self._priorities = priorities or {}
         self.fspath_allowlist = _fspaths(inputs)
         self.cache_add_paths = CallCacheAddPaths()
 
@@ -228,19 +249,17 @@ class StateMachine:
         the workflow outputs are available.
         """
         while True:
-            # select a job whose dependencies are all finished
-            if not self.runnable:
-                self.runnable = sorted(
-                    [j for j in self.waiting if not (self.jobs[j].dependencies - self.finished)],
-                    reverse=True,
-                )
+            # select the highest-priority job whose dependencies are all finished
+            for job_id in self._ready:
+                heapq.heappush(self.runnable, (-self.priority(job_id), job_id))
+            self._ready = set()
             if not self.runnable:
                 assert self.running or not self.waiting, "deadlocked: " + str(
                     set(itertools.chain(*(self.jobs[j].dependencies for j in self.waiting)))
                     - self.finished
                 )
                 return None
-            job_id = self.runnable.pop()
+            job_id = heapq.heappop(self.runnable)[1]
             job = self.jobs[job_id]
 
             # mark it 'running'
@@ -270,7 +289,15 @@ class StateMachine:
                 )
             self.job_outputs[job.id] = res
             self.running.remove(job.id)
-            self.finished.add(job.id)
+            self._finish(job.id)
+
+    def priority(self, job_id: str) -> float:
+        """
+        Priority of the job, per its workflow node (regardless of scatter index)
+        """
+        if not self._priorities:
+            return 0.0
+        return self._priorities.get(self.jobs[job_id].node.workflow_node_id, 0.0)
 
     def call_finished(self, job_id: str, outputs: Env.Bindings[Value.Base]) -> None:
         """
@@ -291,8 +318,21 @@ class StateMachine:
         assert isinstance(call_node, Tree.Call)
         self.job_outputs[job_id] = outputs.wrap_namespace(call_node.name)
         self.fspath_allowlist |= _fspaths(outputs)
-        self.finished.add(job_id)
         self.running.remove(job_id)
+        self._finish(job_id)
+
+    def relaunch_running(self) -> List[str]:
+        """
+        Return the running (launched but unfinished) calls to the runnable set, so that ``step()``
+        will reissue their ``CallInstructions``. For use upon restoring a pickled state machine,
+        after the driver that launched those calls is gone. Returns their job IDs.
+        """
+        ans = sorted(self.running)
+        for job_id in ans:
+            self.running.remove(job_id)
+            self.waiting.add(job_id)
+            self._ready.add(job_id)
+        return ans
 
     def _schedule(self, job: _Job) -> None:
         if self.logger.isEnabledFor(logging.DEBUG):
@@ -300,6 +340,27 @@ class StateMachine:
         assert job.id not in self.jobs
         self.jobs[job.id] = job
         self.waiting.add(job.id)
+        # index the job under each of its unfinished dependencies (which may not have been
+        # scheduled yet), so that _finish() need only visit the jobs depending on what finished.
+        unmet = 0
+        for dep_id in job.dependencies:
+            if dep_id not in self.finished:
+                self._dependents.setdefault(dep_id, set()).add(job.id)
+                unmet += 1
+        if unmet:
+            self._unmet_dependencies[job.id] = unmet
+        else:
+            self._ready.add(job.id)
+
+    def _finish(self, job_id: str) -> None:
+        # mark job finished & decrement the unmet dependency counters of its dependents, moving
+        # those with none remaining into the ready set
+        self.finished.add(job_id)
+        for dependent_id in self._dependents.pop(job_id, ()):
+            self._unmet_dependencies[dependent_id] -= 1
+            if not self._unmet_dependencies[dependent_id]:
+                del self._unmet_dependencies[dependent_id]
+                self._ready.add(dependent_id)
 
     def _do_job(
         self, cfg: config.Loader, stdlib: StdLib.Base, job: _Job
@@ -364,7 +425,7 @@ class StateMachine:
             call_name = job.node.name
             call_inputs: Env.Bindings[Value.Base] = Env.Bindings()
             for name, expr in job.node.inputs.items():
-                call_inputs = call_inputs.bind(name, expr.eval(env, stdlib=stdlib))
+                call_inputs = call_inputs.bind(name, expr.compile()(env, stdlib))
             # check workflow inputs for additional inputs supplied to this call
             for b in self.inputs.enter_namespace(call_name):
                 call_inputs = call_inputs.bind(b.name, b.value)
@@ -415,6 +476,44 @@ class StateMachine:
         return ans
 
 
+def critical_paths(
+    workflow: Tree.Workflow, task_runtime: Callable[[Tree.Task], Optional[float]]
+) -> Dict[str, float]:
+    """
+    Estimate, for each workflow node ID, the critical path length from the node's start to the
+    workflow's end: the node's expected runtime plus the longest such path among the nodes
+    depending on it (from the static workflow graph, so ignoring scatter widths). Launching calls
+    with the longest critical paths first tends to shorten the overall workflow runtime, when
+    there are more runnable calls than available concurrency.
+
+    Task calls are expected to take ``task_runtime(task)`` seconds, or if that's unknown, the mean
+    of the known task runtimes (1.0 if none). Subworkflow calls are expected to take their own
+    critical path length, and other nodes no time at all.
+    """
+    objs_by_id, adj = Tree._workflow_dependency_matrix(workflow)
+    sinks = dict((node_id, list(adj.sinks(node_id))) for node_id in objs_by_id)
+    order = topsort(adj)
+
+    runtimes: Dict[str, Optional[float]] = {}
+    for node_id, node in objs_by_id.items():
+        if isinstance(node, Tree.Call) and isinstance(node.callee, Tree.Task):
+            runtimes[node_id] = task_runtime(node.callee)
+    known = [v for v in runtimes.values() if v is not None]
+    default_runtime = sum(known) / len(known) if known else 1.0
+
+    ans: Dict[str, float] = {}
+    for node_id in reversed(order):
+        node = objs_by_id[node_id]
+        runtime = 0.0
+        if node_id in runtimes:
+            known_runtime = runtimes[node_id]
+            runtime = known_runtime if known_runtime is not None else default_runtime
+        elif isinstance(node, Tree.Call) and isinstance(node.callee, Tree.Workflow):
+            runtime = max(critical_paths(node.callee, task_runtime).values(), default=0.0)
+        ans[node_id] = runtime + max((ans[sink] for sink in sinks[node_id]), default=0.0)
+    return ans
+
+
 def _scatter(
     workflow: Tree.Workflow,
     section: Union[Tree.Scatter, Tree.Conditional],
@@ -433,7 +532,7 @@ def _scatter(
                 multiplex[subgather.workflow_node_id] = set()
 
     # evaluate scatter array or boolean condition
-    v = section.expr.eval(env, stdlib=stdlib)
+    v = section.expr.compile()(env, stdlib)
     array: List[Optional[Value.Base]] = []
     if isinstance(section, Tree.Scatter):
         assert isinstance(v, Value.Array)
@@ -650,7 +749,7 @@ def _eval_decl(
     if decl.name in inputs:
         value = inputs[decl.name]
     elif decl.expr:
-        value = decl.expr.eval(env, stdlib=stdlib).coerce(decl.type)
+        value = decl.expr.compile()(env, stdlib).coerce(decl.type)
         if wdl_version_geq(stdlib.wdl_version, WDLVersion.V1_2):
             # Source-relative paths in workflow decls become both runtime-allowlisted paths and
             # CallCache additional paths.
@@ -1,5 +1,6 @@
 import os
 import time
+import asyncio
 import shlex
 import psutil
 import logging
@@ -7,12 +8,12 @@ import threading
 import contextlib
 import subprocess
 import multiprocessing
-from typing import Callable, List, Tuple, Dict, Optional, Set
+from typing import Callable, List, Tuple, Dict, Optional, Set, BinaryIO
 from abc import abstractmethod, abstractproperty
-from contextlib import ExitStack
+from contextlib import ExitStack, AsyncExitStack
 from ..._util import PygtailLogger
 from ..._util import StructuredLogMessage as _
-from .. import config
+from .. import config, _event_loop
 from ..error import Terminated, DownloadFailed
 from ..task_container import TaskContainer
 
@@ -44,81 +45,121 @@ class SubprocessBase(TaskContainer):
                     mem_bytes=cls._resource_limits["mem_bytes"],
                 )
             )
-            _SubprocessScheduler.global_init(cls._resource_limits)
+            _SubprocessScheduler.global_init(
+                cls._resource_limits, cfg["scheduler"].get_float("backfill_aging_seconds")
+            )
         return cls._resource_limits
 
     def _run(self, logger: logging.Logger, terminating: Callable[[], bool], command: str) -> int:
-        with ExitStack() as cleanup:
+        return _event_loop.run_sync(self._run_async(logger, terminating, command))
+
+    async def _run_async(
+        self, logger: logging.Logger, terminating: Callable[[], bool], command: str
+    ) -> int:
+        async with AsyncExitStack() as async_cleanup:
             # await cpu & memory availability
             cpu_reservation = self.runtime_values.get("cpu", 0)
             memory_reservation = self.runtime_values.get("memory_reservation", 0)
             scheduler = _SubprocessScheduler(cpu_reservation, memory_reservation)
-            cleanup.enter_context(scheduler)
+            await async_cleanup.enter_async_context(scheduler)
+            # (context managers doing blocking I/O are entered & exited off the event loop thread)
+            cleanup = await _event_loop.enter_context(async_cleanup, ExitStack())
+            # along with this container's wait, report the queue's aggregate wait times so far
+            queue = _SubprocessScheduler.stats()
             logger.info(
                 _(
                     "provisioned",
                     seconds_waited=scheduler.delay,
                     cpu=cpu_reservation,
                     mem_bytes=memory_reservation,
+                    still_queued=int(queue["queued"]),
+                    admitted=int(queue["admitted"]),
+                    mean_seconds_waited=round(
+                        queue["total_seconds_waited"] / max(queue["admitted"], 1), 1
+                    ),
+                    max_seconds_waited=round(queue["max_seconds_waited"], 1),
                 )
             )
 
             # pull image if needed
-            image = self._pull(logger, cleanup)
+            image = await _event_loop.offload(self._pull, logger, cleanup)
 
             # prepare loggers
             cli_log_filename = os.path.join(self.host_dir, f"{self.cli_name}.log.txt")
-            cli_log = cleanup.enter_context(open(cli_log_filename, "wb"))
+            cli_log = await _event_loop.enter_context(
+                async_cleanup, await _event_loop.offload(open, cli_log_filename, "wb")
+            )
             cli_logger = logger.getChild(self.cli_name)
-            poll_stderr = cleanup.enter_context(self.poll_stderr_context(logger))
-            poll_cli_log = cleanup.enter_context(
+            poll_stderr = await _event_loop.enter_context(
+                async_cleanup, self.poll_stderr_context(logger)
+            )
+            poll_cli_log = await _event_loop.enter_context(
+                async_cleanup,
                 PygtailLogger(
                     logger,
                     cli_log_filename,
                     lambda msg: cli_logger.info(msg.rstrip()),
                     level=logging.INFO,
-                )
+                ),
             )
 
             # prepare command & environment
-            # we set the environment variables at the beginning of the command script because:
-            # 1) --env is subject to command line length limitations
-            # 2) --env-file isn't implemented consistently wrt quoting, escaping, etc.
-            with open(os.path.join(self.host_dir, "command"), "w") as outfile:
-                for k, v in self.runtime_values.get("env", {}).items():
-                    outfile.write(f"export {k}={shlex.quote(v)}\n")
-                outfile.write(command)
+            await _event_loop.offload(self._write_command, command)
 
             # start subprocess
-            invocation = self._run_invocation(logger, cleanup, image) + [
+            invocation = await _event_loop.offload(self._run_invocation, logger, cleanup, image)
+            invocation += [
                 "/bin/sh",
                 "-c",
                 self.cfg.get("task_runtime", "command_shell")
                 + " ../command >> ../stdout.txt 2>> ../stderr.txt",
             ]
-            proc = subprocess.Popen(
-                invocation, stdout=cli_log, stderr=subprocess.STDOUT, cwd=self.host_dir
+            proc = await _event_loop.offload(
+                subprocess.Popen,
+                invocation,
+                stdout=cli_log,
+                stderr=subprocess.STDOUT,
+                cwd=self.host_dir,
             )
             logger.notice(_(f"{self.cli_name} run", pid=proc.pid, log=cli_log_filename))
-            cleanup.enter_context(self.task_running_context())
+            await _event_loop.enter_context(async_cleanup, self.task_running_context())
 
             # long-poll for completion
             exit_code = None
             while exit_code is None:
                 if terminating():
                     proc.terminate()
-                try:
-                    exit_code = proc.wait(1)
-                except subprocess.TimeoutExpired:
-                    pass
-                poll_stderr()
-                cli_log.flush()
-                poll_cli_log()
+                if _event_loop.current():
+                    # rather than blocking in proc.wait(), check back after a second
+                    await asyncio.sleep(1)
+                    exit_code = proc.poll()
+                else:
+                    try:
+                        exit_code = proc.wait(1)
+                    except subprocess.TimeoutExpired:
+                        pass
+                await _event_loop.offload(self._poll_logs, poll_stderr, cli_log, poll_cli_log)
             if terminating():
                 raise Terminated()
         assert isinstance(exit_code, int)
         return exit_code
 
+    def _write_command(self, command: str) -> None:
+        # we set the environment variables at the beginning of the command script because:
+        # 1) --env is subject to command line length limitations
+        # 2) --env-file isn't implemented consistently wrt quoting, escaping, etc.
+        with open(os.path.join(self.host_dir, "command"), "w") as outfile:
+            for k, v in self.runtime_values.get("env", {}).items():
+                outfile.write(f"export {k}={shlex.quote(v)}\n")
+            outfile.write(command)
+
+    def _poll_logs(
+        self, poll_stderr: Callable[[], None], cli_log: BinaryIO, poll_cli_log: Callable[[], None]
+    ) -> None:
+        poll_stderr()
+        cli_log.flush()
+        poll_cli_log()
+
     @abstractproperty
     def cli_name(self) -> str:
         pass
@@ -172,14 +213,8 @@ class SubprocessBase(TaskContainer):
         )
         # mount input files & directories read-only
         if self._bind_input_files:
-            for host_path, container_path in self.input_path_map.items():
-                assert (not container_path.endswith("/")) or os.path.isdir(host_path.rstrip("/"))
-                host_mount_point = self.host_work_path(container_path)
-                if not os.path.exists(host_mount_point):
-                    self.touch_mount_point(
-                        host_mount_point + ("/" if container_path.endswith("/") else "")
-                    )
-                mounts.append((container_path.rstrip("/"), host_path.rstrip("/"), False))
+            for container_path, host_path in self.prepare_input_mounts():
+                mounts.append((container_path, host_path, False))
         return mounts
 
     def _pull(self, logger: logging.Logger, cleanup: ExitStack) -> str:
@@ -238,46 +273,129 @@ class SubprocessBase(TaskContainer):
 
 class _SubprocessScheduler(contextlib.AbstractContextManager):
     """
-    Logic for scheduling parallel containers to fit host cpu & memory resources
+    Admission control for parallel containers to fit host cpu & memory resources.
+
+    Each container's reservation awaits admission in one central queue. Whenever a container
+    arrives or exits, the scheduler walks the queue in arrival order, admitting each reservation
+    that fits the remaining resources (first-fit), so that small containers can backfill around a
+    big one at the head of the queue which doesn't yet fit. To prevent starvation, once a queued
+    reservation has waited ``[scheduler] backfill_aging_seconds``, those behind it can't be
+    admitted until it has been (so that resources accumulate for it).
     """
 
     _lock: threading.Lock = threading.Lock()
-    _cv: threading.Condition
     _state: Dict[str, int] = {}
+    _aging_seconds: float = 300.0
+    _queue: "List[_SubprocessScheduler]" = []
+    # queue wait time instrumentation
+    _stats: Dict[str, float] = {}
+
+    cpu_reservation: int
+    memory_reservation: int
     delay: int = 0
+    _enqueued: float
+    _admitted: bool = False
+    _wake: Callable[[], None]
 
     @classmethod
-    def global_init(cls, resource_limits: Dict[str, int]):
+    def global_init(cls, resource_limits: Dict[str, int], aging_seconds: float = 300.0):
         with cls._lock:
-            cls._cv = threading.Condition(cls._lock)
+            assert not cls._queue
             cls._state["host_cpu"] = resource_limits["cpu"]
             cls._state["host_memory"] = resource_limits["mem_bytes"]
             cls._state["used_cpu"] = 0
             cls._state["used_memory"] = 0
+            cls._aging_seconds = aging_seconds
+            cls._stats = {"admitted": 0, "total_seconds_waited": 0.0, "max_seconds_waited": 0.0}
+
+    @classmethod
+    def stats(cls) -> Dict[str, float]:
+        """
+        Queue instrumentation: the number of reservations admitted so far, their total & maximum
+        time waited in the queue, and the number currently queued
+        """
+        with cls._lock:
+            return dict(cls._stats, queued=len(cls._queue))
 
     def __init__(self, cpu_reservation: int, memory_reservation: int):
-        assert self._cv
+        assert self._state
         assert 0 <= cpu_reservation <= self._state["host_cpu"]
         assert 0 <= memory_reservation <= self._state["host_memory"]
         self.cpu_reservation = cpu_reservation
         self.memory_reservation = memory_reservation
 
     def __enter__(self):
-        t0 = time.time()
-        with self._cv:
-            while (
-                self._state["used_cpu"] + self.cpu_reservation > self._state["host_cpu"]
-                or self._state["used_memory"] + self.memory_reservation > self._state["host_memory"]
-            ):
-                self._cv.wait()
-            self._state["used_cpu"] = self._state["used_cpu"] + self.cpu_reservation
-            self._state["used_memory"] = self._state["used_memory"] + self.memory_reservation
-        self.delay = int(time.time() - t0)
+        admitted = threading.Event()
+        self._enqueue(admitted.set)
+        admitted.wait()
 
     def __exit__(self, *exc):
-        with self._cv:
+        with self._lock:
             self._state["used_cpu"] = self._state["used_cpu"] - self.cpu_reservation
             assert 0 <= self._state["used_cpu"] <= self._state["host_cpu"]
             self._state["used_memory"] = self._state["used_memory"] - self.memory_reservation
             assert 0 <= self._state["used_memory"] <= self._state["host_memory"]
-            self._cv.notify()
+            self._admit_queued()
+
+    async def __aenter__(self):
+        # on the event loop, suspend the coroutine until admitted, instead of blocking
+        if not _event_loop.current():
+            return self.__enter__()
+        admitted = asyncio.get_running_loop().create_future()
+        self._enqueue(lambda: _event_loop.notify(admitted))
+        try:
+            await admitted
+        except BaseException:
+            # cancelled: leave the queue, or give back the reservation if admitted meanwhile
+            with self._lock:
+                if not self._admitted:
+                    self._queue.remove(self)
+                    return_reservation = False
+                else:
+                    return_reservation = True
+            if return_reservation:
+                self.__exit__()
+            raise
+
+    async def __aexit__(self, *exc):
+        return self.__exit__(*exc)
+
+    def _enqueue(self, wake: Callable[[], None]) -> None:
+        with self._lock:
+            self._enqueued = time.time()
+            self._wake = wake
+            self._queue.append(self)
+            self._admit_queued()
+
+    @classmethod
+    def _admit_queued(cls) -> None:
+        # with _lock held: admit queued reservations that fit, first-fit in arrival order, until
+        # reaching one which doesn't fit and has aged past backfill_aging_seconds
+        now = time.time()
+        admitted = []
+        for request in cls._queue:
+            if request._fits():
+                request._reserve()
+                admitted.append(request)
+            elif now - request._enqueued >= cls._aging_seconds:
+                break
+        if admitted:
+            cls._queue = [request for request in cls._queue if not request._admitted]
+        for request in admitted:
+            waited = now - request._enqueued
+            request.delay = int(waited)
+            cls._stats["admitted"] += 1
+            cls._stats["total_seconds_waited"] += waited
+            cls._stats["max_seconds_waited"] = max(cls._stats["max_seconds_waited"], waited)
+            request._wake()
+
+    def _fits(self) -> bool:
+        return (
+            self._state["used_cpu"] + self.cpu_reservation <= self._state["host_cpu"]
+            and self._state["used_memory"] + self.memory_reservation <= self._state["host_memory"]
+        )
+
+    def _reserve(self) -> None:
+        self._state["used_cpu"] = self._state["used_cpu"] + self.cpu_reservation
+        self._state["used_memory"] = self._state["used_memory"] + self.memory_reservation
+        self._admitted = True
@@ -4,6 +4,8 @@ Default TaskContainer implementation using Docker Swarm
 
 import os
 import json
+import atexit
+import asyncio
 import stat
 import time
 import shlex
@@ -16,12 +18,13 @@ import threading
 import traceback
 import contextlib
 from io import BytesIO
-from typing import List, Dict, Set, Optional, Any, Callable, Tuple, Iterable
+from typing import List, Dict, Set, Optional, Any, Callable, Tuple, Iterable, Iterator
 import docker
+import requests.exceptions
 from ... import Error
 from ..._util import chmod_R_plus, TerminationSignalFlag
 from ..._util import StructuredLogMessage as _
-from .. import config
+from .. import config, _event_loop
 from ..error import Interrupted, Terminated
 from ..task_container import TaskContainer
 
@@ -32,6 +35,7 @@ class SwarmContainer(TaskContainer):
     """
 
     _limits: Dict[str, int] = {}
+    _watcher: "Optional[_SwarmWatcher]" = None
 
     @classmethod
     def global_init(cls, cfg: config.Loader, logger: logging.Logger) -> None:
@@ -148,6 +152,17 @@ class SwarmContainer(TaskContainer):
         )
         cls._limits = {"cpu": max_cpu, "mem_bytes": max_mem}
 
+        if cls._watcher:
+            cls._watcher.close()
+            cls._watcher = None
+        if cfg.get_bool("docker_swarm", "event_watcher"):
+            cls._watcher = _SwarmWatcher(
+                logger.getChild("docker_swarm_watcher"),
+                cfg.get_float("docker_swarm", "polling_period_seconds"),
+                cfg.get_int("docker_swarm", "server_error_retries"),
+            )
+            atexit.register(cls._watcher.close)
+
     @classmethod
     def detect_resource_limits(cls, cfg: config.Loader, logger: logging.Logger) -> Dict[str, int]:
         assert cls._limits, f"{cls.__name__}.global_init"
@@ -173,24 +188,16 @@ class SwarmContainer(TaskContainer):
         self._bind_input_files = True
 
     def _run(self, logger: logging.Logger, terminating: Callable[[], bool], command: str) -> int:
-        self._observed_states = set()
-        with open(os.path.join(self.host_dir, "command"), "w") as outfile:
-            outfile.write(command)
+        return _event_loop.run_sync(self._run_async(logger, terminating, command))
 
-        # prepare docker configuration
-        client = docker.from_env(version="auto", timeout=900)
-        if "inlineDockerfile" in self.runtime_values:
-            logger.warning(
-                "runtime.inlineDockerfile is an experimental extension, subject to change"
-            )
-            image_tag = self.build_inline_dockerfile(logger.getChild("inlineDockerfile"), client)
-        else:
-            image_tag = self.resolve_tag(
-                logger, client, self.runtime_values.get("docker", "ubuntu:20.04")
-            )
-        mounts = self.prepare_mounts(logger)
-        resources, user, groups = self.misc_config(logger)
+    async def _run_async(
+        self, logger: logging.Logger, terminating: Callable[[], bool], command: str
+    ) -> int:
+        # dockerd requests & filesystem operations are offloaded; waiting between polls isn't
+        self._observed_states = set()
+        await _event_loop.offload(self._write_command, command)
 
+        client = await _event_loop.offload(docker.from_env, version="auto", timeout=900)
         polling_period = self.cfg.get_float("docker_swarm", "polling_period_seconds")
         server_error_retries = self.cfg.get_int("docker_swarm", "server_error_retries")
 
@@ -199,67 +206,56 @@ class SwarmContainer(TaskContainer):
         svc = None
         exit_code = None
         try:
-            kwargs = {
-                # unique name with some human readability; docker limits to 63 chars (issue #327)
-                "name": self.unique_service_name(self.run_id),
-                "command": [
-                    "/bin/sh",
-                    "-c",
-                    self.cfg.get("task_runtime", "command_shell")
-                    + " ../command >> ../stdout.txt 2>> ../stderr.txt",
-                ],
-                # restart_policy 'none' so that swarm runs the container just once
-                "restart_policy": docker.types.RestartPolicy("none"),
-                "workdir": os.path.join(self.container_dir, "work"),
-                "mounts": mounts,
-                "resources": resources,
-                "user": user,
-                "groups": groups,
-                "labels": {"miniwdl_run_id": self.run_id},
-                "container_labels": {"miniwdl_run_id": self.run_id},
-                "env": [f"{k}={v}" for (k, v) in self.runtime_values.get("env", {}).items()],
-            }
-            network = self.runtime_values.get("docker_network", None)
-            if network:
-                if network in self.cfg.get_list("docker_swarm", "allow_networks"):
-                    kwargs["networks"] = [network]
-                else:
-                    logger.warning(
-                        _(
-                            "runtime.docker_network ignored; network name must appear in JSON list from config"
-                            " [docker_swarm] allow_networks / env MINIWDL__DOCKER_SWARM__ALLOW_NETWORKS",
-                            docker_network=network,
-                        )
-                    )
-            if self.runtime_values.get("privileged", False) is True:
-                logger.warning("runtime.privileged enabled (security & portability warning)")
-                kwargs["cap_add"] = ["ALL"]
-            kwargs.update(self.create_service_kwargs or {})
-            logger.debug(_("docker create service kwargs", **kwargs))
-            svc = client.services.create(image_tag, **kwargs)
+            if self.adopt:
+                svc = await _event_loop.offload(self._adopt_service, logger, client)
+            else:
+                svc = await self._create_service(logger, client)
             logger.debug(_("docker service", name=svc.name, id=svc.short_id))
 
             # stream stderr into log
-            with contextlib.ExitStack() as cleanup:
-                poll_stderr = cleanup.enter_context(self.poll_stderr_context(logger))
+            async with contextlib.AsyncExitStack() as cleanup:
+                poll_stderr = await _event_loop.enter_context(
+                    cleanup, self.poll_stderr_context(logger)
+                )
+                watch = None
+                if self._watcher:
+                    # let the process-wide watcher track the service status, waking us when it
+                    # changes, instead of polling dockerd ourselves
+                    watch = cleanup.enter_context(self._watcher.watch(svc.id))
 
                 # poll for container exit
                 running_states = {"preparing", "running"}
                 was_running = False
                 server_errors = 0
                 while exit_code is None:
-                    # spread out work over the GIL
-                    time.sleep(random.uniform(polling_period * 0.5, polling_period * 1.5))
+                    if watch:
+                        await watch.wait(polling_period)
+                    else:
+                        # spread out work over the GIL
+                        await _event_loop.sleep(
+                            random.uniform(polling_period * 0.5, polling_period * 1.5)
+                        )
                     if terminating():
                         quiet = not self._observed_states.difference(
                             # reduce log noise if the terminated task only sat in docker's queue
                             {"(UNKNOWN)", "new", "allocated", "pending"}
                         )
                         if not quiet:
-                            self.poll_service(logger, svc, verbose=True)
+                            await _event_loop.offload(
+                                self.poll_service,
+                                logger,
+                                svc,
+                                verbose=True,
+                                tasks=(watch.tasks() if watch else None),
+                            )
                         raise Terminated(quiet=quiet)
                     try:
-                        exit_code = self.poll_service(logger, svc)
+                        exit_code = await _event_loop.offload(
+                            self.poll_service,
+                            logger,
+                            svc,
+                            tasks=(watch.tasks() if watch else None),
+                        )
                         if server_errors:
                             logger.error("docker service status polling succeeded after retries")
                         server_errors = 0
@@ -283,13 +279,16 @@ class SwarmContainer(TaskContainer):
                         cleanup.enter_context(self.task_running_context())
                         was_running = True
                     if "running" in self._observed_states:
-                        poll_stderr()
+                        await _event_loop.offload(poll_stderr)
 
+                # (svc.logs() returns a generator reading from dockerd as it's iterated)
+                stdout = await _event_loop.offload(lambda: list(svc.logs(stdout=True)))
+                stderr = await _event_loop.offload(lambda: list(svc.logs(stderr=True)))
                 logger.debug(
                     _(
                         "docker service logs",
-                        stdout=list(msg.decode().rstrip() for msg in svc.logs(stdout=True)),
-                        stderr=list(msg.decode().rstrip() for msg in svc.logs(stderr=True)),
+                        stdout=list(msg.decode().rstrip() for msg in stdout),
+                        stderr=list(msg.decode().rstrip() for msg in stderr),
                     )
                 )
 
@@ -300,7 +299,7 @@ class SwarmContainer(TaskContainer):
             if svc:
                 for attempt in range(999):
                     try:
-                        svc.remove()
+                        await _event_loop.offload(svc.remove)
                         if attempt:
                             logger.error("docker service removal succeeded after retries")
                         break
@@ -315,12 +314,100 @@ class SwarmContainer(TaskContainer):
                         )
                         if attempt >= server_error_retries:
                             break
-                        time.sleep(polling_period)
-            self.chown(
-                logger, client, isinstance(exit_code, int) and self.success_exit_code(exit_code)
+                        await _event_loop.sleep(polling_period)
+            await _event_loop.offload(
+                self.chown,
+                logger,
+                client,
+                isinstance(exit_code, int) and self.success_exit_code(exit_code),
             )
             client.close()
 
+    async def _create_service(
+        self, logger: logging.Logger, client: docker.DockerClient
+    ) -> docker.models.services.Service:
+        # prepare docker configuration
+        if "inlineDockerfile" in self.runtime_values:
+            logger.warning(
+                "runtime.inlineDockerfile is an experimental extension, subject to change"
+            )
+            image_tag = await _event_loop.offload(
+                self.build_inline_dockerfile, logger.getChild("inlineDockerfile"), client
+            )
+        else:
+            image_tag = await _event_loop.offload(
+                self.resolve_tag, logger, client, self.runtime_values.get("docker", "ubuntu:20.04")
+            )
+        mounts = await _event_loop.offload(self.prepare_mounts, logger)
+        resources, user, groups = await _event_loop.offload(self.misc_config, logger)
+
+        kwargs = {
+            # unique name with some human readability; docker limits to 63 chars (issue #327)
+            "name": self.unique_service_name(self.run_id),
+            "command": [
+                "/bin/sh",
+                "-c",
+                self.cfg.get("task_runtime", "command_shell")
+                + " ../command >> ../stdout.txt 2>> ../stderr.txt",
+            ],
+            # restart_policy 'none' so that swarm runs the container just once
+            "restart_policy": docker.types.RestartPolicy("none"),
+            "workdir": os.path.join(self.container_dir, "work"),
+            "mounts": mounts,
+            "resources": resources,
+            "user": user,
+            "groups": groups,
+            "labels": {"miniwdl_run_id": self.run_id, "miniwdl_host_dir": self.host_dir},
+            "container_labels": {"miniwdl_run_id": self.run_id},
+            "env": [f"{k}={v}" for (k, v) in self.runtime_values.get("env", {}).items()],
+        }
+        network = self.runtime_values.get("docker_network", None)
+        if network:
+            if network in self.cfg.get_list("docker_swarm", "allow_networks"):
+                kwargs["networks"] = [network]
+            else:
+                logger.warning(
+                    _(
+                        "runtime.docker_network ignored; network name must appear in JSON list from config"
+                        " [docker_swarm] allow_networks / env MINIWDL__DOCKER_SWARM__ALLOW_NETWORKS",
+                        docker_network=network,
+                    )
+                )
+        if self.runtime_values.get("privileged", False) is True:
+            logger.warning("runtime.privileged enabled (security & portability warning)")
+            kwargs["cap_add"] = ["ALL"]
+        kwargs.update(self.create_service_kwargs or {})
+        logger.debug(_("docker create service kwargs", **kwargs))
+        return await _event_loop.offload(client.services.create, image_tag, **kwargs)
+
+    @classmethod
+    def adoptable(cls, cfg: config.Loader, logger: logging.Logger, host_dir: str) -> bool:
+        client = docker.from_env(version="auto", timeout=900)
+        try:
+            return bool(cls._services_in(client, host_dir))
+        finally:
+            client.close()
+
+    def _adopt_service(
+        self, logger: logging.Logger, client: docker.DockerClient
+    ) -> docker.models.services.Service:
+        services = self._services_in(client, self.host_dir)
+        if len(services) != 1:
+            raise Interrupted("docker service to adopt no longer exists")
+        logger.notice(_("adopted docker service", name=services[0].name))
+        return services[0]
+
+    @staticmethod
+    def _services_in(
+        client: docker.DockerClient, host_dir: str
+    ) -> List[docker.models.services.Service]:
+        # services started by any miniwdl process for the given task run directory
+        return client.services.list(filters={"label": f"miniwdl_host_dir={host_dir}"})
+
+    def _write_command(self, command: str) -> None:
+        with open(os.path.join(self.host_dir, "command"), "w") as outfile:
+            outfile.write(command)
+
     def resolve_tag(
         self, logger: logging.Logger, client: docker.DockerClient, image_tag: str
     ) -> str:
@@ -356,9 +443,18 @@ class SwarmContainer(TaskContainer):
         mounts = []
         # mount input files/directories and command
         if self._bind_input_files:
+            input_mounts = self.prepare_input_mounts()
+            if len(input_mounts) < len(self.input_path_map):
+                logger.info(
+                    _(
+                        "consolidated input mounts",
+                        inputs=len(self.input_path_map),
+                        mounts=len(input_mounts),
+                    )
+                )
             perm_warn = True
-            for host_path, container_path in self.input_path_map.items():
-                st = os.stat(host_path.rstrip("/"))
+            for container_path, host_path in input_mounts:
+                st = os.stat(host_path)
                 if perm_warn and not (
                     (st.st_mode & stat.S_IROTH)
                     or (st.st_gid == os.getegid() and (st.st_mode & stat.S_IRGRP))
@@ -372,16 +468,10 @@ class SwarmContainer(TaskContainer):
                         )
                     )
                     perm_warn = False
-                assert (not container_path.endswith("/")) or stat.S_ISDIR(st.st_mode)
-                host_mount_point = self.host_work_path(container_path)
-                if not os.path.exists(host_mount_point):
-                    self.touch_mount_point(
-                        host_mount_point + ("/" if container_path.endswith("/") else "")
-                    )
                 mounts.append(
                     docker.types.Mount(
-                        escape(container_path.rstrip("/")),
-                        escape(host_path.rstrip("/")),
+                        escape(container_path),
+                        escape(host_path),
                         type="bind",
                         read_only=True,
                     )
@@ -487,14 +577,23 @@ class SwarmContainer(TaskContainer):
         return (resources if resources else None), user, groups
 
     def poll_service(
-        self, logger: logging.Logger, svc: docker.models.services.Service, verbose: bool = False
+        self,
+        logger: logging.Logger,
+        svc: docker.models.services.Service,
+        verbose: bool = False,
+        tasks: Optional[List[Dict[str, Any]]] = None,
     ) -> Optional[int]:
+        """
+        Check the status of the service's docker task, returning its exit code once it has exited.
+        The task list is fetched from dockerd unless supplied (by the process-wide watcher).
+        """
         state = "(UNKNOWN)"
         status = {}
 
-        svc.reload()
-        assert svc.attrs["Spec"]["Labels"]["miniwdl_run_id"] == self.run_id
-        tasks = svc.tasks()
+        if tasks is None:
+            svc.reload()
+            assert svc.attrs["Spec"]["Labels"]["miniwdl_run_id"] == self.run_id
+            tasks = svc.tasks()
         if tasks:
             assert len(tasks) == 1, "docker service should have at most 1 task"
             status = tasks[0]["Status"]
@@ -703,3 +802,266 @@ class SwarmContainer(TaskContainer):
         write_log(build_log)
         logger.notice(_("docker build", tag=image.tags[0], id=image.id, log=build_logfile))
         return tag
+
+
+class _ServiceWatch:
+    """
+    One service's registration with the _SwarmWatcher, through which the task thread (or
+    coroutine) receives the latest docker task list for the service.
+    """
+
+    service_id: str
+    _tasks: List[Dict[str, Any]]
+    _error: Optional[Exception]
+    _changed: threading.Event
+    _waiter: "Optional[asyncio.Future[None]]"
+    _sweep_failures: int
+
+    def __init__(self, service_id: str) -> None:
+        self.service_id = service_id
+        self._tasks = []
+        self._error = None
+        self._changed = threading.Event()
+        self._waiter = None
+        self._sweep_failures = 0
+
+    async def wait(self, timeout: float) -> None:
+        """
+        Wait for the service's task list to change, up to the timeout (suspending the coroutine
+        on the event loop, otherwise blocking the thread)
+        """
+        if _event_loop.current():
+            # register the waiter before checking the flag, which _update() sets before checking
+            # for a waiter; so one way or the other, we can't miss an update
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                if not self._changed.is_set():
+                    await asyncio.wait_for(self._waiter, timeout)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                self._waiter = None
+        else:
+            self._changed.wait(timeout)
+        self._changed.clear()
+
+    def tasks(self) -> List[Dict[str, Any]]:
+        """
+        Latest task list for the service, as of the watcher's last sweep
+
+        :raise Exception: error encountered by the watcher's last sweep (raised once)
+        """
+        error = self._error
+        if error is not None:
+            self._error = None
+            raise error
+        return self._tasks
+
+    def _update(self, tasks: Optional[List[Dict[str, Any]]], error: Optional[Exception]) -> bool:
+        if error is not None:
+            self._error = error
+        elif tasks == self._tasks:
+            return False
+        else:
+            assert tasks is not None
+            self._tasks = tasks
+        self._changed.set()
+        waiter = self._waiter
+        if waiter is not None:
+            _event_loop.notify(waiter)
+        return True
+
+
+class _SwarmWatcher:
+    """
+    Process-wide monitor of the docker services run by SwarmContainer. Instead of each task thread
+    polling dockerd for its own service's status (two requests per running task per polling
+    period), a single background thread sweeps the task lists of all watched services with a few
+    batched requests, and wakes the task threads whose status changed. Another background thread
+    consumes the dockerd event stream, expediting a sweep when any of our containers starts or
+    exits; the periodic sweep remains as the fallback for events missed or not visible from this
+    node (e.g. containers running on other swarm workers).
+
+    Transient dockerd errors (5xx status, connection failures & timeouts) during a sweep are
+    retried in subsequent periodic sweeps, and delivered to the task threads only after
+    ``server_error_retries`` consecutive failures. Other errors are delivered only to the task
+    threads of the services whose requests failed.
+    """
+
+    _SWEEP_BATCH = 100  # service IDs per task list request
+    _EXPEDITE_PERIOD = 0.1  # seconds between sweeps of services with reported container events
+    _EXPEDITE_TRIES = 20
+
+    _logger: logging.Logger
+    _polling_period: float
+    _client: docker.DockerClient
+    _lock: threading.Lock
+    _watches: Dict[str, _ServiceWatch]
+    _expedite: Dict[str, int]
+    _wake: threading.Event
+    _stop: threading.Event
+    _events: Optional[Any]
+    _server_error_retries: int
+
+    def __init__(
+        self, logger: logging.Logger, polling_period: float, server_error_retries: int = 2
+    ) -> None:
+        self._logger = logger
+        self._polling_period = polling_period
+        self._server_error_retries = server_error_retries
+        self._client = docker.from_env(version="auto", timeout=900)
+        self._lock = threading.Lock()
+        self._watches = {}
+        self._expedite = {}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._events = None
+        for target in (self._sweep_loop, self._event_loop):
+            threading.Thread(target=target, name=f"miniwdl{target.__name__}", daemon=True).start()
+
+    def close(self) -> None:
+        "Stop the background threads"
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._wake.set()
+        # interrupt the event stream read
+        events = self._events
+        if events is not None:
+            try:
+                events.close()
+            except Exception:
+                pass
+        self._client.close()
+
+    @contextlib.contextmanager
+    def watch(self, service_id: str) -> Iterator[_ServiceWatch]:
+        "Context manager registering a service for the duration"
+        ans = _ServiceWatch(service_id)
+        with self._lock:
+            assert service_id not in self._watches
+            self._watches[service_id] = ans
+            # sweep the new service promptly
+            self._expedite[service_id] = 1
+        self._wake.set()
+        try:
+            yield ans
+        finally:
+            with self._lock:
+                del self._watches[service_id]
+
+    def _sweep_loop(self) -> None:
+        last_full_sweep = 0.0
+        while not self._stop.is_set():
+            with self._lock:
+                expedite = bool(self._expedite)
+            self._wake.wait(self._EXPEDITE_PERIOD if expedite else self._polling_period)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            full = time.time() - last_full_sweep >= self._polling_period
+            if full:
+                last_full_sweep = time.time()
+            with self._lock:
+                if full:
+                    watches = list(self._watches.values())
+                else:
+                    # sweep only the services whose containers were reported by the event stream
+                    watches = [self._watches[k] for k in self._expedite if k in self._watches]
+                for k in list(self._expedite.keys()):
+                    self._expedite[k] -= 1
+                    if self._expedite[k] <= 0 or k not in self._watches:
+                        del self._expedite[k]
+            if watches:
+                changed = self._sweep(watches)
+                with self._lock:
+                    for k in changed:
+                        self._expedite.pop(k, None)
+
+    def _sweep(self, watches: List[_ServiceWatch]) -> List[str]:
+        # refresh the watches' task lists, returning the IDs of services whose status changed
+        changed = []
+        for i in range(0, len(watches), self._SWEEP_BATCH):
+            batch = watches[i : i + self._SWEEP_BATCH]
+            try:
+                tasks = self._fetch_tasks([w.service_id for w in batch])
+            except Exception as exn:
+                self._logger.debug(traceback.format_exc())
+                if _transient_error(exn) or len(batch) == 1:
+                    for w in batch:
+                        self._sweep_error(w, exn)
+                    continue
+                # isolate the failure by requesting the batch's services individually
+                tasks = {}
+                for w in batch:
+                    try:
+                        tasks.update(self._fetch_tasks([w.service_id]))
+                    except Exception as exn2:
+                        self._logger.debug(traceback.format_exc())
+                        self._sweep_error(w, exn2)
+            for w in batch:
+                if w.service_id in tasks:
+                    w._sweep_failures = 0
+                    if w._update(tasks[w.service_id], None):
+                        changed.append(w.service_id)
+        return changed
+
+    def _fetch_tasks(self, service_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        tasks: Dict[str, List[Dict[str, Any]]] = dict((svc_id, []) for svc_id in service_ids)
+        for task in self._client.api.tasks(filters={"service": service_ids}):
+            if task.get("ServiceID") in tasks:
+                tasks[task["ServiceID"]].append(task)
+        return tasks
+
+    def _sweep_error(self, w: _ServiceWatch, exn: Exception) -> None:
+        # leave a transient error to be retried by the next periodic sweep, until it recurs too
+        # many times; then (or for any other error) deliver it to the task thread, which decides
+        # whether to retry
+        w._sweep_failures += 1
+        if _transient_error(exn) and w._sweep_failures <= self._server_error_retries:
+            self._logger.warning(
+                _(
+                    "docker task status sweep error; will retry",
+                    service=w.service_id,
+                    tries_remaining=(self._server_error_retries - w._sweep_failures + 1),
+                    exception=str(exn),
+                )
+            )
+            return
+        w._sweep_failures = 0
+        w._update(None, exn)
+
+    def _event_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                events = self._events = self._client.events(
+                    decode=True,
+                    filters={"type": "container", "label": "miniwdl_run_id"},
+                )
+                for event in events:
+                    if self._stop.is_set():
+                        break
+                    if event.get("Action") in ("start", "die", "oom", "kill"):
+                        attributes = event.get("Actor", {}).get("Attributes", {})
+                        service_id = attributes.get("com.docker.swarm.service.id")
+                        with self._lock:
+                            if service_id in self._watches:
+                                # the swarm task status may lag the container event, so sweep
+                                # this service frequently until its status changes
+                                self._expedite[service_id] = self._EXPEDITE_TRIES
+                                self._wake.set()
+            except Exception as exn:
+                if self._stop.is_set():
+                    break
+                self._logger.debug(traceback.format_exc())
+                self._logger.warning(
+                    _("docker event stream error; will reconnect", exception=str(exn))
+                )
+            self._stop.wait(self._polling_period)
+
+
+def _transient_error(exn: Exception) -> bool:
+    # whether a dockerd request error may resolve on retry
+    if isinstance(exn, docker.errors.APIError):
+        return bool(exn.is_server_error())
+    return isinstance(exn, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
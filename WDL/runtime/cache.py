@@ -6,17 +6,20 @@ referenced therein, and updates their access timestamps (atime).
 
 import json
 import os
+import stat
 import logging
 import hashlib
 import base64
 from pathlib import Path
-from typing import Dict, Optional, Union, Any, Iterable, Iterator, Set
+from typing import Dict, List, Optional, Tuple, Union, Any, Iterable, Iterator, Set
 from contextlib import AbstractContextManager, suppress
 from urllib.parse import urlparse, urlunparse
 from fnmatch import fnmatchcase
 from threading import Lock
+from concurrent import futures
 
 from . import config
+from ._file_digest import FileDigestIndex
 
 from .. import Env, Value, Type
 from .._util import (
@@ -27,7 +30,9 @@ from .._util import (
     bump_atime,
 )
 
-CALL_CACHE_VERSION = 2
+CALL_CACHE_VERSION = 3
+# how many recent runtimes of each task to remember (see CallCache.task_runtime())
+TASK_RUNTIME_HISTORY = 8
 
 
 class CallCacheAddPaths:
@@ -78,19 +83,15 @@ def digest_inputs(inputs: Env.Bindings[Value.Base]) -> str:
     """
     Digest the call-cache input envelope. Versioning this digest moves new cache formats to new
     filenames, so older miniwdl versions won't encounter entries they can't validate correctly.
+
+    The digest combines each input name with its value's ``digest``, which is remembered on the
+    value object; so large values passed along to many calls (e.g. an ``Array[File]`` shared among
+    scatter shards) are only traversed once.
     """
-    from .. import values_to_json
-
-    key_json = json.dumps(
-        {
-            "miniwdlCallCacheVersion": CALL_CACHE_VERSION,
-            "inputs": values_to_json(inputs),
-        },
-        separators=(",", ":"),
-        sort_keys=True,
-    )
-    sha256 = hashlib.sha256(key_json.encode("utf-8")).digest()
-    return base64.b32encode(sha256[:20]).decode().lower()
+    hasher = hashlib.sha256(f"miniwdlCallCacheVersion={CALL_CACHE_VERSION}\0".encode())
+    for name, digest in sorted((b.name, b.value.digest) for b in inputs):
+        hasher.update(name.encode("utf-8") + b"\0" + digest)
+    return base64.b32encode(hasher.digest()[:20]).decode().lower()
 
 
 def call_cache_key(name: str, digest: str, inputs: Env.Bindings[Value.Base]) -> str:
@@ -110,6 +111,15 @@ class CallCache(AbstractContextManager):
     _workflow_downloads: Dict[str, str]
     _workflow_directory_downloads: Dict[str, str]
     _entry_add_paths: Dict[str, CallCacheAddPaths]
+    # Likewise, fingerprints of local files/directories checked for cache entry coherence are
+    # memoized for the lifetime of this instance (the current run).
+    _fingerprints: "_PathFingerprints"
+    # with [call_cache] content_digest: persistent index of local files' content digests, and
+    # memo of call keys computed by call_key() (from the corresponding path-based keys); and the
+    # keys returned by call_key() upon failure to digest the inputs, which get() & put() ignore
+    _file_digests: Optional[FileDigestIndex]
+    _content_keys: Dict[str, str]
+    _uncacheable: Set[str]
     _lock: Lock
 
     def __init__(self, cfg: config.Loader, logger: logging.Logger):
@@ -119,6 +129,9 @@ class CallCache(AbstractContextManager):
         self._workflow_downloads = {}
         self._workflow_directory_downloads = {}
         self._entry_add_paths = {}
+        self._fingerprints = _PathFingerprints(cfg["call_cache"].get_int("coherence_threads"))
+        self._content_keys = {}
+        self._uncacheable = set()
         self._lock = Lock()
         self._download_cache_dir = cfg["download_cache"]["dir"]
         self._download_cache_dir = (
@@ -138,14 +151,79 @@ class CallCache(AbstractContextManager):
                 pass
         if cfg["call_cache"].get_bool("put"):
             os.makedirs(self._call_cache_dir, exist_ok=True)
+        self._file_digests = None
+        if cfg["call_cache"].get_bool("content_digest"):
+            self._file_digests = FileDigestIndex(
+                os.path.join(self._call_cache_dir, "file_digests.sqlite3"),
+                cfg["call_cache"].get_int("digest_threads"),
+            )
 
     def __enter__(self) -> "CallCache":
         self._flocker.__enter__()
         return self
 
     def __exit__(self, *args) -> None:
+        self._fingerprints.shutdown()
+        if self._file_digests:
+            self._file_digests.close()
         self._flocker.__exit__(*args)
 
+    def call_key(self, name: str, digest: str, inputs: Env.Bindings[Value.Base]) -> str:
+        """
+        Compute the cache key for a call of the task/workflow (given its name & digest) on the
+        inputs. Normally the key digests input File/Directory paths (see ``call_cache_key()``);
+        with [call_cache] content_digest, local files & directories are digested by content
+        instead, so that the same content at different paths yields the same key. If that fails
+        (e.g. an unreadable input file), the call is uncacheable: get() misses and put() doesn't
+        store it.
+        """
+        key = call_cache_key(name, digest, inputs)
+        if not self._file_digests:
+            return key
+        with self._lock:
+            if key in self._content_keys:
+                return self._content_keys[key]
+
+        from .download import able as downloadable
+
+        paths = []
+
+        def collect(v: Union[Value.File, Value.Directory]) -> str:
+            if not downloadable(self._cfg, v.value):
+                paths.append((v.value, isinstance(v, Value.Directory)))
+            return v.value
+
+        Value.rewrite_env_paths(inputs, collect)
+        try:
+            content_digests = self._file_digests.digest_all(paths)
+        except OSError as exn:
+            self._logger.warning(
+                _(
+                    "unable to digest call inputs; call cache disabled for this call",
+                    call=name,
+                    error=str(exn),
+                )
+            )
+            with self._lock:
+                self._uncacheable.add(key)
+            return key
+        digests = {
+            path: "sha256:" + content_digest
+            for path, content_digest in zip(paths, content_digests)
+            if content_digest
+        }
+        content_key = call_cache_key(
+            name,
+            digest,
+            Value.rewrite_env_paths(
+                inputs,
+                lambda v: digests.get((v.value, isinstance(v, Value.Directory)), v.value),
+            ),
+        )
+        with self._lock:
+            self._content_keys[key] = content_key
+        return content_key
+
     def get(
         self, key: str, inputs: Env.Bindings[Value.Base], output_types: Env.Bindings[Type.Base]
     ) -> Optional[Env.Bindings[Value.Base]]:
@@ -155,17 +233,21 @@ class CallCache(AbstractContextManager):
         """
         from .. import values_from_json
 
-        file_path = os.path.join(self._call_cache_dir, f"{key}.json")
+        file_path = self._entry_name(key)
 
-        if not self._cfg["call_cache"].get_bool("get"):
+        if not self._cfg["call_cache"].get_bool("get") or key in self._uncacheable:
             return None
 
         cache = None
         run_dir = None
         cache_paths = CallCacheAddPaths()
+        entry_mtime = 0
         try:
-            with open(file_path, "rb") as file_reader:
-                envelope = json.loads(file_reader.read())
+            entry = self._read_entry(key)
+            if entry is None:
+                self._logger.info(_("call cache miss", cache_file=file_path))
+            else:
+                envelope, entry_mtime = entry
                 # should never fail because the version is mixed into the cache key:
                 assert envelope.get("miniwdlCallCacheVersion") == CALL_CACHE_VERSION
                 run_dir = envelope.get("dir", None)
@@ -173,8 +255,6 @@ class CallCache(AbstractContextManager):
                     envelope.get("additionalPaths", []), envelope.get("absentPaths", [])
                 )
                 cache = values_from_json(envelope["outputs"], output_types)
-        except FileNotFoundError:
-            self._logger.info(_("call cache miss", cache_file=file_path))
         except Exception as exn:
             self._logger.warning(
                 _("call cache entry present, but unreadable", cache_file=file_path, error=str(exn))
@@ -187,19 +267,40 @@ class CallCache(AbstractContextManager):
                     cache_file=file_path,
                 )
             )
+            # Take the shared flock on the outputs before checking them, so that cache_gc can't
+            # evict them in the meantime; then make sure it hadn't already (it deletes the entry
+            # first, while holding the exclusive flock).
+            self._use_entry(key, run_dir)
+            try:
+                evicted = self._read_entry(key) is None
+            except Exception:
+                evicted = True
+            if evicted:
+                self._logger.info(_("call cache entry evicted", cache_file=file_path))
+                return None
             # check that no files/directories referenced by the inputs & cached outputs are newer
-            # than the cache file itself
+            # than the cache entry itself (the inputs needn't be checked if their content digests
+            # are part of the key)
             if (
-                _check_files_coherence(self._cfg, self._logger, file_path, inputs)
-                and _check_files_coherence(self._cfg, self._logger, file_path, cache)
-                and _check_add_paths_coherence(self._logger, file_path, cache_paths)
+                (
+                    self._file_digests is not None
+                    or _check_files_coherence(
+                        self._cfg, self._logger, self._fingerprints, file_path, entry_mtime, inputs
+                    )
+                )
+                and _check_files_coherence(
+                    self._cfg, self._logger, self._fingerprints, file_path, entry_mtime, cache
+                )
+                and _check_add_paths_coherence(
+                    self._logger, self._fingerprints, file_path, entry_mtime, cache_paths
+                )
             ):
                 self._entry_add_paths[key] = cache_paths.copy()
                 return cache
             else:
                 # otherwise, clean it up
                 try:
-                    os.remove(file_path)
+                    self._delete_entry(key)
                 except Exception as exn:
                     self._logger.warning(
                         _(
@@ -226,7 +327,7 @@ class CallCache(AbstractContextManager):
         from .. import values_to_json
 
         cache_paths = add_paths.copy()
-        if self._cfg["call_cache"].get_bool("put"):
+        if self._cfg["call_cache"].get_bool("put") and key not in self._uncacheable:
             envelope = {
                 "miniwdlCallCacheVersion": CALL_CACHE_VERSION,
                 "inputs": values_to_json(inputs),
@@ -236,18 +337,126 @@ class CallCache(AbstractContextManager):
             }
             if run_dir:
                 envelope["dir"] = run_dir
-            filename = os.path.join(self._call_cache_dir, key + ".json")
-            Path(filename).parent.mkdir(parents=True, exist_ok=True)
-            write_atomic(json.dumps(envelope, indent=2), filename)
-            self._logger.info(_("call cache insert", cache_file=filename))
+            self._write_entry(key, envelope)
+            self._logger.info(_("call cache insert", cache_file=self._entry_name(key)))
         self._entry_add_paths[key] = cache_paths.copy()
 
+    # storage of cache entry envelopes, which subclasses may override: the default stores each as
+    # a JSON file {key}.json under the call cache directory
+
+    def _entry_name(self, key: str) -> str:
+        "Identify the stored entry, for log messages"
+        return os.path.join(self._call_cache_dir, key + ".json")
+
+    def _read_entry(self, key: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        """
+        Read the envelope stored for key, and its modification time (nanoseconds since the epoch);
+        or None if there's no such entry. Reading doesn't change the entry's last-use time (which
+        only _touch_entry() does).
+        """
+        filename = self._entry_name(key)
+        try:
+            envelope = json.loads(_read_preserving_atime(filename))
+            return (envelope, _effective_mtime(filename))
+        except FileNotFoundError:
+            return None
+
+    def _write_entry(self, key: str, envelope: Dict[str, Any]) -> None:
+        filename = self._entry_name(key)
+        Path(filename).parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(json.dumps(envelope, indent=2), filename)
+
+    def _delete_entry(self, key: str) -> None:
+        os.remove(self._entry_name(key))
+
+    def _touch_entry(self, key: str) -> None:
+        "Record use of the entry (for least-recently-used eviction)"
+        bump_atime(self._entry_name(key))
+
+    def _list_entries(self) -> Iterator[Tuple[str, int]]:
+        "Enumerate stored entries' keys and last-use times (nanoseconds since the epoch)"
+        # {name}/{digest}/{inputs_digest}.json
+        for root, _subdirs, files in os.walk(self._call_cache_dir):
+            rel = os.path.relpath(root, self._call_cache_dir)
+            if len(rel.split(os.sep)) != 2 or rel.startswith("."):
+                continue
+            for fn in files:
+                if fn.endswith(".json") and fn != "_runtimes.json" and ".tmp." not in fn:
+                    with suppress(FileNotFoundError):
+                        yield (
+                            rel.replace(os.sep, "/") + "/" + fn[: -len(".json")],
+                            os.stat(os.path.join(root, fn)).st_atime_ns,
+                        )
+
+    def _use_entry(self, key: str, run_dir: Optional[str]) -> None:
+        # Upon a cache hit, update the entry's last-use time, and open a shared flock on the
+        # outputs.json in its run directory for the life of this CallCache. Together these keep
+        # cache_gc from evicting the entry's outputs while we may be using them.
+        try:
+            self._touch_entry(key)
+            if run_dir and os.path.isfile(os.path.join(run_dir, "outputs.json")):
+                self.flock(os.path.join(run_dir, "outputs.json"))
+        except Exception as exn:
+            self._logger.warning(
+                _(
+                    "unable to flock cached outputs",
+                    cache_file=self._entry_name(key),
+                    error=str(exn),
+                )
+            )
+
     def get_add_paths(self, key: str) -> CallCacheAddPaths:
         """
-        Retrieve additional paths remembered for a v2 cache hit/insert during this process.
+        Retrieve additional paths remembered for a v2 cache hit/insert during this process. The key
+        may also be the path-based ``call_cache_key()`` corresponding to a ``call_key()``.
         """
+        with self._lock:
+            key = self._content_keys.get(key, key)
         return self._entry_add_paths.get(key, CallCacheAddPaths()).copy()
 
+    # historical task runtimes, kept in the call cache directory alongside the task's entries to
+    # inform workflow scheduling (see _workflow_state.critical_paths)
+
+    def task_runtime(self, name: str, digest: str) -> Optional[float]:
+        """
+        Mean wall-clock seconds taken by the task's recent successful runs, if recorded (and
+        ``[call_cache] get`` is enabled)
+        """
+        if not self._cfg["call_cache"].get_bool("get"):
+            return None
+        seconds = self._read_task_runtimes(name, digest)
+        return sum(seconds) / len(seconds) if seconds else None
+
+    def put_task_runtime(self, name: str, digest: str, seconds: float) -> None:
+        """
+        Record the wall-clock seconds taken by a successful run of the task (if ``[call_cache]
+        put`` is enabled)
+        """
+        if not self._cfg["call_cache"].get_bool("put"):
+            return
+        with self._lock:
+            history = self._read_task_runtimes(name, digest)[-(TASK_RUNTIME_HISTORY - 1) :]
+            history.append(round(seconds, 3))
+            self._write_task_runtimes(name, digest, history)
+
+    def _read_task_runtimes(self, name: str, digest: str) -> List[float]:
+        filename = os.path.join(self._call_cache_dir, name, digest, "_runtimes.json")
+        try:
+            with open(filename) as infile:
+                return [float(v) for v in json.load(infile)["seconds"]]
+        except FileNotFoundError:
+            pass
+        except Exception as exn:
+            self._logger.warning(
+                _("task runtimes file present, but unreadable", file=filename, error=str(exn))
+            )
+        return []
+
+    def _write_task_runtimes(self, name: str, digest: str, seconds: List[float]) -> None:
+        filename = os.path.join(self._call_cache_dir, name, digest, "_runtimes.json")
+        Path(filename).parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(json.dumps({"seconds": seconds}), filename)
+
     # specialized caching logic for file downloads (not sensitive to the downloader task details,
     # and looked up folder structure based on URI instead of opaque digests)
 
@@ -433,40 +642,70 @@ class CallCache(AbstractContextManager):
 
 
 def _check_files_coherence(
-    cfg: config.Loader, logger: logging.Logger, cache_file: str, values: Env.Bindings[Value.Base]
+    cfg: config.Loader,
+    logger: logging.Logger,
+    fingerprints: "_PathFingerprints",
+    cache_file: str,
+    cache_file_mtime: int,
+    values: Env.Bindings[Value.Base],
 ) -> bool:
     """
-    Verify that none of the files/directories referenced by values are newer than cache_file itself
-    (based on posix mtimes).
+    Verify that none of the files/directories referenced by values are newer than the cache entry
+    itself (based on posix mtimes).
     """
     from .download import able as downloadable
 
-    cache_file_mtime = _effective_mtime(cache_file)
+    paths = []
 
-    def check_one(v: Union[Value.File, Value.Directory]):
+    def collect(v: Union[Value.File, Value.Directory]) -> str:
         assert isinstance(v, (Value.File, Value.Directory))
         if not downloadable(cfg, v.value):
-            try:
-                if _path_mtime_after(v.value, cache_file_mtime, isinstance(v, Value.Directory)):
-                    raise StopIteration
-            except (FileNotFoundError, NotADirectoryError, StopIteration):
-                logger.warning(
-                    _(
-                        "cache entry invalid due to deleted or modified file/directory",
-                        cache_file=cache_file,
-                        changed=v.value,
-                    )
-                )
-                raise StopIteration
+            paths.append((v.value, isinstance(v, Value.Directory)))
+        return v.value
 
-    try:
-        Value.rewrite_env_paths(values, check_one)
-        return True
-    except StopIteration:
-        return False
+    Value.rewrite_env_paths(values, collect)
 
-
-def _effective_mtime(path: str) -> float:
+    for (path, _directory), fingerprint in zip(paths, fingerprints.get_all(paths)):
+        if fingerprint is None or fingerprint[0] > cache_file_mtime:
+            logger.warning(
+                _(
+                    "cache entry invalid due to deleted or modified file/directory",
+                    cache_file=cache_file,
+                    changed=path,
+                )
+            )
+            return False
+    return True
+
+
+def _read_preserving_atime(filename: str) -> bytes:
+    # Read the file without updating its atime (the last-use time of a call cache entry, which
+    # the kernel might otherwise update upon reading, e.g. with relatime): open with O_NOATIME if
+    # available & permitted (we own the file), otherwise restore the atime afterwards.
+    fd = None
+    if hasattr(os, "O_NOATIME"):
+        with suppress(PermissionError):
+            fd = os.open(filename, os.O_RDONLY | os.O_NOATIME)
+    restore = fd is None
+    if fd is None:
+        fd = os.open(filename, os.O_RDONLY)
+    try:
+        st = os.fstat(fd)
+        chunks = []
+        while True:
+            chunk = os.read(fd, 1 << 20)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        if restore and os.fstat(fd).st_atime_ns != st.st_atime_ns:
+            with suppress(OSError):
+                os.utime(fd, ns=(st.st_atime_ns, st.st_mtime_ns))
+        return b"".join(chunks)
+    finally:
+        os.close(fd)
+
+
+def _effective_mtime(path: str) -> int:
     """
     Get the effective mtime used for cache freshness checks, considering both a symlink and its
     referent when applicable.
@@ -488,34 +727,123 @@ def _iter_directory_contents(path: str) -> Iterator[str]:
             yield os.path.join(root, fn)
 
 
-def _path_mtime_after(path: str, cutoff_mtime: float, directory: bool) -> bool:
-    if _effective_mtime(path) > cutoff_mtime:
-        return True
-    return directory and any(
-        _effective_mtime(child) > cutoff_mtime for child in _iter_directory_contents(path)
-    )
+class _PathFingerprints:
+    """
+    Memoizes the "fingerprint" of local files/directories checked for call cache coherence: the
+    effective mtime (for a directory, the newest among itself and all its contents) and the mode of
+    the path (following symlinks). A CallCache holds one of these for the lifetime of the run, so
+    that a directory referenced by many cache hits (e.g. a large reference Directory input to
+    scatter shards) is walked only once, even if requested concurrently. The many stats of a
+    directory's contents, and of multiple files checked at once, run on a thread pool to overlap
+    their latencies on network filesystems.
+
+    Paths found missing aren't memoized.
+    """
+
+    _threads: int
+    _pool: Optional[futures.ThreadPoolExecutor]
+    _lock: Lock
+    _memo: Dict[Tuple[str, bool], "futures.Future[Tuple[int, int]]"]
+
+    def __init__(self, threads: int) -> None:
+        self._threads = max(threads, 1)
+        self._pool = None
+        self._lock = Lock()
+        self._memo = {}
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool:
+                self._pool.shutdown()
+                self._pool = None
+            self._memo = {}
+
+    def _executor(self) -> futures.ThreadPoolExecutor:
+        with self._lock:
+            if not self._pool:
+                self._pool = futures.ThreadPoolExecutor(
+                    max_workers=self._threads, thread_name_prefix="miniwdl_cache_stat"
+                )
+            return self._pool
+
+    def get(self, path: str, directory: bool) -> Optional[Tuple[int, int]]:
+        """
+        Get (effective mtime, st_mode) of the path, or None if it doesn't exist (or, if directory,
+        isn't a directory)
+        """
+        key = (path, directory)
+        with self._lock:
+            fut = self._memo.get(key, None)
+            owner = fut is None
+            if fut is None:
+                fut = futures.Future()
+                self._memo[key] = fut
+        if owner:
+            try:
+                fut.set_result(self._compute(path, directory))
+            except Exception as exn:
+                with self._lock:
+                    del self._memo[key]
+                fut.set_exception(exn)
+        try:
+            return fut.result()
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+
+    def get_all(self, paths: List[Tuple[str, bool]]) -> List[Optional[Tuple[int, int]]]:
+        """
+        get() each of the (path, directory) pairs; the files in parallel, then each directory
+        (parallelizing the stats of its contents)
+        """
+        ans: List[Optional[Tuple[int, int]]] = [None] * len(paths)
+        files = [i for i, (_path, directory) in enumerate(paths) if not directory]
+        if len(files) > 1:
+            for i, fingerprint in zip(
+                files, self._executor().map(lambda i: self.get(paths[i][0], False), files)
+            ):
+                ans[i] = fingerprint
+        elif files:
+            ans[files[0]] = self.get(paths[files[0]][0], False)
+        for i, (path, directory) in enumerate(paths):
+            if directory:
+                ans[i] = self.get(path, True)
+        return ans
+
+    def _compute(self, path: str, directory: bool) -> Tuple[int, int]:
+        st = os.stat(path)
+        mtime = max(os.stat(path, follow_symlinks=False).st_mtime_ns, st.st_mtime_ns)
+        mode = st.st_mode
+        if directory:
+            contents = list(_iter_directory_contents(path))
+            if contents:
+                mtime = max(
+                    mtime, max(self._executor().map(_effective_mtime, contents, chunksize=64))
+                )
+        return (mtime, mode)
 
 
 def _check_add_paths_coherence(
-    logger: logging.Logger, cache_file: str, cache_paths: CallCacheAddPaths
+    logger: logging.Logger,
+    fingerprints: _PathFingerprints,
+    cache_file: str,
+    cache_file_mtime: int,
+    cache_paths: CallCacheAddPaths,
 ) -> bool:
     """
     Verify additional present/absent local paths recorded in a v2 cache envelope.
     """
-
-    def check_present(path: str) -> None:
-        isdir = path.endswith("/")
-        path_strip = path.rstrip("/") or "/"
-
-        try:
-            if isdir:
-                if not os.path.isdir(path_strip):
-                    raise StopIteration
-            elif not os.path.isfile(path_strip):
-                raise StopIteration
-            if _path_mtime_after(path_strip, cache_file_mtime, isdir):
-                raise StopIteration
-        except (FileNotFoundError, NotADirectoryError, StopIteration):
+    add_paths = sorted(cache_paths.add_paths)
+    for path, fingerprint in zip(
+        add_paths,
+        fingerprints.get_all([(p.rstrip("/") or "/", p.endswith("/")) for p in add_paths]),
+    ):
+        if (
+            fingerprint is None
+            or not (
+                stat.S_ISDIR(fingerprint[1]) if path.endswith("/") else stat.S_ISREG(fingerprint[1])
+            )
+            or fingerprint[0] > cache_file_mtime
+        ):
             logger.warning(
                 _(
                     "cache entry invalid due to deleted or modified additional path",
@@ -523,25 +851,19 @@ def _check_add_paths_coherence(
                     changed=path,
                 )
             )
-            raise StopIteration
-
-    cache_file_mtime = _effective_mtime(cache_file)
-    try:
-        for path in cache_paths.add_paths:
-            check_present(path)
-        for path in cache_paths.absent_paths:
-            if os.path.exists(path.rstrip("/") or "/"):
-                logger.warning(
-                    _(
-                        "cache entry invalid due to created additional path",
-                        cache_file=cache_file,
-                        changed=path,
-                    )
+            return False
+    # (not memoized, since a task may create one of these during the run)
+    for path in cache_paths.absent_paths:
+        if os.path.exists(path.rstrip("/") or "/"):
+            logger.warning(
+                _(
+                    "cache entry invalid due to created additional path",
+                    cache_file=cache_file,
+                    changed=path,
                 )
-                raise StopIteration
-        return True
-    except StopIteration:
-        return False
+            )
+            return False
+    return True
 
 
 _backends_lock = Lock()
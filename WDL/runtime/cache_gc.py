@@ -0,0 +1,401 @@
+"""
+Eviction of least-recently-used content from the download cache and the call cache, to bound the
+storage they consume (``[download_cache] max_gb`` and ``[call_cache] max_gb``). This runs on demand
+with ``miniwdl cache gc``, or periodically in the background of each run if ``[cache_gc]
+interval_seconds`` is set.
+
+Content in use by any concurrent run is left alone, as indicated by the advisory flocks that runs
+hold: shared flocks on the cached downloads they use and on the ``outputs.json`` of call cache
+entries they reuse, and the exclusive flock on the log file of each running workflow (or task).
+"""
+
+import os
+import time
+import bisect
+import logging
+from contextlib import contextmanager, suppress
+from typing import Dict, List, Optional, Set, Tuple, Iterator, Any
+
+from . import config
+from .cache import CallCache, new as new_call_cache
+from .._util import (
+    StructuredLogMessage as _,
+    FlockHolder,
+    RepeatTimer,
+    rmtree_atomic,
+    path_really_within,
+)
+
+# downloader task directories under the download cache's ops/ are deleted after this long
+OPS_MAX_AGE_SECONDS = 2 * 86400
+
+
+def max_bytes(cfg: config.Loader, section: str) -> Optional[int]:
+    """
+    The configured byte budget (``max_gb``) of the download_cache or call_cache section, or None if
+    unbounded
+    """
+    gb = cfg[section].get_float("max_gb")
+    return int(gb * (1 << 30)) if gb > 0 else None
+
+
+def gc(
+    cfg: config.Loader,
+    logger: logging.Logger,
+    download_max_bytes: Optional[int] = None,
+    call_max_bytes: Optional[int] = None,
+) -> Dict[str, Dict[str, int]]:
+    """
+    Evict least-recently-used items from the download cache, and entries from the call cache,
+    until each is within the given byte budget (None = unbounded). Returns a dict for each cache
+    with the bytes used (before eviction) & reclaimed, and the numbers of items evicted & skipped
+    because they're in use.
+    """
+    with new_call_cache(cfg, logger) as cache:
+        return {
+            "download_cache": evict_downloads(cache, logger, download_max_bytes),
+            "call_cache": evict_calls(cache, logger, call_max_bytes),
+        }
+
+
+def evict_downloads(
+    cache: CallCache, logger: logging.Logger, max_bytes: Optional[int]
+) -> Dict[str, int]:
+    """
+    Evict least-recently-used files & directories from the download cache until the total is
+    within max_bytes, skipping any in use. (Succeeds examples/clean_download_cache.sh)
+    """
+    dirname = cache._download_cache_dir
+    ans = {"used_bytes": 0, "reclaimed_bytes": 0, "evicted": 0, "in_use": 0}
+    if not os.path.isdir(dirname):
+        return ans
+    with FlockHolder(logger) as flocks:
+        # exclusive flock on the whole cache directory, serializing with CallCache.put_download()
+        flockname = os.path.join(dirname, "_miniwdl_flock")
+        with open(flockname, "a"):
+            pass
+        flocks.flock(flockname, exclusive=True, wait=True)
+
+        # delete old detritus of downloader tasks (logs etc.)
+        ops_dir = os.path.join(dirname, "ops")
+        if os.path.isdir(ops_dir):
+            for entry in os.scandir(ops_dir):
+                if (
+                    entry.is_dir(follow_symlinks=False)
+                    and time.time() - entry.stat(follow_symlinks=False).st_ctime
+                    > OPS_MAX_AGE_SECONDS
+                ):
+                    with suppress(FileNotFoundError):
+                        rmtree_atomic(entry.path)
+
+        # cached items are files/{scheme}/{host}/{dir}/{name} & dirs/{scheme}/{host}/{dir}/{name}
+        # (see CallCache.download_path)
+        items = []
+        for kind in ("files", "dirs"):
+            for path in _nested(os.path.join(dirname, kind), 4):
+                if (kind == "dirs") == (os.path.isdir(path) and not os.path.islink(path)):
+                    st = os.stat(path, follow_symlinks=False)
+                    items.append((st.st_atime_ns, path, _disk_usage(path)))
+        used = ans["used_bytes"] = sum(item[2] for item in items)
+        logger.info(_("download cache usage", dir=dirname, bytes=used, items=len(items)))
+
+        for _atime, path, size in sorted(items):
+            if max_bytes is None or used <= max_bytes:
+                break
+            directory = os.path.isdir(path)
+            item_flockname = path + "._miniwdl_flock" if directory else path
+            try:
+                with FlockHolder(logger) as item_flock:
+                    if directory:
+                        with open(item_flockname, "a"):
+                            pass
+                    item_flock.flock(item_flockname, mode=os.O_RDONLY, exclusive=True)
+                    if directory:
+                        rmtree_atomic(path)
+                        os.unlink(item_flockname)
+                    else:
+                        os.unlink(path)
+            except BlockingIOError:
+                logger.info(_("download cache item in use", path=path))
+                ans["in_use"] += 1
+                continue
+            logger.info(_("evicted from download cache", path=path, bytes=size))
+            used -= size
+            ans["reclaimed_bytes"] += size
+            ans["evicted"] += 1
+
+    logger.notice(  # type: ignore
+        _("download cache gc", dir=dirname, max_bytes=max_bytes, **ans)
+    )
+    return ans
+
+
+class _CallEntry:
+    key: str
+    atime: int
+    run_dir: Optional[str]
+    paths: Set[str]  # realpaths of local outputs within run_dir
+
+    def __init__(self, key: str, atime: int, envelope: Dict[str, Any]) -> None:
+        self.key = key
+        self.atime = atime
+        self.run_dir = envelope.get("dir", None)
+        self.paths = set()
+        if self.run_dir and os.path.isdir(self.run_dir):
+            for value in _json_strings(envelope.get("outputs", {})):
+                value = value.rstrip("/")
+                if (
+                    os.path.isabs(value)
+                    and os.path.lexists(value)
+                    and path_really_within(value, self.run_dir)
+                ):
+                    self.paths.add(os.path.realpath(value))
+                    if os.path.islink(value) and path_really_within(
+                        os.path.dirname(value), self.run_dir
+                    ):
+                        # output link in out/, to the file in work/
+                        self.paths.add(
+                            os.path.join(
+                                os.path.realpath(os.path.dirname(value)), os.path.basename(value)
+                            )
+                        )
+
+
+def evict_calls(
+    cache: CallCache, logger: logging.Logger, max_bytes: Optional[int]
+) -> Dict[str, int]:
+    """
+    Evict least-recently-used call cache entries until the local output files & directories they
+    reference total within max_bytes, skipping any in use. Each evicted entry's outputs are deleted
+    too, if they're within its run directory and not referenced by any other remaining entry. (The
+    budget & the reported used_bytes count only these outputs, not the entries themselves, which
+    are small JSON records.)
+    """
+    ans = {"used_bytes": 0, "reclaimed_bytes": 0, "evicted": 0, "in_use": 0}
+    if not os.path.isdir(cache._call_cache_dir):
+        return ans
+    with FlockHolder(logger) as flocks:
+        # serialize with any concurrent gc
+        flockname = os.path.join(cache._call_cache_dir, "_miniwdl_flock")
+        with open(flockname, "a"):
+            pass
+        flocks.flock(flockname, exclusive=True, wait=True)
+
+        entries = []
+        for key, atime in list(cache._list_entries()):
+            try:
+                stored = cache._read_entry(key)
+                if stored:
+                    entries.append(_CallEntry(key, atime, stored[0]))
+            except Exception as exn:
+                logger.warning(
+                    _(
+                        "call cache entry unreadable",
+                        cache_file=cache._entry_name(key),
+                        error=str(exn),
+                    )
+                )
+        refs = _PathRefs(entries)
+        used = ans["used_bytes"] = _disk_usage_all(refs.all())
+        logger.info(
+            _("call cache usage", dir=cache._call_cache_dir, bytes=used, entries=len(entries))
+        )
+
+        for entry in sorted(entries, key=lambda entry: entry.atime):
+            if max_bytes is None or used <= max_bytes:
+                break
+            exclusive = refs.exclusive(entry)
+            try:
+                with FlockHolder(logger) as entry_flocks:
+                    for flockname in _call_flocknames(entry.run_dir):
+                        entry_flocks.flock(flockname, mode=os.O_RDONLY, exclusive=True)
+                    size = _disk_usage_all(exclusive)
+                    cache._delete_entry(entry.key)
+                    refs.remove(entry)
+                    for path in exclusive:
+                        with suppress(FileNotFoundError):
+                            if os.path.isdir(path) and not os.path.islink(path):
+                                rmtree_atomic(path)
+                            else:
+                                os.unlink(path)
+            except BlockingIOError:
+                logger.info(_("call cache entry in use", cache_file=cache._entry_name(entry.key)))
+                ans["in_use"] += 1
+                continue
+            logger.info(
+                _(
+                    "evicted from call cache",
+                    cache_file=cache._entry_name(entry.key),
+                    bytes=size,
+                    deleted=sorted(exclusive),
+                )
+            )
+            used -= size
+            ans["reclaimed_bytes"] += size
+            ans["evicted"] += 1
+
+    logger.notice(  # type: ignore
+        _("call cache gc", dir=cache._call_cache_dir, max_bytes=max_bytes, **ans)
+    )
+    return ans
+
+
+class _PathRefs:
+    """
+    Index of the output paths referenced by call cache entries, to determine which are referenced
+    exclusively by a given entry (neither the path itself, nor anything containing or contained
+    within it, referenced by any other entry)
+    """
+
+    _counts: Dict[str, int]
+    _sorted: List[str]
+
+    def __init__(self, entries: List[_CallEntry]) -> None:
+        self._counts = {}
+        for entry in entries:
+            for path in entry.paths:
+                self._counts[path] = self._counts.get(path, 0) + 1
+        self._sorted = sorted(self._counts)
+
+    def all(self) -> List[str]:
+        return _outermost(self._sorted)
+
+    def remove(self, entry: _CallEntry) -> None:
+        for path in entry.paths:
+            self._counts[path] -= 1
+            if not self._counts[path]:
+                del self._counts[path]
+                del self._sorted[bisect.bisect_left(self._sorted, path)]
+
+    def exclusive(self, entry: _CallEntry) -> List[str]:
+        def others(path: str) -> int:
+            return self._counts.get(path, 0) - (1 if path in entry.paths else 0)
+
+        ans = []
+        for path in entry.paths:
+            if others(path):
+                continue
+            parent = os.path.dirname(path)
+            while parent != os.path.dirname(parent) and not others(parent):
+                parent = os.path.dirname(parent)
+            if others(parent):
+                continue
+            lo = bisect.bisect_left(self._sorted, path + "/")
+            hi = bisect.bisect_left(self._sorted, path + "0")  # "0" follows "/" in ASCII
+            if any(others(nested) for nested in self._sorted[lo:hi]):
+                continue
+            ans.append(path)
+        return _outermost(sorted(ans))
+
+
+@contextmanager
+def background(cfg: config.Loader, logger: logging.Logger) -> Iterator[None]:
+    """
+    context manager running gc() on a background thread every ``[cache_gc] interval_seconds``
+    (if positive and either cache has a byte budget)
+    """
+    interval = cfg["cache_gc"].get_float("interval_seconds")
+    download_max_bytes = max_bytes(cfg, "download_cache")
+    call_max_bytes = max_bytes(cfg, "call_cache")
+    if interval <= 0 or (download_max_bytes is None and call_max_bytes is None):
+        yield
+        return
+    logger = logger.getChild("cache_gc")
+
+    def run() -> None:
+        try:
+            gc(cfg, logger, download_max_bytes, call_max_bytes)
+        except Exception as exn:
+            logger.warning(_("background cache gc failed", error=str(exn)))
+
+    timer = RepeatTimer(interval, run)
+    timer.daemon = True
+    timer.start()
+    try:
+        yield
+    finally:
+        timer.cancel()
+
+
+def _call_flocknames(run_dir: Optional[str]) -> List[str]:
+    # outputs.json of the entry's run directory (flocked by runs reusing the cached outputs), and
+    # the log file of each enclosing run directory (flocked by the run still in progress, if any)
+    ans = []
+    if run_dir:
+        run_dir = os.path.realpath(run_dir)
+        if os.path.isfile(os.path.join(run_dir, "outputs.json")):
+            ans.append(os.path.join(run_dir, "outputs.json"))
+        while True:
+            for fn in ("workflow.log", "task.log"):
+                if os.path.isfile(os.path.join(run_dir, fn)):
+                    ans.append(os.path.join(run_dir, fn))
+            if run_dir == os.path.dirname(run_dir):
+                break
+            run_dir = os.path.dirname(run_dir)
+    return ans
+
+
+def _nested(dirname: str, depth: int) -> Iterator[str]:
+    # paths exactly depth levels below dirname
+    try:
+        entries = list(os.scandir(dirname))
+    except (FileNotFoundError, NotADirectoryError):
+        return
+    for entry in entries:
+        if depth == 1:
+            yield entry.path
+        elif entry.is_dir(follow_symlinks=False):
+            yield from _nested(entry.path, depth - 1)
+
+
+def _disk_usage(path: str, seen: Optional[Set[Tuple[int, int]]] = None) -> int:
+    # allocated bytes of path (recursively, for a directory), counting each inode once
+    seen = seen if seen is not None else set()
+    ans = 0
+    try:
+        st = os.stat(path, follow_symlinks=False)
+    except FileNotFoundError:
+        return 0
+    if (st.st_dev, st.st_ino) not in seen:
+        seen.add((st.st_dev, st.st_ino))
+        ans += st.st_blocks * 512
+    if os.path.isdir(path) and not os.path.islink(path):
+        for root, subdirs, files in os.walk(path):
+            for fn in subdirs + files:
+                with suppress(FileNotFoundError):
+                    st = os.stat(os.path.join(root, fn), follow_symlinks=False)
+                    if (st.st_dev, st.st_ino) not in seen:
+                        seen.add((st.st_dev, st.st_ino))
+                        ans += st.st_blocks * 512
+    return ans
+
+
+def _disk_usage_all(paths: List[str]) -> int:
+    seen: Set[Tuple[int, int]] = set()
+    return sum(_disk_usage(path, seen) for path in paths)
+
+
+def _outermost(paths: List[str]) -> List[str]:
+    # omit paths nested within others in the list
+    pathset = set(paths)
+
+    def nested(path: str) -> bool:
+        parent = os.path.dirname(path)
+        while parent != path:
+            if parent in pathset:
+                return True
+            path, parent = parent, os.path.dirname(parent)
+        return False
+
+    return [path for path in paths if not nested(path)]
+
+
+def _json_strings(obj: Any) -> Iterator[str]:
+    if isinstance(obj, str):
+        yield obj
+    elif isinstance(obj, list):
+        for item in obj:
+            yield from _json_strings(item)
+    elif isinstance(obj, dict):
+        for item in obj.values():
+            yield from _json_strings(item)
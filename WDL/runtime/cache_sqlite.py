@@ -0,0 +1,236 @@
+"""
+Call cache backend storing entries in one SQLite database in the call cache directory, instead of
+one JSON file per entry: ``[call_cache] backend = sqlite``.
+
+Each entry is a row keyed (and indexed) by its cache key, holding the zlib-compressed JSON
+envelope along with its creation and last-access timestamps. Lookups are then a single indexed
+query instead of a walk down the directory tree, and entries can be enumerated (e.g. for eviction
+by least-recent access).
+
+The database uses write-ahead logging (WAL) so that readers don't block the writer, and multiple
+miniwdl processes may share it; a writer waits for another's transaction to finish rather than
+failing. But WAL relies on shared memory among the processes, which processes on different hosts
+don't have; so if the database resides on a network filesystem (see
+:func:`WDL._util.network_filesystem`), it uses the rollback journal instead, relying on the
+filesystem's locks.
+
+``miniwdl cache migrate`` copies existing entries from the default directory layout.
+"""
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple, Iterator, Any
+
+from . import config
+from .cache import CallCache, _effective_mtime
+from .._util import StructuredLogMessage as _
+from .._util import network_filesystem
+
+DB_FILENAME = "call_cache.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY NOT NULL,
+    envelope BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_ns INTEGER NOT NULL,
+    accessed_ns INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_ns);
+CREATE TABLE IF NOT EXISTS task_runtimes (
+    task TEXT PRIMARY KEY NOT NULL,
+    seconds TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteCallCache(CallCache):
+    _db_filename: str
+    _db: Optional[sqlite3.Connection]
+    _db_lock: threading.Lock
+
+    def __init__(self, cfg: config.Loader, logger: logging.Logger):
+        super().__init__(cfg, logger)
+        self._db_filename = os.path.join(self._call_cache_dir, DB_FILENAME)
+        self._db = None
+        self._db_lock = threading.Lock()
+
+    def __exit__(self, *args) -> None:
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+        super().__exit__(*args)
+
+    def _connection(self, create: bool) -> Optional[sqlite3.Connection]:
+        # open the database upon first use (with _db_lock held); None if it doesn't exist and
+        # create is false
+        if self._db is None:
+            if not (create or os.path.exists(self._db_filename)):
+                return None
+            self._db = _connect(self._db_filename)
+        return self._db
+
+    def _entry_name(self, key: str) -> str:
+        return f"{self._db_filename}#{key}"
+
+    def _read_entry(self, key: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        with self._db_lock:
+            db = self._connection(False)
+            if db is None:
+                return None
+            row = db.execute(
+                "SELECT envelope, created_ns FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return (json.loads(zlib.decompress(row[0])), row[1])
+
+    def _write_entry(self, key: str, envelope: Dict[str, Any]) -> None:
+        blob = _compress(envelope)
+        now = time.time_ns()
+        with self._db_lock:
+            db = self._connection(True)
+            assert db is not None
+            db.execute(
+                "INSERT OR REPLACE INTO entries (key, envelope, size, created_ns, accessed_ns)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), now, now),
+            )
+
+    def _delete_entry(self, key: str) -> None:
+        with self._db_lock:
+            db = self._connection(False)
+            if db is not None:
+                db.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def _touch_entry(self, key: str) -> None:
+        with self._db_lock:
+            db = self._connection(False)
+            if db is not None:
+                db.execute(
+                    "UPDATE entries SET accessed_ns = ? WHERE key = ?", (time.time_ns(), key)
+                )
+
+    def _list_entries(self) -> Iterator[Tuple[str, int]]:
+        with self._db_lock:
+            db = self._connection(False)
+            rows = (
+                db.execute("SELECT key, accessed_ns FROM entries").fetchall()
+                if db is not None
+                else []
+            )
+        yield from rows
+
+    def _read_task_runtimes(self, name: str, digest: str) -> List[float]:
+        with self._db_lock:
+            db = self._connection(False)
+            row = (
+                db.execute(
+                    "SELECT seconds FROM task_runtimes WHERE task = ?", (f"{name}/{digest}",)
+                ).fetchone()
+                if db is not None
+                else None
+            )
+        return [float(v) for v in json.loads(row[0])] if row else []
+
+    def _write_task_runtimes(self, name: str, digest: str, seconds: List[float]) -> None:
+        with self._db_lock:
+            db = self._connection(True)
+            assert db is not None
+            db.execute(
+                "INSERT OR REPLACE INTO task_runtimes (task, seconds) VALUES (?, ?)",
+                (f"{name}/{digest}", json.dumps(seconds)),
+            )
+
+
+def migrate_dir(cfg: config.Loader, logger: logging.Logger, remove: bool = False) -> int:
+    """
+    Copy the call cache entries (and task runtime histories) stored as JSON files under the call
+    cache directory into its SQLite database, skipping any keys already present. The entries keep
+    their timestamps from the files' mtime & atime. Optionally remove each file once copied.
+    Returns the number of entries copied.
+    """
+    call_cache_dir = cfg["call_cache"]["dir"]
+    if not os.path.isabs(call_cache_dir):
+        call_cache_dir = os.path.join(cfg["file_io"]["root"], call_cache_dir)
+    db = _connect(os.path.join(call_cache_dir, DB_FILENAME))
+    copied = 0
+    try:
+        # entries are {name}/{digest}/{inputs_digest}.json
+        for root, _subdirs, files in os.walk(call_cache_dir):
+            rel = os.path.relpath(root, call_cache_dir)
+            if len(rel.split(os.sep)) != 2 or rel.startswith("."):
+                continue
+            for fn in sorted(files):
+                filename = os.path.join(root, fn)
+                if not fn.endswith(".json") or ".tmp." in fn:
+                    continue
+                try:
+                    with open(filename, "rb") as infile:
+                        envelope = json.loads(infile.read())
+                    if fn == "_runtimes.json":
+                        db.execute(
+                            "INSERT OR IGNORE INTO task_runtimes (task, seconds) VALUES (?, ?)",
+                            (rel.replace(os.sep, "/"), json.dumps(envelope["seconds"])),
+                        )
+                    else:
+                        key = rel.replace(os.sep, "/") + "/" + fn[: -len(".json")]
+                        blob = _compress(envelope)
+                        cursor = db.execute(
+                            "INSERT OR IGNORE INTO entries"
+                            " (key, envelope, size, created_ns, accessed_ns)"
+                            " VALUES (?, ?, ?, ?, ?)",
+                            (
+                                key,
+                                blob,
+                                len(blob),
+                                _effective_mtime(filename),
+                                os.stat(filename).st_atime_ns,
+                            ),
+                        )
+                        copied += cursor.rowcount
+                except Exception as exn:
+                    logger.warning(
+                        _("skipping unreadable cache file", file=filename, error=str(exn))
+                    )
+                    continue
+                if remove:
+                    os.unlink(filename)
+    finally:
+        db.close()
+    logger.notice(  # type: ignore
+        _("migrated call cache entries", dir=call_cache_dir, db=DB_FILENAME, entries=copied)
+    )
+    return copied
+
+
+def _connect(db_filename: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(db_filename), exist_ok=True)
+    # autocommit each statement; wait up to a minute for another process's write to finish
+    db = sqlite3.connect(db_filename, timeout=60.0, isolation_level=None, check_same_thread=False)
+    sqlite_journal(db, db_filename)
+    db.executescript(_SCHEMA)
+    return db
+
+
+def sqlite_journal(db: sqlite3.Connection, db_filename: str) -> None:
+    """
+    Set up the journal of a SQLite database shared by miniwdl processes: WAL, unless it's on a
+    network filesystem, which processes on other hosts might share too
+    """
+    if network_filesystem(os.path.dirname(db_filename)):
+        db.execute("PRAGMA journal_mode=DELETE")
+        db.execute("PRAGMA synchronous=FULL")
+    else:
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+
+
+def _compress(envelope: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(envelope, separators=(",", ":")).encode("utf-8"))
@@ -382,6 +382,13 @@ def default_plugins() -> "Dict[str,List[importlib_metadata.EntryPoint]]":  # typ
                 value="WDL.runtime.download:gsutil_downloader",
             ),
         ],
+        "file_download_batch": [
+            importlib_metadata.EntryPoint(
+                group="miniwdl.plugin.file_download_batch",
+                name="s3",
+                value="WDL.runtime.download:awscli_batch_downloader",
+            ),
+        ],
         "directory_download": [
             importlib_metadata.EntryPoint(
                 group="miniwdl.plugin.directory_download",
@@ -423,7 +430,12 @@ def default_plugins() -> "Dict[str,List[importlib_metadata.EntryPoint]]":  # typ
                 group="miniwdl.plugin.cache_backend",
                 name="dir",
                 value="WDL.runtime.cache:CallCache",
-            )
+            ),
+            importlib_metadata.EntryPoint(
+                group="miniwdl.plugin.cache_backend",
+                name="sqlite",
+                value="WDL.runtime.cache_sqlite:SQLiteCallCache",
+            ),
         ],
     }
 
@@ -14,6 +14,12 @@ the functionality of miniwdl's task runtime, e.g. pulling docker image with bina
 resource scheduling & isolation, logging, error/signal handling, retry, etc.
 The Python context manager itself might be used to obtain and manage the lifetime of any needed
 security credentials.
+
+Batch downloader plugins, registered in the entry point group "miniwdl.plugin.file_download_batch",
+follow the same protocol, but are given a list of uris and the WDL task should output
+"Array[File] files" with the downloaded files in corresponding order. This lets many (small) files
+be fetched in one task container, amortizing its startup overhead. The runtime uses them (if
+configured) to download batches of workflow input files sharing the same URI scheme.
 """
 
 import os
@@ -22,13 +28,16 @@ import traceback
 import tempfile
 import hashlib
 import shlex
+import functools
+from concurrent import futures
 from contextlib import ExitStack
 from urllib.parse import urlparse
-from typing import Optional, Generator, Dict, Any, Tuple, Callable
-from . import config
+from typing import Optional, Generator, Dict, Any, Tuple, Callable, List
+from . import config, _http_download
 from .error import error_json
+from .. import Tree
 from .cache import CallCache
-from .._util import compose_coroutines
+from .._util import compose_coroutines, TerminationSignalFlag
 from .._util import StructuredLogMessage as _
 
 
@@ -38,32 +47,53 @@ def _load(cfg: config.Loader):
 
     # default public URI downloaders
     file_downloaders = {
-        "https": aria2c_downloader,
-        "http": aria2c_downloader,
+        "https": http_downloader,
+        "http": http_downloader,
         "ftp": aria2c_downloader,
     }
     directory_downloaders = {}
+    batch_downloaders = {
+        "https": http_batch_downloader,
+        "http": http_batch_downloader,
+        "ftp": aria2c_batch_downloader,
+    }
 
     # plugins
     for plugin_name, plugin_fn in config.load_plugins(cfg, "file_download"):
         file_downloaders[plugin_name] = plugin_fn
     for plugin_name, plugin_fn in config.load_plugins(cfg, "directory_download"):
         directory_downloaders[plugin_name] = plugin_fn
+    for plugin_name, plugin_fn in config.load_plugins(cfg, "file_download_batch"):
+        batch_downloaders[plugin_name] = plugin_fn
+
+    setattr(cfg, "_downloaders", (file_downloaders, directory_downloaders, batch_downloaders))
 
-    setattr(cfg, "_downloaders", (file_downloaders, directory_downloaders))
+
+def _scheme(uri: str) -> Optional[str]:
+    colon = uri.find(":")
+    return uri[:colon] if colon > 0 else None
 
 
 def _downloader(
     cfg: config.Loader, uri: str, directory: bool = False
 ) -> Optional[Callable[..., Generator[Dict[str, Any], Dict[str, Any], None]]]:
     _load(cfg)
-    colon = uri.find(":")
-    if colon <= 0:
+    scheme = _scheme(uri)
+    if not scheme:
         return None
-    scheme = uri[:colon]
     return getattr(cfg, "_downloaders")[1 if directory else 0].get(scheme, None)
 
 
+def _batch_downloader(
+    cfg: config.Loader, uri: str
+) -> Optional[Callable[..., Generator[Dict[str, Any], Dict[str, Any], None]]]:
+    _load(cfg)
+    scheme = _scheme(uri)
+    if not scheme:
+        return None
+    return getattr(cfg, "_downloaders")[2].get(scheme, None)
+
+
 def able(cfg: config.Loader, uri: Optional[str], directory: bool = False) -> bool:
     """
     Returns True if uri appears to be a URI we know how to download
@@ -71,6 +101,41 @@ def able(cfg: config.Loader, uri: Optional[str], directory: bool = False) -> boo
     return bool(uri and _downloader(cfg, uri, directory=directory) is not None)
 
 
+def batch_key(cfg: config.Loader, uri: str) -> Optional[str]:
+    """
+    If a batch downloader is available for the (File) uri, return a key (the URI scheme) such that
+    URIs with the same key can be downloaded together by ``run_batch()``; otherwise None.
+    """
+    if _batch_downloader(cfg, uri) is None:
+        return None
+    return _scheme(uri)
+
+
+@functools.lru_cache(maxsize=32)
+def _downloader_task(task_wdl: str) -> Tree.Task:
+    # parse & typecheck the downloader task WDL (memoized, since downloader plugins generally
+    # yield the same source code for each URI)
+    from .. import parse_document, Walker
+
+    doc = parse_document(task_wdl, version="development")
+    assert len(doc.tasks) == 1 and not doc.workflow
+    doc.typecheck()
+    Walker.SetParents()(doc)
+    return doc.tasks[0]
+
+
+def _run_downloader_task(cfg: config.Loader, recv: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+    from .task import run_local_task
+    from .. import values_from_json, values_to_json
+
+    task = _downloader_task(recv["task_wdl"])
+    inputs = values_from_json(recv["inputs"], task.available_inputs)  # type: ignore[arg-type]
+    subdir, outputs_env = run_local_task(
+        cfg, task, inputs, run_id=("download-" + task.name), **kwargs
+    )
+    return {"outputs": values_to_json(outputs_env), "dir": subdir}  # type: ignore[arg-type]
+
+
 def run(
     cfg: config.Loader, logger: logging.Logger, uri: str, directory: bool = False, **kwargs
 ) -> str:
@@ -82,32 +147,19 @@ def run(
     """
 
     from .error import RunFailed, DownloadFailed, Terminated
-    from .task import run_local_task
-    from .. import parse_document, values_from_json, values_to_json, Walker
 
     gen = _downloader(cfg, uri, directory=directory)
     assert gen
     try:
         logger.info(_(f"start {'directory ' if directory else ''}download", uri=uri))
-        with compose_coroutines([lambda kwargs: gen(cfg, logger, **kwargs)], {"uri": uri}) as cor:
+        with compose_coroutines(
+            [lambda kwargs: gen(cfg, logger, **kwargs)],
+            {"uri": uri, "run_dir": kwargs.get("run_dir")},
+        ) as cor:
             recv = next(cor)
 
             if "task_wdl" in recv:
-                task_wdl, inputs = (recv[k] for k in ["task_wdl", "inputs"])
-
-                doc = parse_document(task_wdl, version="development")
-                assert len(doc.tasks) == 1 and not doc.workflow
-                doc.typecheck()
-                Walker.SetParents()(doc)
-                task = doc.tasks[0]
-                inputs = values_from_json(inputs, task.available_inputs)  # type: ignore[arg-type]
-                subdir, outputs_env = run_local_task(
-                    cfg, task, inputs, run_id=("download-" + task.name), **kwargs
-                )
-
-                recv = cor.send(
-                    {"outputs": values_to_json(outputs_env), "dir": subdir}  # type: ignore[arg-type]
-                )
+                recv = cor.send(_run_downloader_task(cfg, recv, **kwargs))
 
             ans = recv["outputs"]["directory" if directory else "file"]
             assert isinstance(ans, str) and os.path.exists(ans)
@@ -118,12 +170,61 @@ def run(
         if isinstance(exn.__cause__, Terminated):
             raise exn.__cause__ from None
         raise DownloadFailed(uri) from exn.__cause__
+    except Terminated:
+        raise
     except Exception as exn:
         logger.debug(traceback.format_exc())
         logger.error(_("downloader error", uri=uri, **error_json(exn)))
         raise DownloadFailed(uri) from exn
 
 
+def run_batch(cfg: config.Loader, logger: logging.Logger, uris: List[str], **kwargs) -> List[str]:
+    """
+    Download the File URIs (all having the same ``batch_key()``) using one batch downloader task,
+    and return the local filenames in corresponding order.
+
+    kwargs are passed through to ``run_local_task`` as in ``run()``.
+    """
+
+    from .error import RunFailed, DownloadFailed, Terminated
+
+    assert uris
+    gen = _batch_downloader(cfg, uris[0])
+    assert gen and all(_scheme(uri) == _scheme(uris[0]) for uri in uris)
+    try:
+        logger.info(_("start batch download", count=len(uris), uris=uris[:3]))
+        with compose_coroutines(
+            [lambda kwargs: gen(cfg, logger, **kwargs)],
+            {"uris": uris, "run_dir": kwargs.get("run_dir")},
+        ) as cor:
+            recv = next(cor)
+
+            if "task_wdl" in recv:
+                recv = cor.send(_run_downloader_task(cfg, recv, **kwargs))
+
+            ans = recv["outputs"]["files"]
+            assert isinstance(ans, list) and len(ans) == len(uris)
+            for uri, fn in zip(uris, ans):
+                assert isinstance(fn, str) and os.path.exists(fn)
+                logger.info(_("downloaded file", uri=uri, file=fn))
+            return ans
+
+    except RunFailed as exn:
+        if isinstance(exn.__cause__, Terminated):
+            raise exn.__cause__ from None
+        raise DownloadFailed(
+            uris[0], f"unable to download batch of {len(uris)} URIs including {uris[0]}"
+        ) from exn.__cause__
+    except Terminated:
+        raise
+    except Exception as exn:
+        logger.debug(traceback.format_exc())
+        logger.error(_("downloader error", uris=uris[:3], count=len(uris), **error_json(exn)))
+        raise DownloadFailed(
+            uris[0], f"unable to download batch of {len(uris)} URIs including {uris[0]}"
+        ) from exn
+
+
 def run_cached(
     cfg,
     logger: logging.Logger,
@@ -149,6 +250,54 @@ def run_cached(
             cfg["file_io"]["root"], os.path.join(cfg["download_cache"]["dir"], "ops")
         )
     filename = run(cfg, logger, uri, directory=directory, run_dir=run_dir, **kwargs)
+    return False, _put_download(
+        logger, cache, uri, filename, bool(cache_path_preexists), directory=directory
+    )
+
+
+def run_cached_batch(
+    cfg,
+    logger: logging.Logger,
+    cache: CallCache,
+    uris: List[str],
+    run_dir: str,
+    **kwargs,
+) -> List[Tuple[bool, str]]:
+    """
+    Batch counterpart of ``run_cached()`` for File URIs with the same ``batch_key()``: URIs found
+    in the cache are used from there, and the rest downloaded together by ``run_batch()``; each
+    downloaded file is then put into the cache individually.
+    """
+    ans: List[Optional[Tuple[bool, str]]] = [None] * len(uris)
+    todo = []
+    for i, uri in enumerate(uris):
+        cached = cache.get_download(uri, logger=logger)
+        if cached:
+            ans[i] = (True, cached)
+        else:
+            todo.append(i)
+    if todo:
+        cache_paths = [cache.download_cacheable(uris[i]) for i in todo]
+        cache_paths_preexist = [bool(p and os.path.exists(p)) for p in cache_paths]
+        if any(p and not preexists for p, preexists in zip(cache_paths, cache_paths_preexist)):
+            # see run_cached()
+            run_dir = os.path.join(
+                cfg["file_io"]["root"], os.path.join(cfg["download_cache"]["dir"], "ops")
+            )
+        filenames = run_batch(cfg, logger, [uris[i] for i in todo], run_dir=run_dir, **kwargs)
+        for i, filename, preexists in zip(todo, filenames, cache_paths_preexist):
+            ans[i] = (False, _put_download(logger, cache, uris[i], filename, preexists))
+    return [item for item in ans if item]
+
+
+def _put_download(
+    logger: logging.Logger,
+    cache: CallCache,
+    uri: str,
+    filename: str,
+    cache_path_preexists: bool,
+    directory: bool = False,
+) -> str:
     if cache_path_preexists:
         # a cache entry had already existed, but we didn't use it (--no-cache).
         # FIXME: it'd be better to replace the old copy...but what if another workflow is using it?
@@ -157,20 +306,134 @@ def run_cached(
                 "ignored a previously-cached download, which remains in the cache",
                 uri=uri,
                 downloaded=filename,
-                cache_path=cache_path,
+                cache_path=cache.download_path(uri, directory=directory),
             )
         )
         # use the newly downloaded copy in the current run directory
         cache.memo_download(uri, filename, directory=directory)
-        return False, filename
-    return False, cache.put_download(
-        uri, os.path.realpath(filename), directory=directory, logger=logger
-    )
+        return filename
+    return cache.put_download(uri, os.path.realpath(filename), directory=directory, logger=logger)
 
 
 # WDL tasks for downloading a file based on its URI scheme
 
 
+def http_downloader(
+    cfg: config.Loader, logger: logging.Logger, uri: str, run_dir: Optional[str] = None, **kwargs
+) -> Generator[Dict[str, Any], Dict[str, Any], None]:
+    """
+    Built-in downloader for http:// and https:// URIs: downloads in-process per [download_http]
+    (see ``_http_download``), falling back to ``aria2c_downloader`` if that's disabled or can't
+    handle the URI
+    """
+    if cfg["download_http"].get_bool("in_process"):
+        try:
+            with TerminationSignalFlag(logger) as terminating:
+                ans = _http_download_run(
+                    cfg, logger, uri, _http_download_dir(run_dir, uri), terminating
+                )
+        except _http_download.Unsupported as exn:
+            logger.info(_("falling back to aria2c downloader", uri=uri, reason=str(exn)))
+        else:
+            yield {"outputs": {"file": ans}}
+            return
+    yield from aria2c_downloader(cfg, logger, uri, **kwargs)
+
+
+def http_batch_downloader(
+    cfg: config.Loader,
+    logger: logging.Logger,
+    uris: List[str],
+    run_dir: Optional[str] = None,
+    **kwargs,
+) -> Generator[Dict[str, Any], Dict[str, Any], None]:
+    """
+    Batch counterpart of ``http_downloader``, downloading up to [download_http] parallel URIs at a
+    time in-process (falling back to ``aria2c_batch_downloader`` for any of them it can't handle)
+    """
+    if cfg["download_http"].get_bool("in_process"):
+        with TerminationSignalFlag(logger) as terminating, futures.ThreadPoolExecutor(
+            max_workers=max(cfg["download_http"].get_int("parallel"), 1),
+            thread_name_prefix="miniwdl_http_batch",
+        ) as pool:
+            ops = [
+                pool.submit(
+                    _http_download_run,
+                    cfg,
+                    logger,
+                    uri,
+                    _http_download_dir(
+                        (
+                            os.path.join(run_dir, str(i), ".")
+                            if run_dir and os.path.basename(run_dir) == "."
+                            else run_dir
+                        ),
+                        uri,
+                    ),
+                    terminating,
+                )
+                for i, uri in enumerate(uris)
+            ]
+            # collect each URI's result, noting those the in-process downloader can't handle
+            ans: List[Optional[str]] = []
+            reason = ""
+            for op in ops:
+                try:
+                    ans.append(op.result())
+                except _http_download.Unsupported as exn:
+                    ans.append(None)
+                    reason = str(exn)
+                except BaseException:
+                    for op2 in ops:
+                        op2.cancel()
+                    raise
+        fallback = [i for i, fn in enumerate(ans) if fn is None]
+        if not fallback:
+            yield {"outputs": {"files": ans}}
+            return
+        # download just those URIs with aria2c, merging its results with ours
+        fallback_uris = [uris[i] for i in fallback]
+        logger.info(
+            _(
+                "falling back to aria2c batch downloader",
+                uris=fallback_uris[:3],
+                count=len(fallback_uris),
+                reason=reason,
+            )
+        )
+        gen = aria2c_batch_downloader(cfg, logger, fallback_uris, **kwargs)
+        recv = gen.send((yield next(gen)))
+        for i, fn in zip(fallback, recv["outputs"]["files"]):
+            ans[i] = fn
+        yield dict(recv, outputs=dict(recv["outputs"], files=ans))
+        return
+    yield from aria2c_batch_downloader(cfg, logger, uris, **kwargs)
+
+
+def _http_download_dir(run_dir: Optional[str], uri: str) -> str:
+    # Use the given run_dir ending in /. as-is; otherwise (e.g. the download cache ops/ area) a
+    # subdirectory determined by the URI, where a later attempt can resume a partial download
+    run_dir = run_dir or os.getcwd()
+    if os.path.basename(run_dir) == ".":
+        return os.path.abspath(run_dir)
+    return os.path.join(
+        os.path.abspath(run_dir), "download-http-" + hashlib.sha256(uri.encode()).hexdigest()[:16]
+    )
+
+
+def _http_download_run(
+    cfg: config.Loader,
+    logger: logging.Logger,
+    uri: str,
+    dest_dir: str,
+    terminating: Callable[[], bool],
+) -> str:
+    logger = logger.getChild("http_downloader")
+    info = _http_download.download(cfg, logger, uri, dest_dir, terminating)
+    logger.info(_("downloaded in-process", uri=uri, **info))
+    return info["file"]
+
+
 def aria2c_downloader(
     cfg: config.Loader, logger: logging.Logger, uri: str, **kwargs
 ) -> Generator[Dict[str, Any], Dict[str, Any], None]:
@@ -204,6 +467,47 @@ def aria2c_downloader(
     yield recv
 
 
+def aria2c_batch_downloader(
+    cfg: config.Loader, logger: logging.Logger, uris: List[str], **kwargs
+) -> Generator[Dict[str, Any], Dict[str, Any], None]:
+    wdl = r"""
+    task aria2c_batch {
+        input {
+            Array[String] uris
+            String docker
+            Int connections = 10
+            Int parallel = 8
+        }
+        command <<<
+            set -euxo pipefail
+            mkdir __out
+            # aria2c input file directing the i'th URI into subdirectory __out/i/
+            awk '{ printf "%s\n  dir=__out/%d\n", $0, NR-1 }' "~{write_lines(uris)}" > __aria2c_input
+            aria2c -x ~{connections} -s ~{connections} -j ~{parallel} \
+                --file-allocation=none --retry-wait=2 --stderr=true --enable-color=false \
+                --input-file=__aria2c_input
+            set +x
+            for (( i=0; i<~{length(uris)}; i++ )); do
+                f=$(find "__out/$i" -mindepth 1 -maxdepth 1 -type f | head -n 1)
+                test -n "$f"
+                echo "$f"
+            done > __files.txt
+        >>>
+        output {
+            Array[File] files = read_lines("__files.txt")
+        }
+        runtime {
+            docker: docker
+        }
+    }
+    """
+    recv = yield {
+        "task_wdl": wdl,
+        "inputs": {"uris": uris, "docker": cfg["download_aria2c"]["docker"]},
+    }
+    yield recv
+
+
 def awscli_downloader(
     cfg: config.Loader, logger: logging.Logger, uri: str, **kwargs
 ) -> Generator[Dict[str, Any], Dict[str, Any], None]:
@@ -253,6 +557,62 @@ def awscli_downloader(
     yield recv
 
 
+def awscli_batch_downloader(
+    cfg: config.Loader, logger: logging.Logger, uris: List[str], **kwargs
+) -> Generator[Dict[str, Any], Dict[str, Any], None]:
+    inputs: Dict[str, Any] = {"uris": uris, "docker": cfg["download_awscli"]["docker"]}
+    with ExitStack() as cleanup:
+        inputs["aws_credentials"] = prepare_aws_credentials(cfg, logger, cleanup)
+
+        wdl = r"""
+        task aws_s3_cp_batch {
+            input {
+                Array[String] uris
+                String docker
+                File? aws_credentials
+                Int parallel = 8
+            }
+
+            command <<<
+                set -euo pipefail
+                if [ -n "~{aws_credentials}" ]; then
+                    source "~{aws_credentials}"
+                fi
+                export AWS_RETRY_MODE=standard
+                export AWS_MAX_ATTEMPTS=5
+                # copy the i'th URI into subdirectory __out/i/ (see awscli_downloader)
+                s3cp() {
+                    mkdir -p "__out/$1"
+                    if ! aws s3 cp --only-show-errors "$2" "__out/$1/" ; then
+                        rm -f "__out/$1/"*
+                        >&2 echo "Retrying $2 with --no-sign-request in case the object is public." \
+                             ' If the overall operation fails, the real error may precede this message.'
+                        aws s3 cp --only-show-errors --no-sign-request "$2" "__out/$1/"
+                    fi
+                }
+                export -f s3cp
+                awk '{ printf "%d\n%s\n", NR-1, $0 }' "~{write_lines(uris)}" | tr '\n' '\0' \
+                    | xargs -0 -n 2 -P ~{parallel} bash -c 's3cp "$@"' s3cp
+                for (( i=0; i<~{length(uris)}; i++ )); do
+                    f=$(find "__out/$i" -mindepth 1 -maxdepth 1 -type f | head -n 1)
+                    test -n "$f"
+                    echo "$f"
+                done > __files.txt
+            >>>
+
+            output {
+                Array[File] files = read_lines("__files.txt")
+            }
+
+            runtime {
+                docker: docker
+            }
+        }
+        """
+        recv = yield {"task_wdl": wdl, "inputs": inputs}
+    yield recv
+
+
 def awscli_directory_downloader(
     cfg: config.Loader, logger: logging.Logger, uri: str, **kwargs
 ) -> Generator[Dict[str, Any], Dict[str, Any], None]:
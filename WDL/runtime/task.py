@@ -7,6 +7,7 @@ import os
 import json
 import traceback
 import threading
+import time
 import regex
 from typing import (
     Tuple,
@@ -39,8 +40,8 @@ from .._util import (
     wdl_version_geq,
 )
 from .._util import StructuredLogMessage as _
-from . import config, _statusbar
-from .cache import CallCache, CallCacheAddPaths, call_cache_key, new as new_call_cache
+from . import config, cache_gc, _statusbar, _event_loop
+from .cache import CallCache, CallCacheAddPaths, new as new_call_cache
 from ._io_helpers import (
     _add_downloadable_defaults,
     _warn_struct_extra,
@@ -70,7 +71,7 @@ class _TaskDeclPathMissing(Exception):
 TaskPluginCoroutine = Generator[Dict[str, Any], Dict[str, Any], None]
 
 
-def run_local_task(  # type: ignore[return]
+def run_local_task(
     cfg: config.Loader,
     task: Tree.Task,
     inputs: Env.Bindings[Value.Base],
@@ -80,6 +81,7 @@ def run_local_task(  # type: ignore[return]
     _run_id_stack: Optional[List[str]] = None,
     _cache: Optional[CallCache] = None,
     _plugins: Optional[List[Callable[..., Any]]] = None,
+    _adopt: bool = False,
 ) -> Tuple[str, Env.Bindings[Value.Base]]:
     """
     Run a task locally.
@@ -92,6 +94,39 @@ def run_local_task(  # type: ignore[return]
                     (defaults to current working directory).
                     If the final path component is ".", then operate in run_dir directly.
     """
+    return _event_loop.run_sync(
+        run_local_task_async(
+            cfg,
+            task,
+            inputs,
+            run_id=run_id,
+            run_dir=run_dir,
+            logger_prefix=logger_prefix,
+            _run_id_stack=_run_id_stack,
+            _cache=_cache,
+            _plugins=_plugins,
+            _adopt=_adopt,
+        )
+    )
+
+
+async def run_local_task_async(  # type: ignore[return]
+    cfg: config.Loader,
+    task: Tree.Task,
+    inputs: Env.Bindings[Value.Base],
+    run_id: Optional[str] = None,
+    run_dir: Optional[str] = None,
+    logger_prefix: Optional[List[str]] = None,
+    _run_id_stack: Optional[List[str]] = None,
+    _cache: Optional[CallCache] = None,
+    _plugins: Optional[List[Callable[..., Any]]] = None,
+    _adopt: bool = False,
+) -> Tuple[str, Env.Bindings[Value.Base]]:
+    """
+    Coroutine version of :func:`run_local_task`. On the event loop (``[scheduler] event_loop``),
+    blocking steps are offloaded to its thread pool, and awaiting the task container costs no
+    thread at all.
+    """
     from .task_container import new as new_task_container  # delay heavy import
 
     _run_id_stack = _run_id_stack or []
@@ -104,7 +139,9 @@ def run_local_task(  # type: ignore[return]
             raise Terminated(quiet=True)
 
         # provision run directory and log file
-        run_dir = provision_run_dir(task.name, run_dir, last_link=not _run_id_stack)
+        run_dir = await _event_loop.offload(
+            provision_run_dir, task.name, run_dir, last_link=not _run_id_stack
+        )
         logfile = os.path.join(run_dir, "task.log")
         cleanup.enter_context(
             LoggingFileHandler(
@@ -131,11 +168,12 @@ def run_local_task(  # type: ignore[return]
                 thread=threading.get_ident(),
             )
         )
-        write_values_json(inputs, os.path.join(run_dir, "inputs.json"))
+        await _event_loop.offload(write_values_json, inputs, os.path.join(run_dir, "inputs.json"))
 
         if not _run_id_stack:
             cache = _cache or cleanup.enter_context(new_call_cache(cfg, logger))
             cache.flock(logfile, exclusive=True)  # no containing workflow; flock task.log
+            cleanup.enter_context(cache_gc.background(cfg, logger))
         else:
             cache = _cache
         assert cache
@@ -144,8 +182,12 @@ def run_local_task(  # type: ignore[return]
         maybe_container = None
         try:
             cache_inputs = inputs
-            cache_key = call_cache_key(task.name, task.digest, cache_inputs)
-            cached = cache.get(cache_key, cache_inputs, task.effective_outputs)
+            cache_key = await _event_loop.offload(
+                cache.call_key, task.name, task.digest, cache_inputs
+            )
+            cached = await _event_loop.offload(
+                cache.get, cache_key, cache_inputs, task.effective_outputs
+            )
             if cached is not None:
                 for decl in task.outputs:
                     v = cached[decl.name]
@@ -158,20 +200,25 @@ def run_local_task(  # type: ignore[return]
                         )
                     )
                 # create out/ and outputs.json
-                _outputs = link_outputs(
+                _outputs = await _event_loop.offload(
+                    link_outputs,
                     cache,
                     cached,
                     run_dir,
                     hardlinks=cfg["file_io"].get_bool("output_hardlinks"),
                     use_relative_output_paths=cfg["file_io"].get_bool("use_relative_output_paths"),
                 )
-                write_values_json(
-                    cached, os.path.join(run_dir, "outputs.json"), namespace=task.name
+                await _event_loop.offload(
+                    write_values_json,
+                    cached,
+                    os.path.join(run_dir, "outputs.json"),
+                    namespace=task.name,
                 )
                 logger.notice("done (cached)")
                 # returning `cached`, not the rewritten `_outputs`, to retain opportunity to find
                 # cached downstream inputs
                 return (run_dir, cached)
+            started = time.time()
             # start plugin coroutines and process inputs through them
             with compose_coroutines(
                 [
@@ -187,11 +234,12 @@ def run_local_task(  # type: ignore[return]
                 ],
                 {"inputs": inputs},
             ) as plugins:
-                recv = next(plugins)
+                recv = await _event_loop.offload(next, plugins)
                 inputs = recv["inputs"]
 
                 # download input files, if needed
-                posix_inputs = _download_task_input_files(
+                posix_inputs = await _event_loop.offload(
+                    _download_task_input_files,
                     cfg,
                     logger,
                     logger_prefix,
@@ -201,7 +249,9 @@ def run_local_task(  # type: ignore[return]
                 )
 
                 # create TaskContainer according to configuration
-                container = new_task_container(cfg, logger, run_id, run_dir)
+                container = await _event_loop.offload(
+                    new_task_container, cfg, logger, run_id, run_dir, adopt=_adopt
+                )
                 maybe_container = container
                 # Record source-relative paths observed while evaluating task expressions
                 # (excluding outputs, in which relative paths resolve in the task working
@@ -211,8 +261,8 @@ def run_local_task(  # type: ignore[return]
 
                 # evaluate input/postinput declarations, including mapping from host to
                 # in-container file paths
-                container_env = _eval_task_inputs(
-                    logger, task, posix_inputs, container, cache_add_paths
+                container_env = await _event_loop.offload(
+                    _eval_task_inputs, logger, task, posix_inputs, container, cache_add_paths
                 )
 
                 # evaluate runtime fields
@@ -223,8 +273,16 @@ def run_local_task(  # type: ignore[return]
                     source_dir=task.source_dir,
                     cache_add_paths=cache_add_paths,
                 )
-                _eval_task_runtime(
-                    cfg, logger, run_id, task, posix_inputs, container, container_env, stdlib
+                await _event_loop.offload(
+                    _eval_task_runtime,
+                    cfg,
+                    logger,
+                    run_id,
+                    task,
+                    posix_inputs,
+                    container,
+                    container_env,
+                    stdlib,
                 )
                 if wdl_version_geq(task.effective_wdl_version, WDLVersion.V1_2):
                     container.build_task_runtime_info_struct(logger, run_id, task)
@@ -232,7 +290,7 @@ def run_local_task(  # type: ignore[return]
                     container_env = container_env.bind("task", container.task_runtime_info_struct)
 
                 # start container & run command (and retry if needed)
-                container = _try_task(
+                container = await _try_task(
                     cfg,
                     task,
                     logger,
@@ -257,10 +315,13 @@ def run_local_task(  # type: ignore[return]
                     container_env = container_env.bind("task", container.task_runtime_info_struct)
 
                 # evaluate output declarations
-                outputs = _eval_task_outputs(logger, run_id, task, container_env, container)
+                outputs = await _event_loop.offload(
+                    _eval_task_outputs, logger, run_id, task, container_env, container
+                )
 
                 # create output_links
-                outputs = link_outputs(
+                outputs = await _event_loop.offload(
+                    link_outputs,
                     cache,
                     outputs,
                     run_dir,
@@ -269,28 +330,35 @@ def run_local_task(  # type: ignore[return]
                 )
 
                 # process outputs through plugins
-                recv = plugins.send({"outputs": outputs})
+                recv = await _event_loop.offload(plugins.send, {"outputs": outputs})
                 outputs = recv["outputs"]
 
                 # clean up, if so configured, and make sure output files will be accessible to
                 # downstream tasks
-                _delete_work(cfg, logger, container, True)
-                chmod_R_plus(run_dir, file_bits=0o660, dir_bits=0o770)
+                await _event_loop.offload(_delete_work, cfg, logger, container, True)
+                await _event_loop.offload(chmod_R_plus, run_dir, file_bits=0o660, dir_bits=0o770)
                 _warn_output_basename_collisions(logger, outputs)
 
                 # write outputs.json
-                write_values_json(
-                    outputs, os.path.join(run_dir, "outputs.json"), namespace=task.name
+                await _event_loop.offload(
+                    write_values_json,
+                    outputs,
+                    os.path.join(run_dir, "outputs.json"),
+                    namespace=task.name,
                 )
                 logger.notice("done")
                 if not run_id.startswith("download-"):
-                    cache.put(
+                    await _event_loop.offload(
+                        cache.put,
                         cache_key,
                         outputs,
                         run_dir=run_dir,
                         inputs=cache_inputs,
                         add_paths=cache_add_paths,
                     )
+                    await _event_loop.offload(
+                        cache.put_task_runtime, task.name, task.digest, time.time() - started
+                    )
                 return (run_dir, outputs)
         except Exception as exn:
             tbtxt = traceback.format_exc()
@@ -324,7 +392,7 @@ def run_local_task(  # type: ignore[return]
                 logger.critical(_("failed to write error.json", dir=run_dir, message=str(exn2)))
             try:
                 if maybe_container:
-                    _delete_work(cfg, logger, maybe_container, False)
+                    await _event_loop.offload(_delete_work, cfg, logger, maybe_container, False)
             except Exception as exn2:
                 logger.debug(traceback.format_exc())
                 logger.error(_("delete_work also failed", exception=str(exn2)))
@@ -495,7 +563,7 @@ def _eval_task_decl(
     between input/private and output declarations).
     """
     try:
-        value = decl.expr.eval(env, stdlib=stdlib).coerce(decl.type) if decl.expr else Value.Null()
+        value = decl.expr.compile()(env, stdlib).coerce(decl.type) if decl.expr else Value.Null()
         _warn_struct_extra(logger, decl.name, value)
         return postprocess_paths(value)
     except Error.RuntimeError as exn:
@@ -654,7 +722,7 @@ def _eval_task_runtime(
     for key, v in runtime_defaults.items():
         runtime_values[key] = Value.from_json(Type.Any(), v)
     for key, expr in task.runtime.items():  # evaluate expressions in source code
-        runtime_values[key] = expr.eval(env, stdlib)
+        runtime_values[key] = expr.compile()(env, stdlib)
     for b in inputs.enter_namespace("runtime"):
         runtime_values[b.name] = b.value  # input overrides
     for b in inputs.enter_namespace("requirements"):
@@ -731,7 +799,7 @@ def _eval_task_runtime(
         logger.warning(_("ignored runtime settings", keys=unused_keys))
 
 
-def _try_task(
+async def _try_task(
     cfg: config.Loader,
     task: Tree.Task,
     logger: logging.Logger,
@@ -762,7 +830,8 @@ def _try_task(
             raise Terminated()
 
         if command is None or command_uses_task_attempt:
-            command = _eval_task_command(
+            command = await _event_loop.offload(
+                _eval_task_command,
                 cfg,
                 task,
                 logger,
@@ -774,7 +843,9 @@ def _try_task(
             if container.try_counter == 1:
                 assert retries == 0 and interruptions == 0 and not plugin_changed_command
                 # let plugin(s) process command & container
-                recv = plugins.send({"command": command, "container": container})
+                recv = await _event_loop.offload(
+                    plugins.send, {"command": command, "container": container}
+                )
                 plugin_command, container = (recv[k] for k in ("command", "container"))
                 if plugin_command != command:
                     plugin_changed_command = True
@@ -782,11 +853,12 @@ def _try_task(
         assert isinstance(command, str)
         logger.debug(_("command", command=command.strip()))
 
-        if cfg.get_bool("file_io", "copy_input_files") or task.name in cfg.get_list(
-            "file_io", "copy_input_files_for"
+        if not container.adopt and (
+            cfg.get_bool("file_io", "copy_input_files")
+            or task.name in cfg.get_list("file_io", "copy_input_files_for")
         ):
             # must follow command interpolation, which can add new input files via write_*
-            container.copy_input_files(logger)
+            await _event_loop.offload(container.copy_input_files, logger)
         host_tmpdir = (
             os.path.join(container.host_work_dir(), "_miniwdl_tmpdir")
             if cfg.get_bool("file_io", "mount_tmpdir")
@@ -798,14 +870,14 @@ def _try_task(
             # start container & run command
             if host_tmpdir:
                 logger.debug(_("creating task temp directory", TMPDIR=host_tmpdir))
-                os.mkdir(host_tmpdir, mode=0o770)
+                os.makedirs(host_tmpdir, mode=0o770, exist_ok=container.adopt)
             try:
-                container.run(logger, command)
+                await container.run_async(logger, command)
                 return container
             finally:
                 if host_tmpdir:
                     logger.info(_("deleting task temp directory", TMPDIR=host_tmpdir))
-                    rmtree_atomic(host_tmpdir)
+                    await _event_loop.offload(rmtree_atomic, host_tmpdir)
                 if (
                     "preemptible" in container.runtime_values
                     and cfg.has_option("task_runtime", "_mock_interruptions")
@@ -849,8 +921,8 @@ def _try_task(
                     "task command uses task.attempt, but a task plugin changed the command; "
                     "cannot retry with an updated task.attempt value"
                 ) from exn
-            _delete_work(cfg, logger, container, False)
-            container.reset(logger)
+            await _event_loop.offload(_delete_work, cfg, logger, container, False)
+            await _event_loop.offload(container.reset, logger)
 
 
 def _eval_task_command(
@@ -886,9 +958,11 @@ def _eval_task_command(
         eval_context=StdLib.EvalContext(placeholder_regex=placeholder_re),
     )
     assert isinstance(task.command, Expr.TaskCommand)
-    ans = task.command.eval(command_env, command_stdlib, dedent=not old_command_dedent).value
     if old_command_dedent:  # see issue #674
+        ans = task.command.eval(command_env, command_stdlib, dedent=False).value
         ans = _util.strip_leading_whitespace(ans)[1]
+    else:
+        ans = task.command.compile()(command_env, command_stdlib).value
     return ans
 
 
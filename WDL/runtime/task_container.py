@@ -15,6 +15,7 @@ from typing import (
     Dict,
     Optional,
     ContextManager,
+    List,
     Set,
     Tuple,
     TYPE_CHECKING,
@@ -30,7 +31,7 @@ from .._util import (
     parse_byte_size,
 )
 from .._util import StructuredLogMessage as _
-from . import config, _statusbar
+from . import config, _statusbar, _event_loop
 from .error import OutputError, Terminated, CommandFailed
 
 if TYPE_CHECKING:
@@ -63,6 +64,17 @@ class TaskContainer(ABC):
         """
         raise NotImplementedError()
 
+    @classmethod
+    def adoptable(cls, cfg: config.Loader, logger: logging.Logger, host_dir: str) -> bool:
+        """
+        Whether a container started in ``host_dir`` by a previous miniwdl process (which has since
+        died) still exists, and can be adopted by a new instance constructed with ``adopt=True``.
+        Then the adopting instance's ``run()`` awaits the existing container, instead of starting
+        another, to complete the same task attempt. Backends that can't do this return False, and
+        the task is instead restarted afresh (after its previous host directory is set aside).
+        """
+        return False
+
     # instance stuff
 
     run_id: str
@@ -138,9 +150,15 @@ class TaskContainer(ABC):
     went wrong (beyond the exit code and log messages).
     """
 
+    adopt: bool
+    """
+    Whether this instance is adopting the existing container in ``host_dir`` (see ``adoptable()``),
+    whose working directory is already populated. Cleared by ``reset()`` for any retry.
+    """
+
     _running: bool
 
-    def __init__(self, cfg: config.Loader, run_id: str, host_dir: str) -> None:
+    def __init__(self, cfg: config.Loader, run_id: str, host_dir: str, adopt: bool = False) -> None:
         self.cfg = cfg
         self.run_id = run_id
         self.host_dir = host_dir
@@ -154,7 +172,8 @@ class TaskContainer(ABC):
         self.task_runtime_info_struct = None
         self.failure_info = None
         self.last_exit_code = None
-        os.makedirs(self.host_work_dir())
+        self.adopt = adopt
+        os.makedirs(self.host_work_dir(), exist_ok=adopt)
 
     def add_paths(self, host_paths: Iterable[str]) -> None:
         """
@@ -432,7 +451,14 @@ class TaskContainer(ABC):
 
         The container is torn down in any case, including SIGTERM/SIGHUP signal which is trapped.
         """
-        # container-specific logic should be in _run(). this wrapper traps signals
+        _event_loop.run_sync(self.run_async(logger, command))
+
+    async def run_async(self, logger: logging.Logger, command: str) -> None:
+        """
+        Coroutine version of :meth:`run`. On the event loop (``[scheduler] event_loop``), awaits
+        :meth:`_run_async`; otherwise calls :meth:`_run` directly, without suspending.
+        """
+        # container-specific logic should be in _run() & _run_async(). this wrapper traps signals
 
         assert not self._running
         self.last_exit_code = None
@@ -445,7 +471,10 @@ class TaskContainer(ABC):
                     raise Terminated(quiet=True)
                 self._running = True
                 try:
-                    exit_code = self._run(logger, terminating, command)
+                    if _event_loop.current():
+                        exit_code = await self._run_async(logger, terminating, command)
+                    else:
+                        exit_code = self._run(logger, terminating, command)
                     self.last_exit_code = exit_code
                 finally:
                     self._running = False
@@ -475,6 +504,19 @@ class TaskContainer(ABC):
         # run command in container & return exit status
         raise NotImplementedError()
 
+    async def _run_async(
+        self, logger: logging.Logger, terminating: Callable[[], bool], command: str
+    ) -> int:
+        """
+        Implementation-specific: coroutine version of _run(), for use on the event loop. Blocking
+        operations should be awaited through ``_event_loop.offload()``, leaving the coroutine to
+        cost nothing while it merely waits for the container.
+
+        The default implementation offloads _run() as a whole, which works for any backend but
+        occupies one of the event loop's threads for blocking work throughout.
+        """
+        return await _event_loop.offload(self._run, logger, terminating, command)
+
     def success_exit_code(self, exit_code: int) -> bool:
         if "returnCodes" not in self.runtime_values:
             return exit_code == 0
@@ -514,6 +556,7 @@ class TaskContainer(ABC):
         copy_input_files() and run() can be retried.
         """
         self.try_counter += 1
+        self.adopt = False
         os.makedirs(self.host_work_dir())
 
     def host_path(self, container_path: str, inputs_only: bool = False) -> Optional[str]:
@@ -671,6 +714,67 @@ class TaskContainer(ABC):
             with open(host_path, "x") as _:
                 pass
 
+    def prepare_input_mounts(self) -> List[Tuple[str, str]]:
+        """
+        Implementation helper: plan the read-only bind mounts of the input files & directories,
+        returning ``(container_path, host_path)`` pairs (without trailing slashes), and creating
+        the needed mount points in the host working directory.
+
+        Ordinarily each input path is mounted individually at its ``input_path_map`` location. If
+        there are at least ``[file_io] consolidate_input_mounts`` input paths, then instead they're
+        grouped by the host directories containing them, each of which is mounted once (under
+        ``{container_dir}/_miniwdl_input_dirs/``), along with any input subdirectories beneath it;
+        and each input's usual location is populated with a symlink into the respective mount.
+        This avoids creating thousands of mounts for tasks with large ``Array[File]`` inputs, at
+        the cost of exposing (read-only) other contents of those directories to the task. Only
+        directories which themselves contain inputs are mounted this way (not other common
+        ancestors), and only if at least two levels deep and within ``[file_io] root``; inputs
+        elsewhere are still mounted individually.
+        """
+        threshold = self.cfg.get_int("file_io", "consolidate_input_mounts")
+        if threshold <= 0 or len(self.input_path_map) < threshold:
+            return [
+                self._prepare_input_mount(host_path, container_path)
+                for host_path, container_path in self.input_path_map.items()
+            ]
+
+        real_paths = dict(
+            (host_path, os.path.realpath(host_path.rstrip("/")))
+            for host_path in self.input_path_map
+        )
+        ancestors, ancestor_index = _consolidate_input_dirs(
+            set(os.path.dirname(p) for p in real_paths.values()), self.cfg["file_io"]["root"]
+        )
+        mount_points = [
+            os.path.join(self.container_dir, "_miniwdl_input_dirs", str(i))
+            for i in range(len(ancestors))
+        ]
+        ans = list(zip(mount_points, ancestors))
+        for host_path, container_path in self.input_path_map.items():
+            real_path = real_paths[host_path]
+            assert (not container_path.endswith("/")) or os.path.isdir(real_path)
+            i = ancestor_index.get(os.path.dirname(real_path))
+            if i is None:
+                ans.append(self._prepare_input_mount(host_path, container_path))
+                continue
+            host_link = self.host_work_path(container_path.rstrip("/"))
+            link_target = os.path.join(mount_points[i], os.path.relpath(real_path, ancestors[i]))
+            os.makedirs(os.path.dirname(host_link), exist_ok=True)
+            if os.path.islink(host_link):
+                # left by a previous attempt in the same working directory
+                if os.readlink(host_link) == link_target:
+                    continue
+                os.unlink(host_link)
+            os.symlink(link_target, host_link)
+        return ans
+
+    def _prepare_input_mount(self, host_path: str, container_path: str) -> Tuple[str, str]:
+        assert (not container_path.endswith("/")) or os.path.isdir(host_path.rstrip("/"))
+        host_mount_point = self.host_work_path(container_path)
+        if not os.path.exists(host_mount_point):
+            self.touch_mount_point(host_mount_point + ("/" if container_path.endswith("/") else ""))
+        return (container_path.rstrip("/"), host_path.rstrip("/"))
+
     def poll_stderr_context(self, logger: logging.Logger) -> ContextManager[Callable[[], None]]:
         """
         Implementation helper: open a context yielding a function to poll stderr.txt and log each
@@ -697,15 +801,55 @@ class TaskContainer(ABC):
         )
 
 
+def _consolidate_input_dirs(dirs: Set[str], root: str) -> Tuple[List[str], Dict[str, int]]:
+    # Group the host directories containing inputs under the shallowest of them which contain
+    # each other, excluding any less than two levels deep or outside the configured root. Return
+    # these ancestors and the index of each eligible directory's.
+    ancestors: List[str] = []
+    ancestor_index: Dict[str, int] = {}
+    # sorting by path components puts each directory after its ancestors
+    for d in sorted(dirs, key=lambda d: d.split("/")):
+        if ancestors and path_really_within(d, ancestors[-1]):
+            ancestor_index[d] = len(ancestors) - 1
+        elif d.count("/") >= 2 and path_really_within(d, root):
+            ancestors.append(d)
+            ancestor_index[d] = len(ancestors) - 1
+    return ancestors, ancestor_index
+
+
 _backends: Dict[str, typing.Type[TaskContainer]] = dict()
 _backends_lock: threading.Lock = threading.Lock()
 
 
-def new(cfg: config.Loader, logger: logging.Logger, run_id: str, host_dir: str) -> TaskContainer:
+def new(
+    cfg: config.Loader, logger: logging.Logger, run_id: str, host_dir: str, adopt: bool = False
+) -> TaskContainer:
     """
     Instantiate a TaskContainer from the configured backend, including any necessary global
     initialization.
+
+    :param adopt: adopt the container left running in host_dir by a previous miniwdl process (see
+                  :func:`adoptable`)
+    """
+    backend_cls = _backend(cfg, logger)
+    ans = (
+        backend_cls(cfg, run_id, host_dir, adopt=True)
+        if adopt
+        else backend_cls(cfg, run_id, host_dir)
+    )
+    assert isinstance(ans, TaskContainer)
+    return ans
+
+
+def adoptable(cfg: config.Loader, logger: logging.Logger, host_dir: str) -> bool:
     """
+    Whether the configured backend can adopt a container started in host_dir by a previous miniwdl
+    process (e.g. one that crashed before the task finished)
+    """
+    return _backend(cfg, logger).adoptable(cfg, logger, host_dir)
+
+
+def _backend(cfg: config.Loader, logger: logging.Logger) -> typing.Type[TaskContainer]:
     global _backends
     with _backends_lock:
         if not _backends:
@@ -715,6 +859,4 @@ def new(cfg: config.Loader, logger: logging.Logger, run_id: str, host_dir: str)
         if not getattr(backend_cls, "_global_init", False):
             backend_cls.global_init(cfg, logger)
             setattr(backend_cls, "_global_init", True)
-        ans = backend_cls(cfg, run_id, host_dir)
-        assert isinstance(ans, TaskContainer)
-        return ans
+        return backend_cls
@@ -28,7 +28,11 @@ be launched. Scatter and Conditional sections may be nested, inducing a multi-le
 operations.
 """
 
+import functools
+import heapq
+import itertools
 import logging
+import math
 import multiprocessing
 import os
 import json
@@ -37,19 +41,40 @@ import traceback
 import pickle
 import queue
 import threading
+import time
+import uuid
+from collections import deque
 from concurrent import futures
-from typing import Optional, List, Callable, Tuple, Dict, NamedTuple, Set, Union, TYPE_CHECKING
+from typing import (
+    Any,
+    Deque,
+    Optional,
+    List,
+    Callable,
+    Tuple,
+    Dict,
+    NamedTuple,
+    Set,
+    Union,
+    Generator,
+    TYPE_CHECKING,
+)
 from contextlib import ExitStack
 from .. import Env, Value, Tree, Error
-from .task import run_local_task
+from .task import run_local_task, run_local_task_async
 from ._io_helpers import (
     _add_downloadable_defaults,
     _warn_output_basename_collisions,
     link_outputs,
 )
-from .download import able as downloadable, run_cached as download
-from ._stdlib import WorkflowStdLib
-from ._workflow_state import StateMachine
+from .download import (
+    able as downloadable,
+    batch_key as download_batch_key,
+    run_cached as download,
+    run_cached_batch as download_batch,
+)
+from ._stdlib import ReadMemo, WorkflowStdLib
+from ._workflow_state import StateMachine, critical_paths
 from .._util import (
     write_atomic,
     write_values_json,
@@ -60,7 +85,7 @@ from .._util import (
     pathsize,
 )
 from .._util import StructuredLogMessage as _
-from . import config, _statusbar
+from . import config, cache_gc, _statusbar, _event_loop
 from .cache import CallCache, CallCacheAddPaths, call_cache_key, new as new_call_cache
 from .error import RunFailed, Terminated, error_json
 
@@ -80,7 +105,9 @@ class WorkflowMainLoopResult(NamedTuple):
 class _ThreadPools:
     # Singleton managing the thread pools for concurrent task and subworkflow execution
     #
-    # All tasks run on one thread pool.
+    # All tasks run on one thread pool -- or with [scheduler] event_loop, as coroutines on the
+    # process-wide event loop, holding one of task_concurrency slots. (Input downloads still use
+    # the thread pool.)
     #
     # Each subworkflow call runs on a thread pool reserved for its nested call depth level.
     # (If we kept just one subworkflow thread pool, then nested calls could deadlock when no thread
@@ -88,9 +115,22 @@ class _ThreadPools:
     _lock: threading.Lock
     _cleanup: ExitStack
     _task_pool: futures.ThreadPoolExecutor
+    _task_concurrency: int
+    # Tasks await a thread in this heap of (-priority, sequence number, future, function) instead
+    # of the thread pool's FIFO work queue, so that the highest-priority task starts next.
+    _task_queue: List[Tuple[float, int, futures.Future, "functools.partial[Any]"]]
+    _task_seq: "itertools.count[int]"
+    _tasks_running: int
+    _shutdown: bool
+    _task_slots: Optional[_event_loop.PrioritySemaphore]
+    _task_coroutines: Set[futures.Future]
     _subworkflow_pools: List[futures.ThreadPoolExecutor]
     _subworkflow_concurrency: int
+    # for blocking operations of inline subworkflows (see _offload())
+    _blocking_pool: Optional[futures.ThreadPoolExecutor]
     _logger: logging.Logger
+    # (also holds the run-scoped read_* memo shared by the workflow and its subworkflows)
+    read_memo: ReadMemo
 
     def __init__(self, cfg: config.Loader, cleanup: ExitStack, logger: logging.Logger) -> None:
         self._logger = logger
@@ -109,16 +149,103 @@ class _ThreadPools:
 
         self._task_pool = futures.ThreadPoolExecutor(max_workers=task_concurrency)
         self._cleanup.callback(futures.ThreadPoolExecutor.shutdown, self._task_pool)
+        self._task_concurrency = task_concurrency
+        self._task_queue = []
+        self._task_seq = itertools.count()
+        self._tasks_running = 0
+        self._shutdown = False
+        self._cleanup.callback(self._cancel_queued_tasks)
         self._logger.info(_("task thread pool initialized", task_concurrency=task_concurrency))
 
+        self._task_slots = None
+        self._task_coroutines = set()
+        if cfg["scheduler"].get_bool("event_loop"):
+            blocking_concurrency = cfg["scheduler"].get_int("blocking_concurrency") or (
+                4 * multiprocessing.cpu_count()
+            )
+            _event_loop.start(blocking_concurrency)
+            self._task_slots = _event_loop.semaphore(task_concurrency)
+            # like ThreadPoolExecutor.shutdown(), wait for any tasks still running (e.g. tearing
+            # down their containers after termination)
+            self._cleanup.callback(lambda: futures.wait(list(self._task_coroutines)))
+            self._logger.info(
+                _(
+                    "task event loop initialized",
+                    task_concurrency=task_concurrency,
+                    blocking_concurrency=blocking_concurrency,
+                )
+            )
+
         self._subworkflow_concurrency = cfg.get_int("scheduler", "subworkflow_concurrency") or max(
             task_concurrency, multiprocessing.cpu_count()
         )
         self._subworkflow_pools = []
+        self._blocking_pool = None
+
+        self.read_memo = ReadMemo(cfg)
+        self._cleanup.callback(self.read_memo.log_stats, self._logger)
+
+    @property
+    def event_loop(self) -> bool:
+        return self._task_slots is not None
+
+    def submit_task(self, fn, *args, priority: float = 0.0, **kwargs):
+        future: futures.Future = futures.Future()
+        with self._lock:
+            heapq.heappush(
+                self._task_queue,
+                (-priority, next(self._task_seq), future, functools.partial(fn, *args, **kwargs)),
+            )
+        self._dispatch_tasks()
+        return future
+
+    def _dispatch_tasks(self) -> None:
+        with self._lock:
+            while (
+                self._task_queue
+                and self._tasks_running < self._task_concurrency
+                and not self._shutdown
+            ):
+                future, fn = heapq.heappop(self._task_queue)[2:]
+                if future.set_running_or_notify_cancel():
+                    self._tasks_running += 1
+                    self._task_pool.submit(self._run_task, future, fn)
+
+    def _run_task(self, future: futures.Future, fn: Callable[[], Any]) -> None:
+        try:
+            result = fn()
+        except BaseException as exn:
+            self._task_finished()
+            future.set_exception(exn)
+        else:
+            self._task_finished()
+            future.set_result(result)
+
+    def _task_finished(self) -> None:
+        with self._lock:
+            self._tasks_running -= 1
+        self._dispatch_tasks()
 
-    def submit_task(self, *args, **kwargs):
+    def _cancel_queued_tasks(self) -> None:
         with self._lock:
-            return self._task_pool.submit(*args, **kwargs)
+            self._shutdown = True
+            for entry in self._task_queue:
+                entry[2].cancel()
+            self._task_queue = []
+
+    def submit_task_coroutine(self, coroutine_function, *args, priority: float = 0.0, **kwargs):
+        assert self._task_slots is not None
+        future = _event_loop.submit(
+            lambda: coroutine_function(*args, **kwargs), slots=self._task_slots, priority=priority
+        )
+        with self._lock:
+            self._task_coroutines.add(future)
+        future.add_done_callback(self._task_coroutine_done)
+        return future
+
+    def _task_coroutine_done(self, future: futures.Future) -> None:
+        with self._lock:
+            self._task_coroutines.discard(future)
 
     def submit_subworkflow(self, call_depth: int, *args, **kwargs):
         with self._lock:
@@ -137,110 +264,385 @@ class _ThreadPools:
                 )
             return self._subworkflow_pools[call_depth].submit(*args, **kwargs)
 
+    def submit_blocking(self, *args, **kwargs):
+        with self._lock:
+            if not self._blocking_pool:
+                self._blocking_pool = futures.ThreadPoolExecutor(self._subworkflow_concurrency)
+                self._cleanup.callback(futures.ThreadPoolExecutor.shutdown, self._blocking_pool)
+            return self._blocking_pool.submit(*args, **kwargs)
 
-def _download_workflow_input_files(
-    cfg: config.Loader,
-    logger: logging.Logger,
-    logger_prefix: List[str],
-    run_dir: str,
-    inputs: Env.Bindings[Value.Base],
-    thread_pools: _ThreadPools,
-    cache: CallCache,
-) -> None:
+
+class _InputDownloads:
     """
-    Find all File & Directory input values that are downloadable URIs (including any nested within
-    compound values), and ensure the cache is "primed" with them. Workflow inputs are not modified:
-    future task input localization will resolve each URI from the cache.
+    Localization of the workflow's input URIs (including any nested within compound values), which
+    proceeds on the task thread pool concurrently with the workflow state machine, instead of
+    delaying it until all are downloaded. Workflow inputs are not modified: future task input
+    localization will resolve each URI from the cache, once its download has finished.
+
+    The driver must defer launching any call whose inputs include a URI still downloading (see
+    ``pending()``); the downloads needed by such deferred calls are moved to the head of the queue,
+    as they're the closest to runnable. Completed download futures are delivered to the driver's
+    queue, to be passed to ``finished()``.
+
+    With ``[scheduler] download_batch_size`` > 1, queued File URIs sharing a batch downloader are
+    grouped into one download task (operation).
+
+    Each URI is identified by a ``(uri, directory)`` key, normalizing any trailing slash of a
+    Directory URI; the URI is downloaded as first given.
     """
 
-    # scan inputs for URIs
-    uris: Set[Tuple[str, bool]] = set()
-
-    def scan_uri(v: Union[Value.File, Value.Directory]) -> str:
-        nonlocal uris
-        directory = isinstance(v, Value.Directory)
-        uri = v.value
-        if (uri, directory) not in uris and downloadable(cfg, uri, directory=directory):
-            uris.add((uri, directory))
-        return uri
-
-    Value.rewrite_env_paths(inputs, scan_uri)
-    if not uris:
-        return
-    logger.notice(_("downloading input URIs", count=len(uris)))
-
-    # download them on the thread pool (but possibly further limiting concurrency)
-    download_concurrency = cfg.get_int("scheduler", "download_concurrency")
-    if download_concurrency <= 0:
-        download_concurrency = 999999
-    ops: Dict[futures.Future[Tuple[bool, str]], str] = {}
-    incomplete = len(uris)
-    outstanding: Set[futures.Future[Tuple[bool, str]]] = set()
-    downloaded_bytes = 0
-    cached_hits = 0
-    exn = None
-
-    while incomplete and not exn:
-        assert len(outstanding) <= incomplete
-
-        # top up thread pool's queue (up to download_concurrency)
-        while uris and len(outstanding) < download_concurrency:
-            (uri, directory) = uris.pop()
-            logger.info(
+    _cfg: config.Loader
+    _logger: logging.Logger
+    _logger_prefix: List[str]
+    _run_dir: str
+    _thread_pools: _ThreadPools
+    _cache: CallCache
+    _on_done: Callable[[futures.Future], None]
+    _concurrency: int
+    _batch_size: int
+    _uris: Dict[Tuple[str, bool], str]
+    # queued keys in order, with _queued their set. Keys leaving the queue out of order are only
+    # removed from the set, leaving stale entries in the deques to be skipped when reached.
+    _queue: Deque[Tuple[str, bool]]
+    _queued: Set[Tuple[str, bool]]
+    _batches: Dict[str, Deque[Tuple[str, bool]]]
+    _running: Dict[Tuple[str, bool], futures.Future]
+    _ops: Dict[futures.Future, List[Tuple[str, bool]]]
+    _submitted: int
+    _downloaded: int
+    _downloaded_bytes: int
+    _cached_hits: int
+
+    def __init__(
+        self,
+        cfg: config.Loader,
+        logger: logging.Logger,
+        logger_prefix: List[str],
+        run_dir: str,
+        inputs: Env.Bindings[Value.Base],
+        thread_pools: _ThreadPools,
+        cache: CallCache,
+        on_done: Callable[[futures.Future], None],
+    ) -> None:
+        self._cfg = cfg
+        self._logger = logger
+        self._logger_prefix = logger_prefix
+        self._run_dir = run_dir
+        self._thread_pools = thread_pools
+        self._cache = cache
+        self._on_done = on_done
+        self._concurrency = cfg.get_int("scheduler", "download_concurrency")
+        if self._concurrency <= 0:
+            self._concurrency = 999999
+        self._batch_size = max(1, cfg.get_int("scheduler", "download_batch_size"))
+        self._uris = {}
+        self._queue = deque()
+        self._queued = set()
+        self._batches = {}
+        self._running = {}
+        self._ops = {}
+        self._submitted = 0
+        self._downloaded = 0
+        self._downloaded_bytes = 0
+        self._cached_hits = 0
+
+        # scan inputs for URIs
+        keys = self._scan(inputs, lambda key: True)
+        if keys:
+            logger.notice(_("downloading input URIs", count=len(keys)))
+            self._enqueue(keys)
+            self._top_up()
+
+    def _scan(
+        self, values: Env.Bindings[Value.Base], pred: Callable[[Tuple[str, bool]], bool]
+    ) -> List[Tuple[str, bool]]:
+        # list the distinct downloadable URIs in values satisfying pred
+        ans: List[Tuple[str, bool]] = []
+        seen: Set[Tuple[str, bool]] = set()
+
+        def scan_uri(v: Union[Value.File, Value.Directory]) -> str:
+            directory = isinstance(v, Value.Directory)
+            key = _download_key(v.value, directory)
+            if (
+                key not in seen
+                and downloadable(self._cfg, v.value, directory=directory)
+                and pred(key)
+            ):
+                seen.add(key)
+                ans.append(key)
+                self._uris.setdefault(key, v.value)
+            return v.value
+
+        Value.rewrite_env_paths(values, scan_uri)
+        return ans
+
+    def _enqueue(self, keys: List[Tuple[str, bool]], front: bool = False) -> None:
+        # add keys to the tail (or head, in the given order) of the queue
+        for key in reversed(keys) if front else keys:
+            self._queued.add(key)
+            (self._queue.appendleft if front else self._queue.append)(key)
+            batch_key = self._batch_key(key)
+            if batch_key:
+                batch = self._batches.setdefault(batch_key, deque())
+                (batch.appendleft if front else batch.append)(key)
+
+    def _batch_key(self, key: Tuple[str, bool]) -> Optional[str]:
+        if self._batch_size > 1 and not key[1]:
+            return download_batch_key(self._cfg, key[0])
+        return None
+
+    @property
+    def busy(self) -> bool:
+        "Whether any downloads are queued or running"
+        return bool(self._queued or self._running)
+
+    def unfinished(self, keys: Set[Tuple[str, bool]]) -> Set[Tuple[str, bool]]:
+        "Subset of the given ``(uri, directory)`` keys whose downloads haven't yet finished"
+        return set(key for key in keys if key in self._running or key in self._queued)
+
+    def cancel(self) -> None:
+        "Cancel queued downloads"
+        self._queue.clear()
+        self._queued.clear()
+        self._batches.clear()
+        for future in self._running.values():
+            future.cancel()
+
+    def pending(self, values: Env.Bindings[Value.Base]) -> Set[Tuple[str, bool]]:
+        """
+        Find the ``(uri, directory)`` URIs in values which are still being downloaded, and
+        prioritize them
+        """
+        if not self.busy:
+            return set()
+        ans = self._scan(values, lambda key: key in self._running or key in self._queued)
+        if ans:
+            # move the queued ones to the head of the queue (their stale entries further back
+            # will be skipped)
+            self._enqueue([key for key in ans if key in self._queued], front=True)
+            self._top_up()
+        return set(ans)
+
+    def wait(self, uri: str, directory: bool) -> None:
+        """
+        Block until the URI has finished downloading, if it's among the workflow inputs (starting
+        its download next, if it's still queued)
+        """
+        key = _download_key(uri, directory)
+        if key in self._queued:
+            self._enqueue([key], front=True)
+            self._top_up()
+        while key in self._queued:
+            # wait for another download to finish, freeing up an operation for this one
+            done = futures.wait(list(self._ops.keys()), return_when=futures.FIRST_COMPLETED).done
+            for future in done:
+                self.finished(future)
+        if key in self._running:
+            future = self._running[key]
+            futures.wait([future])
+            self.finished(future)
+
+    def _dequeue(self, keys: Deque[Tuple[str, bool]]) -> Optional[Tuple[str, bool]]:
+        # take the next key still queued from the head of the deque
+        while keys:
+            key = keys.popleft()
+            if key in self._queued:
+                self._queued.remove(key)
+                return key
+        return None
+
+    def _top_up(self) -> None:
+        # start queued downloads (up to download_concurrency operations)
+        while self._queued and len(self._ops) < self._concurrency:
+            key = self._dequeue(self._queue)
+            assert key
+            keys = [key]
+            batch_key = self._batch_key(key)
+            if batch_key:
+                # take more queued File URIs with the same batch key (in queue order)
+                batch = self._batches[batch_key]
+                while len(keys) < self._batch_size:
+                    key = self._dequeue(batch)
+                    if not key:
+                        break
+                    keys.append(key)
+                if not batch:
+                    del self._batches[batch_key]
+            self._submit(keys)
+
+    def _submit(self, keys: List[Tuple[str, bool]]) -> None:
+        run_dir = os.path.join(self._run_dir, "download", str(self._submitted), ".")
+        logger_prefix = self._logger_prefix + [f"download{self._submitted}"]
+        if len(keys) == 1:
+            directory = keys[0][1]
+            uri = self._uris[keys[0]]
+            self._logger.info(
                 _(f"schedule input {'directory' if directory else 'file'} download", uri=uri)
             )
-            future = thread_pools.submit_task(
+            # (calls awaiting downloads can't start before them, so downloads take precedence)
+            future = self._thread_pools.submit_task(
                 download,
-                cfg,
-                logger,
-                cache,
+                self._cfg,
+                self._logger,
+                self._cache,
                 uri,
                 directory=directory,
-                run_dir=os.path.join(run_dir, "download", str(len(ops)), "."),
-                logger_prefix=logger_prefix + [f"download{len(ops)}"],
+                run_dir=run_dir,
+                logger_prefix=logger_prefix,
+                priority=math.inf,
             )
-            ops[future] = uri
-            outstanding.add(future)
-        assert outstanding
+        else:
+            uris = [self._uris[key] for key in keys]
+            self._logger.info(_("schedule input file batch download", uris=uris))
+            future = self._thread_pools.submit_task(
+                download_batch,
+                self._cfg,
+                self._logger,
+                self._cache,
+                uris,
+                run_dir=run_dir,
+                logger_prefix=logger_prefix,
+                priority=math.inf,
+            )
+        self._submitted += 1
+        self._ops[future] = keys
+        for key in keys:
+            self._running[key] = future
+        future.add_done_callback(self._on_done)
 
-        # wait for one or more oustanding downloads to finish
-        just_finished, still_outstanding = futures.wait(
-            outstanding, return_when=futures.FIRST_COMPLETED
-        )
-        outstanding = still_outstanding
-        for future in just_finished:
-            # check results
+    def finished(self, future: futures.Future) -> None:
+        """
+        Process a completed download future (no-op if already processed), starting more queued
+        downloads
+
+        :raise: the download's exception, if it failed
+        """
+        keys = self._ops.pop(future, None)
+        if keys is None:
+            return
+        for key in keys:
+            del self._running[key]
+        try:
+            future_exn = future.exception()
+        except futures.CancelledError:
+            future_exn = Terminated()
+        if future_exn:
+            # cancel pending ops and signal running ones to abort
+            self.cancel()
+            os.kill(os.getpid(), signal.SIGUSR1)
+            raise future_exn
+        results = future.result()
+        for key, (cached, filename) in zip(keys, results if len(keys) > 1 else [results]):
+            if cached:
+                self._cached_hits += 1
+            else:
+                sz = pathsize(filename)
+                self._logger.info(
+                    _("downloaded input", uri=self._uris[key], path=filename, bytes=sz)
+                )
+                self._downloaded += 1
+                self._downloaded_bytes += sz
+        self._top_up()
+        if not self.busy:
+            self._logger.notice(
+                _(
+                    "processed input URIs",
+                    cached=self._cached_hits,
+                    downloaded=self._downloaded,
+                    downloaded_bytes=self._downloaded_bytes,
+                )
+            )
+
+
+def _download_key(uri: str, directory: bool) -> Tuple[str, bool]:
+    return (uri.rstrip("/") if directory else uri, directory)
+
+
+# A workflow run, written as a generator which yields whenever it must wait for one of its call
+# (or download) futures to complete, to be sent that completed future; and finally returns
+# (run_dir, outputs). The generator is given a function to arrange for the future to be sent to it.
+_WorkflowGenerator = Generator[None, futures.Future, Tuple[str, Env.Bindings[Value.Base]]]
+
+
+class _WorkflowDriver:
+    # Steps one or more workflow generators on the calling thread, each as a "frame" whose result
+    # is delivered through a future.
+    #
+    # Ordinarily, each driver runs just one workflow, and a subworkflow call runs on its own
+    # thread (with its own driver) from the subworkflow thread pool for its call depth. With
+    # [scheduler] inline_subworkflows, a subworkflow call instead starts another frame on the
+    # calling workflow's driver, so that all nested subworkflows are stepped by the top-level
+    # workflow's thread, and occupy no thread while awaiting their own calls.
+
+    class _Frame:
+        gen: _WorkflowGenerator
+        future: "_CallFuture"
+
+    _events: "queue.SimpleQueue[Tuple[_WorkflowDriver._Frame, Optional[futures.Future]]]"
+
+    def __init__(self) -> None:
+        self._events = queue.SimpleQueue()
+
+    def start(
+        self, make_gen: Callable[[Callable[[futures.Future], None]], _WorkflowGenerator]
+    ) -> "_CallFuture":
+        # Start a frame for the generator returned by make_gen(notify), where notify(future) shall
+        # be used to arrange for the completed future to be sent to the generator. The frame will
+        # next be stepped by the thread in run(). Cancelling the returned future closes the
+        # generator.
+        frame = _WorkflowDriver._Frame()
+        frame.future = futures.Future()
+        frame.gen = make_gen(lambda future: self._events.put((frame, future)))
+
+        def on_done(fut: futures.Future) -> None:
+            if fut.cancelled():
+                frame.gen.close()
+
+        frame.future.add_done_callback(on_done)
+        self._events.put((frame, None))
+        return frame.future
+
+    def run(
+        self, make_gen: Callable[[Callable[[futures.Future], None]], _WorkflowGenerator]
+    ) -> Tuple[str, Env.Bindings[Value.Base]]:
+        # start a frame and step it (and any further frames started meanwhile) until it's done
+        future = self.start(make_gen)
+        while not future.done():
+            frame, sent = self._events.get()
+            if frame.future.done():
+                continue  # frame already finished or cancelled
             try:
-                future_exn = future.exception()
-            except futures.CancelledError:
-                future_exn = Terminated()
-            if not future_exn:
-                uri = ops[future]
-                cached, filename = future.result()
-                if cached:
-                    cached_hits += 1
+                if sent is None:
+                    next(frame.gen)
                 else:
-                    sz = pathsize(filename)
-                    logger.info(_("downloaded input", uri=uri, path=filename, bytes=sz))
-                    downloaded_bytes += sz
-            elif not exn:
-                # cancel pending ops and signal running ones to abort
-                for outsfut in outstanding:
-                    outsfut.cancel()
-                os.kill(os.getpid(), signal.SIGUSR1)
-                exn = future_exn
-            incomplete -= 1
-
-    if exn:
-        raise exn
-    logger.notice(
-        _(
-            "processed input URIs",
-            cached=cached_hits,
-            downloaded=len(ops) - cached_hits,
-            downloaded_bytes=downloaded_bytes,
-        )
-    )
+                    frame.gen.send(sent)
+            except StopIteration as stop:
+                frame.future.set_result(stop.value)
+            except BaseException as exn:
+                frame.future.set_exception(exn)
+        return future.result()
+
+
+def _offload(
+    thread_pools: _ThreadPools,
+    notify: Callable[[futures.Future], None],
+    fn: Callable[..., Any],
+    *args,
+) -> Generator[None, futures.Future, Any]:
+    # For a workflow generator sharing its driver's thread with others (inline subworkflows): run
+    # a blocking operation on another thread, yielding until it completes instead of stalling the
+    # driver. Any other futures sent to the generator meanwhile are sent to it again afterwards.
+    future = thread_pools.submit_blocking(fn, *args)
+    future.add_done_callback(notify)
+    others = []
+    while True:
+        sent = yield
+        if sent is future:
+            break
+        others.append(sent)
+    for sent in others:
+        notify(sent)
+    return future.result()
 
 
 def run_local_workflow(
@@ -254,6 +656,7 @@ def run_local_workflow(
     _cache: Optional[CallCache] = None,
     _test_pickle: bool = False,
     _run_id_stack: Optional[List[str]] = None,
+    _resume: bool = False,
 ) -> Tuple[str, Env.Bindings[Value.Base]]:
     """
     Run a workflow locally.
@@ -265,8 +668,44 @@ def run_local_workflow(
     :param run_dir: directory under which to create a timestamp-named subdirectory for this run
                     (defaults to current working directory).
                     If the final path component is ".", then operate in run_dir directly.
+    :param _resume: resume the interrupted run in run_dir (which must end with "."), restoring its
+                    checkpoint if any (see :func:`load_checkpoint`)
     """
+    driver = _WorkflowDriver()
+    return driver.run(
+        lambda notify: _run_local_workflow(
+            cfg,
+            workflow,
+            inputs,
+            run_id=run_id,
+            run_dir=run_dir,
+            logger_prefix=logger_prefix,
+            _thread_pools=_thread_pools,
+            _cache=_cache,
+            _test_pickle=_test_pickle,
+            _run_id_stack=_run_id_stack,
+            _resume=_resume,
+            _driver=driver,
+            _notify=notify,
+        )
+    )
+
 
+def _run_local_workflow(
+    cfg: config.Loader,
+    workflow: Tree.Workflow,
+    inputs: Env.Bindings[Value.Base],
+    run_id: Optional[str],
+    run_dir: Optional[str],
+    logger_prefix: Optional[List[str]],
+    _thread_pools: Optional[_ThreadPools],
+    _cache: Optional[CallCache],
+    _test_pickle: bool,
+    _run_id_stack: Optional[List[str]],
+    _resume: bool,
+    _driver: _WorkflowDriver,
+    _notify: Callable[[futures.Future], None],
+) -> _WorkflowGenerator:
     # provision run directory and log file
     run_id = run_id or workflow.name
     _run_id_stack = _run_id_stack or []
@@ -309,12 +748,23 @@ def run_local_workflow(
             assert cache and _thread_pools is None
         if not _thread_pools:
             cache.flock(logfile, exclusive=True)  # flock top-level workflow.log
+            cleanup.enter_context(cache_gc.background(cfg, logger))
         write_values_json(inputs, os.path.join(run_dir, "inputs.json"), namespace=workflow.name)
 
         # query call cache
         cache_inputs = inputs
-        cache_key = call_cache_key(workflow.name, workflow.digest, cache_inputs)
-        cached = cache.get(cache_key, cache_inputs, workflow.effective_outputs)
+        cache_key = cache.call_key(workflow.name, workflow.digest, cache_inputs)
+        if _thread_pools and cfg["scheduler"].get_bool("inline_subworkflows"):
+            cached = yield from _offload(
+                _thread_pools,
+                _notify,
+                cache.get,
+                cache_key,
+                cache_inputs,
+                workflow.effective_outputs,
+            )
+        else:
+            cached = cache.get(cache_key, cache_inputs, workflow.effective_outputs)
         if cached is not None:
             for outp in workflow.effective_outputs:
                 v = cached[outp.name]
@@ -362,7 +812,7 @@ def run_local_workflow(
 
         try:
             # run workflow state machine
-            main_loop_result = _workflow_main_loop(
+            main_loop_result = yield from _workflow_main_loop(
                 cfg,
                 workflow,
                 inputs,
@@ -374,6 +824,9 @@ def run_local_workflow(
                 cache,
                 terminating,
                 _test_pickle,
+                _resume,
+                _driver,
+                _notify,
             )
             outputs = main_loop_result.outputs
             cache_add_paths = main_loop_result.cache_add_paths
@@ -397,6 +850,74 @@ def run_local_workflow(
     return (run_dir, outputs)
 
 
+_CHECKPOINT_VERSION = 1
+
+
+def _checkpoint_filename(run_dir: str) -> str:
+    return os.path.join(run_dir, "checkpoint.pickle")
+
+
+def _write_checkpoint(run_dir: str, state: StateMachine) -> None:
+    # pickle to a temporary name then rename, so that an interruption can't leave behind a
+    # truncated checkpoint
+    filename = _checkpoint_filename(run_dir)
+    tn = filename + ".tmp." + str(uuid.uuid1())
+    with open(tn, "wb") as outfile:
+        pickle.dump({"version": _CHECKPOINT_VERSION, "state": state}, outfile)
+    os.rename(tn, filename)
+
+
+def load_checkpoint(run_dir: str) -> StateMachine:
+    """
+    Load the workflow state machine checkpointed in the run directory of an interrupted run
+    (written every ``[scheduler] checkpoint_period_seconds`` while the workflow runs). The state
+    records the workflow and its inputs, which calls had finished, and which were still in flight.
+    """
+    with open(_checkpoint_filename(run_dir), "rb") as infile:
+        checkpoint = pickle.load(infile)
+    if not isinstance(checkpoint, dict) or checkpoint.get("version") != _CHECKPOINT_VERSION:
+        raise Error.RuntimeError("unrecognized checkpoint format in " + run_dir)
+    state = checkpoint["state"]
+    assert isinstance(state, StateMachine)
+    return state
+
+
+def _resume_call(
+    cfg: config.Loader,
+    logger: logging.Logger,
+    call: StateMachine.CallInstructions,
+    call_dir: str,
+) -> Optional[_CallFuture]:
+    # Upon resuming, deal with a call subdirectory left behind by the interrupted run: if the call
+    # had actually finished, return a completed future with its outputs. Otherwise set aside a task
+    # call subdirectory, unless the container backend can adopt the task's still-running container
+    # (leave it in place for that). Subworkflow subdirectories are resumed in place.
+    outputs_json = os.path.join(call_dir, "outputs.json")
+    if os.path.exists(outputs_json):
+        from .. import values_from_json
+
+        with open(outputs_json) as infile:
+            outputs = values_from_json(
+                json.load(infile), call.callee.effective_outputs, namespace=call.callee.name
+            )
+        logger.info(_("reusing outputs of finished call", job=call.id, dir=call_dir))
+        future: _CallFuture = futures.Future()
+        future.set_result((call_dir, outputs))
+        return future
+    if isinstance(call.callee, Tree.Task):
+        from .task_container import adoptable
+
+        if not adoptable(cfg, logger, call_dir):
+            n = 1
+            while os.path.exists(f"{call_dir}.interrupted{n}"):
+                n += 1
+            os.rename(call_dir, f"{call_dir}.interrupted{n}")
+            logger.info(
+                _("set aside interrupted call", job=call.id, dir=f"{call_dir}.interrupted{n}")
+            )
+    return None
+
+
 def _workflow_main_loop(
     cfg: config.Loader,
     workflow: Tree.Workflow,
@@ -409,10 +930,17 @@ def _workflow_main_loop(
     cache: CallCache,
     terminating: Callable[[], bool],
     _test_pickle: bool,
-) -> WorkflowMainLoopResult:
+    resume: bool,
+    driver: _WorkflowDriver,
+    notify: Callable[[futures.Future], None],
+) -> Generator[None, futures.Future, WorkflowMainLoopResult]:
     assert isinstance(cfg, config.Loader)
     call_futures: Dict[_CallFuture, Tuple[str, str]] = {}
-    completed_futures: queue.SimpleQueue[_CallFuture] = queue.SimpleQueue()
+    downloads: Optional[_InputDownloads] = None
+    inline_subworkflows = cfg["scheduler"].get_bool("inline_subworkflows")
+    checkpoint_period = cfg["scheduler"].get_float("checkpoint_period_seconds")
+    last_checkpoint = time.time()
+    state: Optional[StateMachine] = None
     try:
         # start plugin coroutines and process inputs through them
         with compose_coroutines(
@@ -429,8 +957,8 @@ def _workflow_main_loop(
             recv = next(plugins)
             inputs = recv["inputs"]
 
-            # download input files, if needed
-            _download_workflow_input_files(
+            # start downloading input files, if needed, concurrently with the state machine
+            downloads = _InputDownloads(
                 cfg,
                 logger,
                 logger_id,
@@ -438,58 +966,170 @@ def _workflow_main_loop(
                 _add_downloadable_defaults(cfg, workflow.available_inputs, inputs),
                 thread_pools,
                 cache,
+                notify,
             )
+            # calls awaiting input downloads
+            deferred_calls: List[Tuple[StateMachine.CallInstructions, Set[Tuple[str, bool]]]] = []
+
+            def launch_call(next_call: StateMachine.CallInstructions) -> None:
+                call_dir = os.path.join(run_dir, next_call.id)
+                adopt = False
+                if resume and os.path.exists(call_dir):
+                    # left over from the interrupted run; finish, adopt, or set aside
+                    future = _resume_call(cfg, logger, next_call, call_dir)
+                    if future is not None:
+                        call_futures[future] = (next_call.id, "")
+                        future.add_done_callback(notify)
+                        return
+                    adopt = isinstance(next_call.callee, Tree.Task) and os.path.exists(call_dir)
+                elif os.path.exists(call_dir):
+                    logger.warning(
+                        _("call subdirectory already exists, conflict likely", dir=call_dir)
+                    )
+                sub_args = (cfg, next_call.callee, next_call.inputs)
+                sub_kwargs = {
+                    "run_id": next_call.id,
+                    "run_dir": os.path.join(call_dir, "."),
+                    "logger_prefix": logger_id,
+                    "_cache": cache,
+                    "_run_id_stack": run_id_stack,
+                }
+                # submit to appropriate thread pool
+                if isinstance(next_call.callee, Tree.Task):
+                    assert state is not None
+                    _statusbar.task_backlogged()
+                    if thread_pools.event_loop:
+                        future = thread_pools.submit_task_coroutine(
+                            run_local_task_async,
+                            *sub_args,
+                            **sub_kwargs,
+                            _adopt=adopt,
+                            priority=state.priority(next_call.id),
+                        )
+                    else:
+                        future = thread_pools.submit_task(
+                            run_local_task,
+                            *sub_args,
+                            **sub_kwargs,
+                            _adopt=adopt,
+                            priority=state.priority(next_call.id),
+                        )
+                elif isinstance(next_call.callee, Tree.Workflow) and inline_subworkflows:
+                    future = driver.start(
+                        lambda notify: _run_local_workflow(
+                            cfg,
+                            next_call.callee,  # type: ignore
+                            next_call.inputs,
+                            run_id=next_call.id,
+                            run_dir=os.path.join(call_dir, "."),
+                            logger_prefix=logger_id,
+                            _cache=cache,
+                            _run_id_stack=run_id_stack,
+                            _thread_pools=thread_pools,
+                            _test_pickle=_test_pickle,
+                            _resume=resume,
+                            _driver=driver,
+                            _notify=notify,
+                        )
+                    )
+                elif isinstance(next_call.callee, Tree.Workflow):
+                    future = thread_pools.submit_subworkflow(
+                        len(run_id_stack) - 1,
+                        run_local_workflow,
+                        *sub_args,
+                        **sub_kwargs,
+                        _thread_pools=thread_pools,
+                        _resume=resume,
+                    )
+                else:
+                    assert False
+                child_key = call_cache_key(
+                    next_call.callee.name, next_call.callee.digest, next_call.inputs
+                )
+                call_futures[future] = (next_call.id, child_key)
+                future.add_done_callback(notify)
+
+            def step(
+                state: StateMachine, stdlib: WorkflowStdLib
+            ) -> Generator[None, futures.Future, Optional[StateMachine.CallInstructions]]:
+                # While input downloads are busy, evaluating a read_*() etc. may block awaiting
+                # one (WorkflowStdLib -> downloads.wait()); when sharing the driver with inline
+                # subworkflows, do so on another thread.
+                if inline_subworkflows and downloads and downloads.busy:
+                    return (yield from _offload(thread_pools, notify, state.step, cfg, stdlib))
+                return state.step(cfg, stdlib)
 
             # run workflow state machine to completion
-            state = StateMachine(".".join(logger_id), run_dir, workflow, inputs)
-            stdlib = WorkflowStdLib(cfg, workflow.effective_wdl_version, state, cache)
-            while state.outputs is None:
+            if resume and os.path.exists(_checkpoint_filename(run_dir)):
+                state = load_checkpoint(run_dir)
+                if state.workflow.digest != workflow.digest:
+                    raise Error.RuntimeError("checkpoint is from a different workflow version")
+                logger.notice(_("resuming from checkpoint", relaunch=state.relaunch_running()))
+            if state is None:
+                priorities = None
+                if cfg["scheduler"].get_bool("critical_path_priority"):
+                    priorities = critical_paths(
+                        workflow, lambda task: cache.task_runtime(task.name, task.digest)
+                    )
+                state = StateMachine(".".join(logger_id), run_dir, workflow, inputs, priorities)
+            stdlib = WorkflowStdLib(
+                cfg,
+                workflow.effective_wdl_version,
+                state,
+                cache,
+                input_downloads=downloads,
+                read_memo=thread_pools.read_memo,
+            )
+            while state.outputs is None or downloads.busy:
                 if _test_pickle:
                     state = pickle.loads(pickle.dumps(state))
-                    stdlib = WorkflowStdLib(cfg, workflow.effective_wdl_version, state, cache)
+                    stdlib = WorkflowStdLib(
+                        cfg,
+                        workflow.effective_wdl_version,
+                        state,
+                        cache,
+                        input_downloads=downloads,
+                        read_memo=thread_pools.read_memo,
+                    )
                 if terminating():
                     raise Terminated()
-                # schedule all runnable calls
-                next_call = state.step(cfg, stdlib)
+                # schedule all runnable calls, deferring those awaiting input downloads
+                next_call = yield from step(state, stdlib)
                 while next_call:
-                    call_dir = os.path.join(run_dir, next_call.id)
-                    if os.path.exists(call_dir):
-                        logger.warning(
-                            _("call subdirectory already exists, conflict likely", dir=call_dir)
-                        )
-                    sub_args = (cfg, next_call.callee, next_call.inputs)
-                    sub_kwargs = {
-                        "run_id": next_call.id,
-                        "run_dir": os.path.join(call_dir, "."),
-                        "logger_prefix": logger_id,
-                        "_cache": cache,
-                        "_run_id_stack": run_id_stack,
-                    }
-                    # submit to appropriate thread pool
-                    if isinstance(next_call.callee, Tree.Task):
-                        _statusbar.task_backlogged()
-                        future = thread_pools.submit_task(run_local_task, *sub_args, **sub_kwargs)
-                    elif isinstance(next_call.callee, Tree.Workflow):
-                        future = thread_pools.submit_subworkflow(
-                            len(run_id_stack) - 1,
-                            run_local_workflow,
-                            *sub_args,
-                            **sub_kwargs,
-                            _thread_pools=thread_pools,
+                    awaiting = downloads.pending(next_call.inputs)
+                    if awaiting:
+                        logger.info(
+                            _(
+                                "call awaiting input downloads",
+                                job=next_call.id,
+                                uris=sorted(uri for uri, _directory in awaiting),
+                            )
                         )
+                        deferred_calls.append((next_call, awaiting))
                     else:
-                        assert False
-                    child_key = call_cache_key(
-                        next_call.callee.name, next_call.callee.digest, next_call.inputs
-                    )
-                    call_futures[future] = (next_call.id, child_key)
-                    future.add_done_callback(completed_futures.put)
-                    next_call = state.step(cfg, stdlib)
+                        launch_call(next_call)
+                    next_call = yield from step(state, stdlib)
+                if checkpoint_period > 0 and time.time() - last_checkpoint >= checkpoint_period:
+                    _write_checkpoint(run_dir, state)
+                    last_checkpoint = time.time()
                 # no more calls to launch right now; wait for an outstanding call to finish
-                while call_futures:
-                    future = completed_futures.get()
+                while call_futures or downloads.busy:
+                    future = yield
                     call_info = call_futures.pop(future, None)
                     if call_info is None:
+                        # download future (possibly already processed by downloads.wait())
+                        downloads.finished(future)
+                        # launch deferred calls whose input downloads are now all finished
+                        still_deferred = []
+                        for deferred_call, awaiting in deferred_calls:
+                            awaiting = downloads.unfinished(awaiting)
+                            if awaiting:
+                                still_deferred.append((deferred_call, awaiting))
+                            else:
+                                launch_call(deferred_call)
+                        deferred_calls = still_deferred
+                        if state.outputs is not None and not downloads.busy:
+                            break
                         continue
                     __, outputs = future.result()
                     call_id, child_key = call_info
@@ -521,8 +1161,17 @@ def _workflow_main_loop(
             write_values_json(
                 outputs, os.path.join(run_dir, "outputs.json"), namespace=workflow.name
             )
+            if os.path.exists(_checkpoint_filename(run_dir)):
+                os.unlink(_checkpoint_filename(run_dir))
             logger.notice("done")
             return WorkflowMainLoopResult(outputs, state.cache_add_paths)
+    except GeneratorExit:
+        # our own (subworkflow) call was cancelled
+        for key in call_futures:
+            key.cancel()
+        if downloads:
+            downloads.cancel()
+        raise
     except Exception as exn:
         tbtxt = traceback.format_exc()
         logger.debug(tbtxt)
@@ -545,6 +1194,13 @@ def _workflow_main_loop(
         except Exception as exn2:
             logger.debug(traceback.format_exc())
             logger.critical(_("failed to write error.json", dir=run_dir, message=str(exn2)))
+        if checkpoint_period > 0 and state is not None:
+            # record the calls finished so far, for miniwdl run --resume
+            try:
+                _write_checkpoint(run_dir, state)
+            except Exception as exn2:
+                logger.debug(traceback.format_exc())
+                logger.critical(_("failed to write checkpoint", dir=run_dir, message=str(exn2)))
         if not isinstance(exn, RunFailed):
             logger.error(
                 _(
@@ -562,4 +1218,6 @@ def _workflow_main_loop(
         # Cancel all future tasks that havent started
         for key in call_futures:
             key.cancel()
+        if downloads:
+            downloads.cancel()
         raise wrapper from exn
@@ -34,6 +34,7 @@ class Swarm:
 class models:
     class services:
         class Service:
+            id: str
             short_id: str
             name: str
 
@@ -98,11 +99,22 @@ class types:
         def __init__(self, *args, **kwargs):
             ...
 
+class APIClient:
+    def tasks(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        ...
+
 class DockerClient:
+    @property
+    def api(self) -> APIClient:
+        ...
+
     @property
     def containers(self) -> Containers:
         ...
 
+    def events(self, **kwargs) -> Any:
+        ...
+
     @property
     def images(self) -> Images:
         ...
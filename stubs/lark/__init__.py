@@ -5,6 +5,8 @@
 from typing import Any, Callable, Optional, Dict
 from . import exceptions
 
+__version__: str
+
 class Token:
     value: str
     line: int
@@ -21,7 +23,7 @@ class Tree:
     ...
 
 class Lark:
-    def __init__(self,grammar,start=None,parser=None,propagate_positions=None,lexer_callbacks=Dict[str,Callable],maybe_placeholders=False):
+    def __init__(self,grammar,start=None,parser=None,propagate_positions=None,lexer_callbacks=Dict[str,Callable],maybe_placeholders=False,cache=False):
         ...
     def parse(self,str) -> Tree:
         ...
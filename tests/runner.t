@@ -11,7 +11,7 @@ source tests/bash-tap/bash-tap-bootstrap
 export PYTHONPATH="$SOURCE_DIR:$PYTHONPATH"
 miniwdl="python3 -m WDL"
 
-plan tests 115
+plan tests 120
 
 $miniwdl run_self_test
 is "$?" "0" "run_self_test"
@@ -804,3 +804,43 @@ cat << 'EOF' > issue717.json
 EOF
 $miniwdl run issue717.wdl -i issue717.json
 is "$?" "0" "read exponential-notation values in JSON inputs (issue 717 regression)"
+
+# miniwdl run --resume leaves the rerun script & WDL source in the run directory, even if the
+# interrupted run didn't get to
+cat << 'EOF' > resume.wdl
+version 1.0
+workflow resume {
+    input {
+        File flag
+    }
+    scatter (i in range(2)) {
+        call t { input: i = i, flag = flag }
+    }
+    output {
+        Array[Int] outs = t.out
+    }
+}
+task t {
+    input {
+        Int i
+        File flag
+    }
+    command <<<
+        if [ ~{i} -eq 1 ] && grep -q fail "~{flag}"; then exit 1; fi
+        echo $(( ~{i} * 2 ))
+    >>>
+    output {
+        Int out = read_int(stdout())
+    }
+}
+EOF
+echo fail > resume_flag.txt
+MINIWDL__SCHEDULER__CHECKPOINT_PERIOD_SECONDS=0.01 $miniwdl run resume.wdl flag=resume_flag.txt --dir resume_run/.
+is "$?" "1" "resume: interrupted run"
+rm -rf resume_run/rerun resume_run/wdl
+echo ok > resume_flag.txt
+$miniwdl run --resume resume_run
+is "$?" "0" "resume: resumed run"
+is "$(jq -c '.["resume.outs"]' resume_run/outputs.json)" "[0,2]" "resume: outputs"
+is "$(cat resume_run/rerun)" "pushd $DN && miniwdl run --resume resume_run; popd" "resume: rerun"
+is "$(ls resume_run/wdl)" "resume.wdl" "resume: wdl"
@@ -1,5 +1,6 @@
-import unittest, inspect, json, random
+import unittest, inspect, json, pickle, random, time, gc, weakref
 from .context import WDL
+from unittest.mock import patch
 
 class TestEval(unittest.TestCase):
     def test_expr_render(self):
@@ -112,8 +113,15 @@ class TestEval(unittest.TestCase):
                 for binding in env:
                     type_env = type_env.bind(binding.name, binding.value.type)
             if exn:
-                with self.assertRaises(exn, msg=expected):
+                with self.assertRaises(exn, msg=expected) as raised:
                     x = WDL.parse_expr(expr, version=version).infer_type(type_env, stdlib).eval(env, stdlib)
+                if not issubclass(exn, (WDL.Error.SyntaxError, WDL.Error.ValidationError)):
+                    # compiled expression raises the same error
+                    ex = WDL.parse_expr(expr, version=version).infer_type(type_env, stdlib)
+                    with self.assertRaises(exn, msg=expected) as raised2:
+                        ex.compile()(env, stdlib)
+                    self.assertEqual(str(raised2.exception), str(raised.exception), str(expr))
+                    self.assertEqual(getattr(raised2.exception, "pos", None), getattr(raised.exception, "pos", None))
             else:
                 ex = WDL.parse_expr(expr, version=version).infer_type(type_env, stdlib)
                 v = ex.eval(env, stdlib).expect(expected_type)
@@ -121,6 +129,13 @@ class TestEval(unittest.TestCase):
                     self.assertEqual(str(v), expected, str(expr))
                     if ex.literal:
                         self.assertEqual(str(ex.literal), expected)
+                # compiled expression produces the same value
+                for _ in range(2):
+                    v2 = ex.compile()(env, stdlib)
+                    self.assertIs(v2.expr, ex)
+                    v2 = v2.expect(expected_type)
+                    self.assertEqual(str(v2), str(v), str(expr))
+                    self.assertEqual(str(v2.type), str(v.type), str(expr))
 
     def test_logic(self):
         self._test_tuples(
@@ -596,6 +611,73 @@ class TestEval(unittest.TestCase):
             ("<<< \n  \\\n  >>>", '""', "1.1", WDL.Error.SyntaxError),
         )
 
+    def test_compile(self):
+        stdlib = WDL.StdLib.Base("1.1")
+        env = cons_env(("name", WDL.Value.String("sample")), ("i", WDL.Value.Int(7)))
+        type_env = WDL.Env.Bindings().bind("name", WDL.Type.String()).bind("i", WDL.Type.Int())
+        ex = WDL.parse_expr('"~{name}_~{i * 2}.bam"', version="1.1").infer_type(type_env, stdlib)
+        f = ex.compile()
+        self.assertIs(ex.compile(), f)
+        self.assertEqual(f(env, stdlib).value, "sample_14.bam")
+        # the compiled closure isn't pickled, but rebuilt upon use
+        ex2 = pickle.loads(pickle.dumps(ex))
+        self.assertIsNone(ex2._compiled)
+        self.assertEqual(ex2.compile()(env, stdlib).value, "sample_14.bam")
+        # stdlib functions are resolved from whichever stdlib is used
+        class Uppercase(WDL.StdLib.Base):
+            def __init__(self):
+                super().__init__("1.1")
+                self.sub = WDL.StdLib.StaticFunction(
+                    "sub",
+                    [WDL.Type.String()] * 3,
+                    WDL.Type.String(),
+                    lambda s, _p, _r: WDL.Value.String(s.value.upper()),
+                )
+        ex = WDL.parse_expr('sub(name, "s", "S")', version="1.1").infer_type(type_env, stdlib)
+        self.assertEqual(ex.compile()(env, stdlib).value, "Sample")
+        call = stdlib._compiled_calls[id(ex)]
+        upper = Uppercase()
+        for _ in range(2):
+            self.assertEqual(ex.compile()(env, upper).value, "SAMPLE")
+            self.assertEqual(ex.compile()(env, stdlib).value, "Sample")
+        self.assertEqual(ex.compile()(env, upper).value, "SAMPLE")
+        # ...each compiled once, even as the stdlibs alternate
+        self.assertIs(stdlib._compiled_calls[id(ex)], call)
+        self.assertEqual(len(upper._compiled_calls), 1)
+        # and the compiled expression doesn't keep a stdlib alive
+        upper_ref = weakref.ref(upper)
+        del upper
+        gc.collect()
+        self.assertIsNone(upper_ref())
+
+    def test_compile_parity(self):
+        # compiled expressions produce the same values as tree-walking eval()
+        stdlib = WDL.StdLib.Base("1.1")
+        env = WDL.Env.Bindings()
+        env = env.bind("i", WDL.Value.Int(7)).bind("name", WDL.Value.String("sample"))
+        env = env.bind("xs", WDL.Value.Array(WDL.Type.Int(), [WDL.Value.Int(j) for j in range(10)]))
+        for k in range(100):
+            env = env.bind(f"call{k}.out", WDL.Value.Int(k))
+        type_env = WDL.Env.Bindings()
+        for b in env:
+            type_env = type_env.bind(b.name, b.value.type)
+        exprs = [
+            WDL.parse_expr(src, version="1.1").infer_type(type_env, stdlib)
+            for src in [
+                '"~{name}_~{i}.bam"',
+                "if i > 3 && defined(name) then xs[i % 10] * 2 + call5.out else length(xs)",
+                '{"a": i, "b": i + 1}["b"] - (i * 3) / 2',
+                "[i, i + 1, i + 2, call99.out]",
+                'select_first([name, "x"]) + "_" + sub(name, "s", "S")',
+            ]
+        ]
+
+        for _ in range(2):
+            self.assertEqual(
+                [str(ex.compile()(env, stdlib)) for ex in exprs],
+                [str(ex.eval(env, stdlib)) for ex in exprs],
+            )
+
 def cons_env(*bindings):
     b = WDL.Env.Bindings()
     for (x,y) in bindings:
@@ -673,6 +755,84 @@ class TestEnv(unittest.TestCase):
         merged = WDL.Env.merge(car, cdr)
         self.assertEqual(merged.resolve("opt"), 2)
 
+    def test_index(self):
+        # lookup indices must respect shadowing & structural sharing among environments
+        base = WDL.Env.Bindings().bind("x", 1).bind("ns.y", 2)
+        self.assertEqual(base.resolve("x"), 1)
+        e1 = base.bind("x", 3)
+        e2 = base.bind("ns.z", 4)
+        self.assertEqual(e1.resolve("x"), 3)
+        self.assertEqual(e2.resolve("x"), 1)
+        self.assertEqual(base.resolve("x"), 1)
+        self.assertFalse(e1.has_binding("ns.z"))
+        self.assertEqual(len(e1), 2)
+        self.assertEqual(len(e2), 3)
+        self.assertEqual([b.name for b in e2.enter_namespace("ns")], ["z", "y"])
+        self.assertEqual(e1.namespaces, {"ns."})
+        e3 = pickle.loads(pickle.dumps(e2))
+        self.assertIsNone(e3._index)
+        self.assertEqual(e3.resolve("ns.z"), 4)
+
+    def test_index_sharing(self):
+        # interleaved binding & lookup extends the ancestor's index instead of copying it, and
+        # lookups take a few steps down the hash trie instead of a linear scan
+        def trie_nodes(env):
+            ans, nodes = set(), [env._index._root]
+            while nodes:
+                node = nodes.pop()
+                ans.add(id(node))
+                nodes.extend(entry for entry in node.values() if isinstance(entry, dict))
+            return ans
+
+        def lookup_steps(env, name):
+            h, node, steps = hash(name), env._index._root, 1
+            while isinstance(node.get((h >> (5 * (steps - 1))) & 31), dict):
+                node = node[(h >> (5 * (steps - 1))) & 31]
+                steps += 1
+            return steps
+
+        n = 5000
+        env = WDL.Env.Bindings()
+        for i in range(n):
+            env = env.bind(f"call{i % 50}.decl{i}", i)
+            self.assertEqual(env.resolve(f"call{(i // 2) % 50}.decl{i // 2}"), i // 2)
+        self.assertEqual(len(env), n)
+        self.assertLessEqual(max(lookup_steps(env, f"call{i % 50}.decl{i}") for i in range(n)), 6)
+        env2 = env.bind("extra", -1)
+        self.assertEqual(env2.resolve("extra"), -1)
+        self.assertEqual(env2.resolve("call7.decl7"), 7)
+        self.assertIsNone(env.get("extra"))
+        new_nodes = trie_nodes(env2) - trie_nodes(env)
+        self.assertLessEqual(len(new_nodes), 6)
+
+    def test_namespace_index_sharing(self):
+        # interleaved binding & namespace lookup extends the ancestor's namespace index, adding
+        # only the new binding's namespaces, instead of rebuilding it over all the bindings
+        sets = []
+        trie_set = WDL.Env._HashTrie.set
+
+        def counting_set(trie, key, value):
+            sets.append(key)
+            return trie_set(trie, key, value)
+
+        n = 2000
+        env = WDL.Env.Bindings()
+        with patch.object(WDL.Env._HashTrie, "set", counting_set):
+            for i in range(n):
+                env = env.bind(f"call{i % 50}.out.decl{i}", i)
+                self.assertTrue(env.has_namespace(f"call{i % 50}"))
+                self.assertFalse(env.has_namespace(f"call{i % 50}.decl{i}"))
+        self.assertEqual(len(sets), 2 * n)
+        self.assertEqual(len(env.namespaces), 100)
+        self.assertEqual(
+            [(b.name, b.value) for b in env.enter_namespace("call7")],
+            [(f"out.decl{i}", i) for i in range(n - 43, 0, -50)],
+        )
+        # shadowed bindings are excluded
+        env = env.bind("call7.out.decl7", -7)
+        self.assertEqual(env.enter_namespace("call7.out")["decl7"], -7)
+        self.assertEqual(len(env.enter_namespace("call7.out")), n // 50)
+
 
 class TestValue(unittest.TestCase):
     def test_json(self):
@@ -1,4 +1,4 @@
-import unittest, tempfile, os, pickle
+import unittest, tempfile, os, sys, pickle, asyncio, subprocess, concurrent.futures, regex
 from .context import WDL
 
 class TestTasks(unittest.TestCase):
@@ -1849,6 +1849,251 @@ task count_lines {
             WDL.parse_document(bad_doc)
         WDL.parse_document(good_doc).typecheck()
 
+    def test_parallel_parsing(self):
+        # threads parse concurrently, each collecting only its own document's comments
+        def doc_text(i):
+            return "version 1.0\n" + "".join(
+                f"# doc{i} comment{j}\ntask t{j} {{ command {{}} }}\n" for j in range(50)
+            )
+
+        def parse(i):
+            if i % 4 == 3:
+                with self.assertRaises(WDL.Error.SyntaxError):
+                    WDL.parse_document(doc_text(i) + "# doc{i} unterminated\nworkflow {")
+                return None
+            doc = WDL.parse_document(doc_text(i))
+            return [c.text for c in doc.source_comments if c]
+
+        switchinterval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=8) as pool:
+                results = list(pool.map(parse, range(32)))
+        finally:
+            sys.setswitchinterval(switchinterval)
+        for i, comments in enumerate(results):
+            if i % 4 != 3:
+                self.assertEqual(comments, [f"# doc{i} comment{j}" for j in range(50)])
+
+    def test_parser_tables_cache(self):
+        # `import WDL` and the first parse in fresh processes, with cold & warm parser tables cache
+        # (counting how many parsers Lark loaded from the cache rather than constructing)
+        tmpdir = tempfile.mkdtemp(prefix="miniwdl_test_parser_cache_")
+        cache_dir = os.path.join(tmpdir, "parser")
+        script = (
+            "import time, lark; hits = []; load = lark.Lark._load\n"
+            "def _load(self, *args, **kwargs):\n"
+            "    hits.append(1)\n"
+            "    return load(self, *args, **kwargs)\n"
+            "lark.Lark._load = _load\n"
+            "t0 = time.perf_counter(); import WDL; t1 = time.perf_counter()\n"
+            "WDL.parse_document('version 1.1\\nworkflow w {}\\n')\n"
+            "print(len(hits), t1 - t0, time.perf_counter() - t1)\n"
+        )
+
+        def run(cache_dir=None):
+            env = dict(os.environ, XDG_CACHE_HOME=os.path.join(tmpdir, "xdg"))
+            env.pop("MINIWDL_PARSER_CACHE", None)
+            if cache_dir:
+                env["MINIWDL_PARSER_CACHE"] = cache_dir
+            out = subprocess.run(
+                [sys.executable, "-c", script],
+                env=env,
+                cwd=os.path.join(os.path.dirname(__file__), ".."),
+                check=True,
+                stdout=subprocess.PIPE,
+                universal_newlines=True,
+            ).stdout.split()
+            return (int(out[0]), [float(t) for t in out[1:]])
+
+        # disabled by default: nothing written anywhere
+        self.assertEqual(run()[0], 0)
+        self.assertEqual(os.listdir(tmpdir), [])
+
+        cold = run(cache_dir)
+        self.assertEqual(cold[0], 0)
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+        warm = run(cache_dir)
+        self.assertEqual(warm[0], 1)
+        print(f"import WDL + first parse: cold {cold[1]}, warm {warm[1]}")
+
+    def test_load_cache(self):
+        tmpdir = tempfile.mkdtemp(prefix="miniwdl_test_load_cache_")
+        cache_dir = os.path.join(tmpdir, "cache")
+        with open(os.path.join(tmpdir, "lib.wdl"), "w") as outfile:
+            outfile.write("version 1.0\ntask t { command {} output { Int x = 1 } }\n")
+        main_wdl = os.path.join(tmpdir, "main.wdl")
+        with open(main_wdl, "w") as outfile:
+            outfile.write('version 1.0\nimport "lib.wdl"\nworkflow w { call lib.t }\n')
+        reads = []
+
+        async def read_source(uri, path, importer):
+            reads.append(uri)
+            return await WDL.read_source_default(uri, path, importer)
+
+        def load():
+            reads.clear()
+            return WDL.load(main_wdl, read_source=read_source, cache_dir=cache_dir)
+
+        doc = load()
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+        # reloading takes the cached document, after re-reading the source files to validate it
+        doc2 = load()
+        self.assertIsNot(doc2, doc)
+        self.assertEqual(reads, [main_wdl, "lib.wdl"])
+        self.assertEqual(doc2.workflow.body[0].callee.name, "t")
+        self.assertIs(doc2.workflow.body[0].callee, doc2.imports[0].doc.tasks[0])
+        self.assertIs(doc2.workflow.parent, doc2)
+        # changing an import invalidates the entry
+        with open(os.path.join(tmpdir, "lib.wdl"), "w") as outfile:
+            outfile.write("version 1.0\ntask t { command {} output { String x = '1' } }\n")
+        doc3 = load()
+        self.assertEqual(str(doc3.workflow.body[0].callee.outputs[0].type), "String")
+        self.assertEqual(str(load().workflow.body[0].callee.outputs[0].type), "String")
+        # corrupt entries are discarded
+        for fn in os.listdir(cache_dir):
+            with open(os.path.join(cache_dir, fn), "w") as outfile:
+                outfile.write("garbage")
+        self.assertEqual(str(load().workflow.body[0].callee.outputs[0].type), "String")
+        # size bound evicts least-recently-used entries
+        entries = os.listdir(cache_dir)
+        with open(os.path.join(tmpdir, "main2.wdl"), "w") as outfile:
+            outfile.write('version 1.0\nimport "lib.wdl"\nworkflow w2 { call lib.t }\n')
+        WDL.load(os.path.join(tmpdir, "main2.wdl"), cache_dir=cache_dir)
+        self.assertEqual(len(os.listdir(cache_dir)), 2)
+        for fn in entries:
+            os.utime(os.path.join(cache_dir, fn), (0, 0))
+        max_bytes = max(os.path.getsize(os.path.join(cache_dir, fn)) for fn in os.listdir(cache_dir))
+        WDL._load_cache.evict(cache_dir, max_bytes)
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+        self.assertNotIn(os.listdir(cache_dir)[0], entries)
+
+    def test_constant_folding(self):
+        doc = WDL.parse_document(r"""
+        version 1.1
+        task t {
+            input {
+                String prefix = "sample"
+            }
+            String bam = "~{"sample"}.bam"
+            Int mem_mb = 3 * 1024
+            Array[Pair[String,Int]] settings = zip(["a", "b"], [1, 2])
+            String out = prefix + ".bam"
+            String content = read_string("in.txt")
+            File f = "~{"in"}.txt"
+            Int bad = [1][2]
+            command <<<
+                echo ~{3 * 1024} ~{prefix}
+            >>>
+            runtime {
+                memory: "~{mem_mb} MiB"
+                cpu: 2 + 2
+            }
+        }
+        """)
+        doc.typecheck()
+        task = doc.tasks[0]
+        decls = {decl.name: decl.expr for decl in task.inputs + task.postinputs}
+        self.assertEqual(decls["prefix"].literal.value, "sample")
+        self.assertEqual(decls["bam"].literal.value, "sample.bam")
+        self.assertEqual(decls["mem_mb"].literal.value, 3072)
+        self.assertEqual(
+            decls["settings"].literal.json, [{"left": "a", "right": 1}, {"left": "b", "right": 2}]
+        )
+        # not constant: identifiers, file I/O, and errors left for runtime
+        self.assertIsNone(decls["out"].literal)
+        self.assertIsNone(decls["content"].literal)
+        self.assertEqual(decls["f"].literal.value, "in.txt")
+        self.assertIsNone(decls["bad"].literal)
+        with self.assertRaises(WDL.Error.EvalError):
+            decls["bad"].eval(WDL.Env.Bindings(), WDL.StdLib.Base("1.1"))
+        self.assertIsNone(task.runtime["memory"].literal)
+        self.assertEqual(task.runtime["cpu"].literal.value, 4)
+        # command placeholders remain subject to placeholder_regex, but their contents are folded
+        placeholder = next(p for p in task.command.parts if isinstance(p, WDL.Expr.Placeholder))
+        self.assertIsNone(placeholder.literal)
+        self.assertEqual(placeholder.expr.literal.value, 3072)
+        # evaluation reuses the folded values
+        stdlib = WDL.StdLib.Base("1.1")
+        for expr in (decls["mem_mb"], task.runtime["cpu"]):
+            v = expr.eval(WDL.Env.Bindings(), stdlib)
+            self.assertIs(v, expr.literal)
+            self.assertIs(v.expr, expr)
+            self.assertIs(expr.compile()(WDL.Env.Bindings(), stdlib), v)
+        env = WDL.Env.Bindings().bind("prefix", WDL.Value.String("x"))
+        self.assertEqual(decls["out"].compile()(env, stdlib).value, "x.bam")
+        regex_stdlib = WDL.StdLib.Base(
+            "1.1", eval_context=WDL.StdLib.EvalContext(placeholder_regex=regex.compile("[a-z]*"))
+        )
+        with self.assertRaises(WDL.Error.InputError):
+            placeholder.eval(env, regex_stdlib)
+        # folded values survive pickling
+        task2 = pickle.loads(pickle.dumps(task))
+        self.assertEqual(task2.runtime["cpu"].literal.value, 4)
+
+    def test_concurrent_imports(self):
+        sources = {
+            "main.wdl": 'version 1.0\nimport "a.wdl"\nimport "b.wdl"\nworkflow w { call a.ta call b.tb }\n',
+            "a.wdl": 'version 1.0\nimport "structs.wdl"\ntask ta { input { S? s } command {} }\n',
+            "b.wdl": 'version 1.0\nimport "structs.wdl"\ntask tb { input { S? s } command {} }\n',
+            "structs.wdl": "version 1.0\nstruct S { Int x }\n",
+        }
+        reads = []
+        active = [0, 0]
+
+        async def read_source(uri, path, importer):
+            reads.append(uri)
+            active[0] += 1
+            active[1] = max(active[0], active[1])
+            await asyncio.sleep(0.1)
+            active[0] -= 1
+            return WDL.ReadSourceResult(source_text=sources[uri], abspath="/" + uri)
+
+        doc = WDL.load("main.wdl", read_source=read_source)
+        # a.wdl and b.wdl were read concurrently
+        self.assertEqual(active[1], 2)
+        # structs.wdl was read by both importers, but loaded (parsed & typechecked) once
+        self.assertEqual(sorted(reads), ["a.wdl", "b.wdl", "main.wdl", "structs.wdl", "structs.wdl"])
+        self.assertIs(doc.imports[0].doc.imports[0].doc, doc.imports[1].doc.imports[0].doc)
+        # walkers visit the shared document once
+        from WDL import Lint
+
+        Lint.lint(doc)
+        self.assertEqual(len(Lint.collect(doc)), len(set(Lint.collect(doc))))
+        seen = []
+
+        class DocCollector(WDL.Walker.Base):
+            def document(self, obj):
+                seen.append(obj.pos.abspath)
+                super().document(obj)
+
+        DocCollector()(doc)
+        self.assertEqual(sorted(seen), ["/a.wdl", "/b.wdl", "/main.wdl", "/structs.wdl"])
+        # the shared document's parent is its first importer
+        self.assertIs(doc.imports[1].doc.imports[0].doc.parent, doc.imports[0].doc)
+
+        # a document may import the same document more than once
+        sources["a.wdl"] = (
+            'version 1.0\nimport "structs.wdl" as s1\nimport "structs.wdl" as s2\n'
+            "task ta { input { S? s } command {} }\n"
+        )
+        doc = WDL.load("main.wdl", read_source=read_source)
+        self.assertIs(doc.imports[0].doc.imports[0].doc, doc.imports[0].doc.imports[1].doc)
+
+        # circular imports are detected regardless of import_max_depth, including a cycle between
+        # documents first reached by different paths (main => a, main => b => a => b)
+        sources["a.wdl"] = 'version 1.0\nimport "b.wdl"\ntask ta { command {} }\n'
+        sources["b.wdl"] = 'version 1.0\nimport "a.wdl"\ntask tb { command {} }\n'
+        with self.assertRaises(WDL.Error.ImportError) as ctx:
+            WDL.load("main.wdl", read_source=read_source, import_max_depth=1000)
+        exn = ctx.exception
+        while exn.__cause__:
+            exn = exn.__cause__
+        self.assertIn("circular import", str(exn))
+        sources["main.wdl"] = 'version 1.0\nimport "main.wdl"\nworkflow w {}\n'
+        with self.assertRaisesRegex(WDL.Error.ImportError, "circular import"):
+            WDL.load("main.wdl", read_source=read_source, import_max_depth=1000)
+
 class TestCycleDetection(unittest.TestCase):
     def test_task(self):
         doc = r"""
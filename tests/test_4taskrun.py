@@ -9,6 +9,8 @@ import time
 import json
 import platform
 import multiprocessing
+import threading
+import contextlib
 from .context import WDL
 from WDL.runtime.backend.cli_subprocess import SubprocessBase
 from WDL.runtime.task_container import TaskContainer
@@ -1624,6 +1626,54 @@ class TestTaskContainerRetryPaths(unittest.TestCase):
             container.reset(self._logger)
             self.assertTrue(container._bind_input_files)
 
+    def test_subprocess_consolidated_input_mounts(self):
+        self._cfg.override({"file_io": {"consolidate_input_mounts": 3}})
+        host_paths = []
+        for i in range(5):
+            os.makedirs(os.path.join(self._dir, "shards", f"call-{i}", "work"))
+            host_paths.append(os.path.join(self._dir, "shards", f"call-{i}", "work", "out.txt"))
+            with open(host_paths[-1], "w") as outfile:
+                outfile.write(f"{i}\n")
+        container = self.SubprocessContainerForTest(
+            self._cfg, "test-run", os.path.join(self._dir, "run")
+        )
+        container.add_paths(host_paths + [self._input_dir + "/"])
+
+        mounts = container.prepare_mounts()
+        input_mounts = [m for m in mounts if "_miniwdl_input_dirs" in m[0]]
+        self.assertEqual(len(mounts), 4 + len(input_mounts))
+        self.assertEqual(input_mounts, [
+            (
+                os.path.join(container.container_dir, "_miniwdl_input_dirs", "0"),
+                os.path.realpath(self._dir),
+                False,
+            )
+        ])
+        # each input's usual container path holds a symlink into the consolidated mount
+        for host_path in host_paths + [self._input_dir + "/"]:
+            container_path = container.input_path_map[host_path]
+            link = container.host_work_path(container_path.rstrip("/"))
+            target = os.readlink(link)
+            self.assertTrue(target.startswith(input_mounts[0][0] + "/"))
+            self.assertEqual(
+                os.path.join(input_mounts[0][1], os.path.relpath(target, input_mounts[0][0])),
+                os.path.realpath(host_path.rstrip("/")),
+            )
+        # preparing the mounts again reuses the symlinks
+        self.assertEqual(container.prepare_input_mounts(), container.prepare_input_mounts())
+
+        # without an input in their common ancestor, each directory with inputs is mounted
+        # separately, instead of that broader ancestor
+        container = self.SubprocessContainerForTest(
+            self._cfg, "test-run2", os.path.join(self._dir, "run2")
+        )
+        container.add_paths(host_paths)
+        input_mounts = [m for m in container.prepare_mounts() if "_miniwdl_input_dirs" in m[0]]
+        self.assertEqual(
+            sorted(m[1] for m in input_mounts),
+            sorted(os.path.realpath(os.path.dirname(p)) for p in host_paths),
+        )
+
     def test_swarm_reset_restores_input_binds(self):
         from WDL.runtime.backend.docker_swarm import SwarmContainer
 
@@ -1698,3 +1748,187 @@ class TestSwarmMiscConfigUidGid(unittest.TestCase):
                 _resources, user, groups = container.misc_config(logger)
                 self.assertIsNone(user)
                 self.assertEqual(groups, ["0"])
+
+
+class TestSwarmWatcher(unittest.TestCase):
+    """Test the process-wide docker service watcher with a fake dockerd client."""
+
+    class FakeAPI:
+        def __init__(self):
+            self.task_states = {}
+            self.requests = 0
+            self.errors = []
+            self.bad_service = None
+
+        def tasks(self, filters=None):
+            self.requests += 1
+            if self.errors:
+                raise self.errors.pop(0)
+            if self.bad_service in filters["service"]:
+                raise WDL.runtime.backend.docker_swarm.docker.errors.NotFound("no such service")
+            return [
+                {"ServiceID": svc_id, "Status": {"State": state}}
+                for svc_id, state in self.task_states.items()
+                if svc_id in filters["service"]
+            ]
+
+    class FakeClient:
+        def __init__(self):
+            import queue
+
+            self.api = TestSwarmWatcher.FakeAPI()
+            self.event_queue = queue.Queue()
+
+        def events(self, **kwargs):
+            while True:
+                yield self.event_queue.get()
+
+        def close(self):
+            pass
+
+    def test_sweep_and_events(self):
+        from unittest.mock import patch
+        from WDL.runtime.backend.docker_swarm import _SwarmWatcher
+        from WDL.runtime._event_loop import run_sync
+
+        client = self.FakeClient()
+        with patch("docker.from_env", return_value=client):
+            watcher = _SwarmWatcher(logging.getLogger(self.id()), 3600.0)
+        n = 250
+        for i in range(n):
+            client.api.task_states[f"svc{i}"] = "pending"
+        with contextlib.ExitStack() as stack:
+            watches = [stack.enter_context(watcher.watch(f"svc{i}")) for i in range(n)]
+            # registration triggers prompt sweeps of the new services, in batched requests
+            for w in watches:
+                run_sync(w.wait(10.0))
+                self.assertEqual(w.tasks()[0]["Status"]["State"], "pending")
+            self.assertLess(client.api.requests, n / 10)
+            requests = client.api.requests
+
+            # a container event expedites a sweep of the affected service only
+            client.api.task_states["svc42"] = "complete"
+            client.event_queue.put(
+                {"Action": "die", "Actor": {"Attributes": {"com.docker.swarm.service.id": "svc42"}}}
+            )
+            t0 = time.time()
+            run_sync(watches[42].wait(10.0))
+            self.assertLess(time.time() - t0, 5.0)
+            self.assertEqual(watches[42].tasks()[0]["Status"]["State"], "complete")
+            self.assertEqual(client.api.requests, requests + 1)
+        watcher.close()
+
+    def test_sweep_errors(self):
+        from unittest.mock import patch
+        import requests
+        from WDL.runtime.backend.docker_swarm import _SwarmWatcher, docker
+        from WDL.runtime._event_loop import run_sync
+
+        def server_error():
+            response = requests.Response()
+            response.status_code = 500
+            return docker.errors.APIError("dockerd hiccup", response=response)
+
+        client = self.FakeClient()
+        with patch("docker.from_env", return_value=client):
+            watcher = _SwarmWatcher(logging.getLogger(self.id()), 0.2, server_error_retries=2)
+        for i in range(3):
+            client.api.task_states[f"svc{i}"] = "running"
+        with contextlib.ExitStack() as stack:
+            # a transient error is retried by the next sweep instead of failing the tasks
+            client.api.errors = [server_error()]
+            watches = [stack.enter_context(watcher.watch(f"svc{i}")) for i in range(3)]
+            for w in watches:
+                run_sync(w.wait(10.0))
+                self.assertEqual(w.tasks()[0]["Status"]["State"], "running")
+            self.assertGreaterEqual(client.api.requests, 2)
+            # a persistent one is delivered, after server_error_retries
+            client.api.errors = [server_error() for _ in range(3)]
+            client.api.task_states["svc0"] = "complete"
+            for w in watches:
+                run_sync(w.wait(10.0))
+                with self.assertRaises(docker.errors.APIError):
+                    w.tasks()
+            run_sync(watches[0].wait(10.0))
+            self.assertEqual(watches[0].tasks()[0]["Status"]["State"], "complete")
+            # a service-specific error fails only that service
+            client.api.bad_service = "svc1"
+            client.api.task_states["svc2"] = "complete"
+            run_sync(watches[1].wait(10.0))
+            with self.assertRaises(docker.errors.NotFound):
+                watches[1].tasks()
+            run_sync(watches[2].wait(10.0))
+            self.assertEqual(watches[2].tasks()[0]["Status"]["State"], "complete")
+        # close() stops the sweep thread
+        watcher.close()
+        time.sleep(0.5)
+        requests_after_close = client.api.requests
+        time.sleep(0.5)
+        self.assertEqual(client.api.requests, requests_after_close)
+
+
+class TestSubprocessScheduler(unittest.TestCase):
+    def setUp(self):
+        from WDL.runtime.backend.cli_subprocess import _SubprocessScheduler
+
+        self.Scheduler = _SubprocessScheduler
+        self.Scheduler.global_init({"cpu": 4, "mem_bytes": 16}, aging_seconds=3600.0)
+
+    def _enter(self, scheduler, admitted):
+        def run():
+            scheduler.__enter__()
+            admitted.append(scheduler)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def _wait_queued(self, n):
+        for _ in range(100):
+            if self.Scheduler.stats()["queued"] == n:
+                return
+            time.sleep(0.05)
+        self.assertEqual(self.Scheduler.stats()["queued"], n)
+
+    def test_backfill(self):
+        admitted = []
+        running = self.Scheduler(3, 8)
+        running.__enter__()
+        # the big reservation doesn't fit yet, but the small one behind it does
+        big = self.Scheduler(4, 4)
+        small = self.Scheduler(1, 8)
+        big_thread = self._enter(big, admitted)
+        self._wait_queued(1)
+        self._enter(small, admitted).join(5)
+        self.assertEqual(admitted, [small])
+        self._wait_queued(1)
+        # once both exit, the big reservation is admitted
+        running.__exit__()
+        small.__exit__()
+        big_thread.join(5)
+        big.__exit__()
+        self.assertEqual(admitted, [small, big])
+        stats = self.Scheduler.stats()
+        self.assertEqual(stats["admitted"], 3)
+        self.assertGreater(stats["max_seconds_waited"], 0.0)
+
+    def test_aging(self):
+        self.Scheduler.global_init({"cpu": 4, "mem_bytes": 16}, aging_seconds=0.0)
+        admitted = []
+        running = self.Scheduler(3, 8)
+        running.__enter__()
+        big = self.Scheduler(4, 4)
+        small = self.Scheduler(1, 8)
+        big_thread = self._enter(big, admitted)
+        self._wait_queued(1)
+        # no backfilling around the (immediately) aged big reservation
+        small_thread = self._enter(small, admitted)
+        self._wait_queued(2)
+        self.assertEqual(admitted, [])
+        running.__exit__()
+        big_thread.join(5)
+        self._wait_queued(1)
+        big.__exit__()
+        small_thread.join(5)
+        small.__exit__()
+        self.assertEqual(admitted, [big, small])
@@ -82,6 +82,75 @@ class TestStdLib(unittest.TestCase):
         parsed = WDL.StdLib._parse_tsv("a\tb\n\nc\td\n")
         self.assertEqual(parsed.json, [["a", "b"], [""], ["c", "d"]])
 
+    def test_mapped_lines(self):
+        for text in (
+            "",
+            "\n",
+            "a",
+            "a\n",
+            "a\n\n",
+            "a\r\nb\r\n",
+            "a\rb\r",
+            "a\r\r\nb\r\r",
+            "x\ty\n\nzé\t\n",
+        ):
+            fn = os.path.join(self._dir, "lines.txt")
+            with open(fn, "w", newline="") as outfile:
+                outfile.write(text)
+            with open(fn) as infile:
+                expected = WDL.StdLib._parse_tsv(infile.read()).json
+            self.assertEqual(
+                WDL.StdLib._parse_tsv(WDL.StdLib._mapped_lines(fn)).json, expected, repr(text)
+            )
+        # lines spanning the mapped blocks
+        lines = ["x" * i for i in range(2000)]
+        with open(fn, "w") as outfile:
+            outfile.write("\n".join(lines))
+        block_bytes = WDL.StdLib._MAPPED_BLOCK_BYTES
+        try:
+            WDL.StdLib._MAPPED_BLOCK_BYTES = 1000
+            self.assertEqual(list(WDL.StdLib._mapped_lines(fn)), lines)
+        finally:
+            WDL.StdLib._MAPPED_BLOCK_BYTES = block_bytes
+
+    def test_read_max_bytes(self):
+        cfg = WDL.runtime.config.Loader(logging.getLogger(self.id()), [])
+        cfg.override({"file_io": {"read_max_gb": 1e-6}})
+        doc = WDL.parse_document(
+            R"""
+            version 1.0
+            workflow w {
+                input {
+                    File small
+                    File big
+                }
+                output {
+                    Array[String] lines = read_lines(small)
+                    Array[Array[String]] rows = read_tsv(big)
+                }
+            }
+            """
+        )
+        doc.typecheck()
+        small = os.path.join(self._dir, "small.txt")
+        big = os.path.join(self._dir, "big.txt")
+        with open(small, "w") as outfile:
+            outfile.write("a\nb\n")
+        with open(big, "w") as outfile:
+            outfile.write("a\tb\n" * 1000)
+        state = WDL.runtime._workflow_state.StateMachine(
+            self.id(), self._dir, doc.workflow, WDL.Env.Bindings()
+        )
+        state.fspath_allowlist.update([small, big])
+        stdlib = WDL.runtime._stdlib.WorkflowStdLib(cfg, "1.0", state, None)
+        outputs = {o.name: o.expr for o in doc.workflow.outputs}
+        env = WDL.Env.Bindings().bind("small", WDL.Value.File(small)).bind(
+            "big", WDL.Value.File(big)
+        )
+        self.assertEqual(outputs["lines"].eval(env, stdlib).json, ["a", "b"])
+        with self.assertRaisesRegex(WDL.Error.InputError, "exceeds the limit"):
+            outputs["rows"].eval(env, stdlib)
+
     def test_parse_tsv_objects(self):
         parsed = WDL.StdLib._parse_tsv_objects("name\tlane\nAlice\t3\nBob\t4\n")
         self.assertEqual(
@@ -4,6 +4,16 @@ import tempfile
 import os
 import time
 import sys
+import queue
+import hashlib
+import json
+import glob
+import base64
+import threading
+import http.server
+import contextlib
+from contextlib import ExitStack
+from concurrent import futures
 from unittest.mock import patch
 import pytest
 from .context import WDL
@@ -32,11 +42,111 @@ class TestWorkflowState(unittest.TestCase):
         state.running = set()
         state.waiting = _CountingSet(state.jobs)
         state.runnable = []
+        state._unmet_dependencies = {}
+        state._dependents = {}
+        state._ready = set(state.jobs)
+        state._priorities = {}
         state._do_job = lambda cfg, stdlib, job: state.CallInstructions(job.id, None, None)
 
         self.assertEqual(state.step(None, None).id, "call-a")
         self.assertEqual(state.step(None, None).id, "call-b")
-        self.assertEqual(state.waiting.iterations, 1)
+        self.assertEqual(state.waiting.iterations, 0)
+
+    def test_dependents_scheduled_incrementally(self):
+        doc = WDL.parse_document(
+            """
+            version 1.0
+            workflow main {
+                scatter (i in range(12)) {
+                    call nop as first { input: i = i }
+                    call nop as second { input: i = first.out }
+                }
+            }
+            task nop {
+                input { Int i }
+                command {}
+                output { Int out = i }
+            }
+            """
+        )
+        doc.typecheck()
+        logger = logging.getLogger(self.id())
+        cfg = WDL.runtime.config.Loader(logger, [])
+        state = WDL.runtime._workflow_state.StateMachine(
+            self.id(), "/tmp", doc.workflow, WDL.Env.Bindings()
+        )
+        state.waiting = _CountingSet(state.waiting)
+        stdlib = WDL.runtime._stdlib.WorkflowStdLib(cfg, "1.0", state, None)
+
+        launched = []
+        while state.outputs is None:
+            calls = []
+            while True:
+                call = state.step(cfg, stdlib)
+                if call is None:
+                    break
+                calls.append(call)
+            launched.append([call.id for call in calls])
+            # finish the calls in reverse order, to check that launch order remains sorted
+            for call in reversed(calls):
+                state.call_finished(
+                    call.id, WDL.Env.Bindings().bind("out", call.inputs["i"])
+                )
+
+        self.assertEqual(state.waiting.iterations, 0)
+        self.assertEqual(launched[0], [f"call-first-{i:02d}" for i in range(12)])
+        self.assertEqual(launched[1], [f"call-second-{i:02d}" for i in range(12)])
+        self.assertEqual(
+            [v.value for v in state.outputs["second.out"].value], list(range(12))
+        )
+
+    def test_critical_path_priority(self):
+        doc = WDL.parse_document(
+            """
+            version 1.0
+            workflow main {
+                call fast as z1
+                call fast as z2 { input: i = z1.out }
+                call fast as z3 { input: i = z2.out }
+                call fast as a
+                call slow
+            }
+            task fast {
+                input { Int i = 0 }
+                command {}
+                output { Int out = i }
+            }
+            task slow {
+                command {}
+            }
+            """
+        )
+        doc.typecheck()
+        cfg = WDL.runtime.config.Loader(logging.getLogger(self.id()), [])
+
+        def launch_order(task_runtime):
+            state = WDL.runtime._workflow_state.StateMachine(
+                self.id(),
+                "/tmp",
+                doc.workflow,
+                WDL.Env.Bindings(),
+                WDL.runtime._workflow_state.critical_paths(doc.workflow, task_runtime),
+            )
+            stdlib = WDL.runtime._stdlib.WorkflowStdLib(cfg, "1.0", state, None)
+            ans = []
+            call = state.step(cfg, stdlib)
+            while call:
+                ans.append(call.id)
+                call = state.step(cfg, stdlib)
+            return ans
+
+        # without history, the head of the longest chain goes first, then by ID
+        self.assertEqual(launch_order(lambda task: None), ["call-z1", "call-a", "call-slow"])
+        # historical runtimes outweigh the chain
+        self.assertEqual(
+            launch_order(lambda task: {"fast": 1.0, "slow": 100.0}[task.name]),
+            ["call-slow", "call-z1", "call-a"],
+        )
 
     def test_disabled_log_payloads_lazy(self):
         doc = WDL.parse_document(
@@ -354,6 +464,123 @@ class TestWorkflowRunner(unittest.TestCase):
             )
         self.assertEqual(outputs["ys"], [1, 2, 3, 4])
 
+    def test_inline_subworkflows(self):
+        with open(os.path.join(self._dir, "inner.wdl"), "w") as outfile:
+            outfile.write(
+                """
+                version 1.0
+                workflow inner {
+                    input { Int x }
+                    output { Int y = x * 2 }
+                }
+                """
+            )
+        with open(os.path.join(self._dir, "outer.wdl"), "w") as outfile:
+            outfile.write(
+                """
+                version 1.0
+                import "inner.wdl" as lib
+                workflow outer {
+                    input { Int x }
+                    scatter (j in range(3)) {
+                        call lib.inner { input: x = x + j }
+                    }
+                    output { Array[Int] ys = inner.y }
+                }
+                """
+            )
+        wdl = """
+            version 1.0
+            import "outer.wdl" as lib
+            workflow main {
+                input { Int n = 20 }
+                scatter (i in range(n)) {
+                    call lib.outer { input: x = 10 * i }
+                }
+                output { Array[Array[Int]] yss = outer.ys }
+            }
+            """
+        expected = [[20 * i + 2 * j for j in range(3)] for i in range(20)]
+        cfg = WDL.runtime.config.Loader(logging.getLogger(self.id()), [])
+        cfg.override({"scheduler": {"inline_subworkflows": True, "subworkflow_concurrency": 1}})
+        threads = set()
+        original_run_local_workflow = WDL.runtime.workflow._run_local_workflow
+
+        cache_get_threads = []
+        original_cache_get = WDL.runtime.cache.CallCache.get
+
+        def run_local_workflow(*args, **kwargs):
+            threads.add(threading.get_ident())
+            return original_run_local_workflow(*args, **kwargs)
+
+        def cache_get(*args, **kwargs):
+            cache_get_threads.append(threading.get_ident())
+            return original_cache_get(*args, **kwargs)
+
+        with patch.object(
+            WDL.runtime.workflow._ThreadPools,
+            "submit_subworkflow",
+            side_effect=AssertionError("inline subworkflow submitted to thread pool"),
+        ), patch("WDL.runtime.workflow._run_local_workflow", run_local_workflow), patch.object(
+            WDL.runtime.cache.CallCache, "get", cache_get
+        ):
+            outputs = self._test_workflow(wdl, cfg=cfg)
+        self.assertEqual(outputs["yss"], expected)
+        # one workflow, 20 outer & 60 inner subworkflows, all stepped by the one thread
+        self.assertEqual(threads, {threading.get_ident()})
+        # which queried the call cache only for the top-level workflow, offloading the
+        # subworkflows' queries
+        self.assertEqual(len(cache_get_threads), 81)
+        self.assertEqual(cache_get_threads.count(threading.get_ident()), 1)
+
+        # failure of one nested inline subworkflow fails the whole run
+        with open(os.path.join(self._dir, "inner.wdl"), "w") as outfile:
+            outfile.write(
+                """
+                version 1.0
+                workflow inner {
+                    input { Int x }
+                    output { Int y = 100 / (x - 31) }
+                }
+                """
+            )
+        exn = self._test_workflow(wdl, cfg=cfg, expected_exception=WDL.Error.EvalError)
+        self.assertIn("by zero", str(exn))
+
+    def test_offload(self):
+        # two frames on one driver: the first offloads an operation blocking until the second has
+        # run, which would deadlock if it blocked the driver's thread. A future sent to the first
+        # frame meanwhile is redelivered once the operation completes.
+        cfg = WDL.runtime.config.Loader(logging.getLogger(self.id()), [])
+        driver = WDL.runtime.workflow._WorkflowDriver()
+        ran = threading.Event()
+        other: futures.Future = futures.Future()
+
+        def first(notify):
+            other.add_done_callback(notify)
+            ans = yield from WDL.runtime.workflow._offload(thread_pools, notify, ran.wait, 10)
+            sent = yield
+            return (ans, sent)
+
+        def second(notify):
+            other.set_result(None)
+            ran.set()
+            return ("second", None)
+            yield
+
+        with ExitStack() as cleanup:
+            thread_pools = WDL.runtime.workflow._ThreadPools(
+                cfg, cleanup, logging.getLogger(self.id())
+            )
+
+            def main(notify):
+                future = driver.start(first)
+                driver.start(second)
+                future.add_done_callback(notify)
+                return (yield)
+
+            self.assertEqual(driver.run(main).result(), (True, other))
+
     def test_workflow_stdlib_reuse(self):
         with open(os.path.join(self._dir, "sub.wdl"), "w") as outfile:
             outfile.write(
@@ -370,8 +597,8 @@ class TestWorkflowRunner(unittest.TestCase):
         original_stdlib = WDL.runtime.workflow.WorkflowStdLib
 
         class CountingWorkflowStdLib(original_stdlib):
-            def __init__(self, cfg, wdl_version, state, cache):
-                super().__init__(cfg, wdl_version, state, cache)
+            def __init__(self, cfg, wdl_version, state, cache, **kwargs):
+                super().__init__(cfg, wdl_version, state, cache, **kwargs)
                 instances.append((state.workflow.name, state, self._write_dir))
 
         wdl = """
@@ -1073,6 +1300,80 @@ class TestWorkflowRunner(unittest.TestCase):
         self.assertEqual(outputs["messages"], ["Hello, Alyssa!", "Hello, Ben!"])
         self.assertEqual(outputs["who2"], ["Alyssa", "Ben"])
 
+    def test_read_memo(self):
+        manifest = os.path.join(self._dir, "manifest.tsv")
+        with open(manifest, "w") as outfile:
+            outfile.write("a\t1\nb\t2\n")
+        with open(os.path.join(self._dir, "sub.wdl"), "w") as outfile:
+            outfile.write(
+                """
+                version 1.0
+                workflow sub {
+                    input {
+                        File manifest
+                        Int i
+                    }
+                    output { String name = read_tsv(manifest)[i][0] }
+                }
+                """
+            )
+        wdl = """
+            version 1.0
+            import "sub.wdl" as lib
+            workflow main {
+                input { File manifest }
+                scatter (i in range(4)) {
+                    Int j = i % 2
+                    String value = read_tsv(manifest)[j][1]
+                    call lib.sub { input: manifest = manifest, i = j }
+                }
+                output {
+                    Array[String] values = value
+                    Array[String] names = sub.name
+                    Array[String] lines = read_lines(manifest)
+                }
+            }
+            """
+        parses = []
+        original_parse_tsv = WDL.StdLib._parse_tsv
+
+        def parse_tsv(*args, **kwargs):
+            parses.append(None)
+            return original_parse_tsv(*args, **kwargs)
+
+        with patch("WDL.StdLib._parse_tsv", parse_tsv), patch.object(
+            WDL.runtime._stdlib.ReadMemo, "log_stats", autospec=True
+        ) as log_stats:
+            outputs = self._test_workflow(wdl, {"manifest": manifest})
+        self.assertEqual(
+            outputs,
+            {
+                "values": ["1", "2", "1", "2"],
+                "names": ["a", "b", "a", "b"],
+                "lines": ["a\t1", "b\t2"],
+            },
+        )
+        # parsed once among the scatter shards & subworkflows
+        self.assertEqual(len(parses), 1)
+        memo = log_stats.call_args[0][0]
+        self.assertEqual((memo.hits, memo.misses), (7, 2))
+        # the memoized values weren't modified by evaluation of the callers' copies
+        stack = [value for value, _size in memo._entries.values()]
+        self.assertEqual(len(stack), 2)
+        while stack:
+            value = stack.pop()
+            self.assertIsNone(value.expr)
+            stack.extend(value.children)
+
+        # disabled
+        parses.clear()
+        cfg = WDL.runtime.config.Loader(logging.getLogger(self.id()), [])
+        cfg.override({"file_io": {"read_memo_mb": 0}})
+        with patch("WDL.StdLib._parse_tsv", parse_tsv):
+            outputs = self._test_workflow(wdl, {"manifest": manifest}, cfg=cfg)
+        self.assertEqual(outputs["names"], ["a", "b", "a", "b"])
+        self.assertEqual(len(parses), 8)
+
     def test_index_file_localization(self):
         # from a data file we call a task to generate an index file; and in a subsequent task
         # expect both files to be localized in the same working directory, even though they'll be
@@ -1260,6 +1561,166 @@ class TestWorkflowRunner(unittest.TestCase):
         test_time = round(end - start)
         assert test_time < 30
 
+    def test_event_loop(self):
+        wdl = """
+            version 1.0
+            workflow w {
+                input { Int fail = -1 }
+                scatter (i in range(12)) {
+                    call t { input: i = i, fail = fail }
+                }
+                output { Array[Int] outs = t.out }
+            }
+            task t {
+                input {
+                    Int i
+                    Int fail
+                }
+                command <<<
+                    if [ ~{i} -eq ~{fail} ]; then exit 1; fi
+                    sleep 5
+                    echo $(( ~{i} * 2 ))
+                >>>
+                output { Int out = read_int(stdout()) }
+            }
+            """
+        cfg = WDL.runtime.config.Loader(logging.getLogger(self.id()), [])
+        cfg.override(
+            {"scheduler": {"event_loop": True, "task_concurrency": 12, "blocking_concurrency": 2}}
+        )
+        running = [0, 0]  # current, peak
+        original_run_local_task_async = WDL.runtime.workflow.run_local_task_async
+
+        async def run_local_task_async(*args, **kwargs):
+            running[0] += 1
+            running[1] = max(running)
+            try:
+                return await original_run_local_task_async(*args, **kwargs)
+            finally:
+                running[0] -= 1
+
+        # threads on which the container CLI log streams are opened & closed
+        log_threads = set()
+        original_pygtail_logger = WDL.runtime.backend.cli_subprocess.PygtailLogger
+
+        @contextlib.contextmanager
+        def pygtail_logger(*args, **kwargs):
+            log_threads.add(threading.current_thread().name)
+            with original_pygtail_logger(*args, **kwargs) as poll:
+                yield poll
+            log_threads.add(threading.current_thread().name)
+
+        with patch.object(
+            WDL.runtime.workflow._ThreadPools,
+            "submit_task",
+            side_effect=AssertionError("task submitted to thread pool"),
+        ), patch("WDL.runtime.workflow.run_local_task_async", run_local_task_async), patch(
+            "WDL.runtime.backend.cli_subprocess.PygtailLogger", pygtail_logger
+        ):
+            outputs = self._test_workflow(wdl, cfg=cfg)
+        self.assertEqual(outputs["outs"], [2 * i for i in range(12)])
+        # all twelve tasks waited for their containers concurrently, despite only two threads
+        # for blocking work
+        self.assertEqual(running, [0, 12])
+        self.assertTrue(log_threads)
+        self.assertNotIn("miniwdl_event_loop", log_threads)
+
+        exn = self._test_workflow(
+            wdl, {"fail": 3}, cfg=cfg, expected_exception=WDL.runtime.CommandFailed
+        )
+        self.assertEqual(exn.exit_status, 1)
+
+    def test_event_loop_enter_context(self):
+        # a blocking context manager is entered and exited off the event loop thread
+        import asyncio
+        import contextlib
+        from WDL.runtime import _event_loop
+
+        threads = []
+
+        @contextlib.contextmanager
+        def blocking():
+            threads.append(threading.current_thread().name)
+            yield 42
+            threads.append(threading.current_thread().name)
+
+        async def run():
+            async with contextlib.AsyncExitStack() as stack:
+                ans = await _event_loop.enter_context(stack, blocking())
+                threads.append(threading.current_thread().name)
+            return ans
+
+        _event_loop.start(2)
+        self.assertEqual(_event_loop.submit(run).result(10), 42)
+        self.assertEqual(threads[1], "miniwdl_event_loop")
+        self.assertTrue(threads[0].startswith("miniwdl_blocking"))
+        self.assertTrue(threads[2].startswith("miniwdl_blocking"))
+        # and without the event loop, on the calling thread
+        threads.clear()
+        self.assertEqual(_event_loop.run_sync(run()), 42)
+        self.assertEqual(threads, [threading.current_thread().name] * 3)
+
+    def test_resume(self):
+        wdl = """
+            version 1.0
+            workflow w {
+                input { File flag }
+                scatter (i in range(4)) {
+                    call t { input: i = i, flag = flag }
+                }
+                output { Array[Int] outs = t.out }
+            }
+            task t {
+                input {
+                    Int i
+                    File flag
+                }
+                command <<<
+                    if [ ~{i} -eq 2 ]; then
+                        sleep 3
+                        if grep -q fail "~{flag}"; then exit 1; fi
+                    fi
+                    echo $(( ~{i} * 2 ))
+                >>>
+                output { Int out = read_int(stdout()) }
+            }
+            """
+        with open(os.path.join(self._dir, "w.wdl"), "w") as outfile:
+            outfile.write(wdl)
+        flag = os.path.join(self._dir, "flag.txt")
+        with open(flag, "w") as outfile:
+            print("fail", file=outfile)
+        doc = WDL.load(os.path.join(self._dir, "w.wdl"))
+        inputs = WDL.values_from_json({"flag": flag}, doc.workflow.available_inputs)
+        cfg = WDL.runtime.config.Loader(logging.getLogger(self.id()), [])
+        cfg.override({"scheduler": {"checkpoint_period_seconds": 0.01}})
+        rundir = os.path.join(self._dir, "run")
+        with self.assertRaises(WDL.runtime.RunFailed):
+            WDL.runtime.run(cfg, doc.workflow, inputs, run_dir=os.path.join(rundir, "."))
+        self.assertTrue(os.path.isfile(os.path.join(rundir, "checkpoint.pickle")))
+        state = WDL.runtime.workflow.load_checkpoint(rundir)
+        finished = {
+            i: os.stat(os.path.join(rundir, f"call-t-{i}", "outputs.json")).st_mtime_ns
+            for i in range(4)
+            if os.path.isfile(os.path.join(rundir, f"call-t-{i}", "outputs.json"))
+        }
+        self.assertIn(0, finished)
+        self.assertNotIn(2, finished)
+
+        with open(flag, "w") as outfile:
+            print("ok", file=outfile)
+        _, outputs = WDL.runtime.run(
+            cfg, state.workflow, state.inputs, run_dir=os.path.join(rundir, "."), _resume=True
+        )
+        self.assertEqual(WDL.values_to_json(outputs)["outs"], [0, 2, 4, 6])
+        self.assertFalse(os.path.exists(os.path.join(rundir, "checkpoint.pickle")))
+        # the failed call was set aside and relaunched, but the finished calls weren't rerun
+        self.assertTrue(os.path.isdir(os.path.join(rundir, "call-t-2.interrupted1")))
+        for i, mtime in finished.items():
+            self.assertEqual(
+                os.stat(os.path.join(rundir, f"call-t-{i}", "outputs.json")).st_mtime_ns, mtime
+            )
+
     def test_retry(self):
         txt = R"""
         version 1.0
@@ -1435,3 +1896,350 @@ class TestWorkflowRunner(unittest.TestCase):
         for wdl in cases:
             with pytest.raises(WDL.Error.StaticTypeMismatch):
                 self._test_workflow(wdl)
+
+
+class TestInputDownloads(unittest.TestCase):
+    class FakeThreadPools:
+        def __init__(self):
+            self.pool = futures.ThreadPoolExecutor(max_workers=8)
+
+        def submit_task(self, *args, **kwargs):
+            return self.pool.submit(*args, **kwargs)
+
+    def test_prioritized_streaming(self):
+        logger = logging.getLogger(self.id())
+        cfg = WDL.runtime.config.Loader(logger, [])
+        cfg.override({"scheduler": {"download_concurrency": 1}})
+        run_dir = tempfile.mkdtemp(prefix="miniwdl_test_input_downloads_")
+        release = threading.Event()
+        started = []
+
+        def fake_download(cfg, logger, cache, uri, **kwargs):
+            started.append(uri)
+            if uri.endswith("big.fastq"):
+                release.wait(10)
+            fn = os.path.join(run_dir, os.path.basename(uri))
+            with open(fn, "w") as outfile:
+                outfile.write(uri)
+            cache.memo_download(uri, fn)
+            return False, fn
+
+        uris = [f"https://example.com/{fn}" for fn in ("big.fastq", "x.txt", "y.txt", "ref.txt")]
+        inputs = WDL.Env.Bindings()
+        # (bound in reverse so that big.fastq is first in the queue)
+        for i, uri in reversed(list(enumerate(uris))):
+            inputs = inputs.bind(f"in{i}", WDL.Value.File(uri))
+        completed = queue.SimpleQueue()
+        with patch("WDL.runtime.workflow.download", fake_download), WDL.runtime.cache.new(
+            cfg, logger
+        ) as cache:
+            downloads = WDL.runtime.workflow._InputDownloads(
+                cfg, logger, ["wdl"], run_dir, inputs, self.FakeThreadPools(), cache, completed.put
+            )
+            self.assertTrue(downloads.busy)
+            # a call needing ref.txt is deferred, and its download jumps the queue
+            call_inputs = WDL.Env.Bindings().bind("ref", WDL.Value.File(uris[3]))
+            awaiting = downloads.pending(call_inputs)
+            self.assertEqual(awaiting, {(uris[3], False)})
+            self.assertEqual(downloads.pending(WDL.Env.Bindings()), set())
+            # workflow expressions can block on a specific download, which starts next (once the
+            # first one finishes, as download_concurrency = 1)
+            threading.Timer(0.5, release.set).start()
+            downloads.wait(uris[3], False)
+            self.assertEqual(downloads.unfinished(awaiting), set())
+            self.assertEqual(cache.get_download(uris[3]), os.path.join(run_dir, "ref.txt"))
+            self.assertEqual(started[:2], [uris[0], uris[3]])
+            while downloads.busy:
+                downloads.finished(completed.get())
+            self.assertEqual(sorted(started), sorted(uris))
+
+    def test_batches(self):
+        logger = logging.getLogger(self.id())
+        cfg = WDL.runtime.config.Loader(logger, [])
+        cfg.override({"scheduler": {"download_concurrency": 1, "download_batch_size": 3}})
+        run_dir = tempfile.mkdtemp(prefix="miniwdl_test_input_downloads_")
+        ops = []
+
+        def fake_download(cfg, logger, cache, uri, directory=False, **kwargs):
+            ops.append([uri])
+            return False, run_dir
+
+        def fake_run_batch(cfg, logger, uris, **kwargs):
+            ops.append(uris)
+            ans = []
+            for uri in uris:
+                ans.append(os.path.join(run_dir, os.path.basename(uri)))
+                with open(ans[-1], "w") as outfile:
+                    outfile.write(uri)
+            return ans
+
+        https = [f"https://example.com/{i}.txt" for i in range(5)]
+        inputs = WDL.Env.Bindings()
+        for i, uri in enumerate(https + ["s3://bucket/key.txt"]):
+            inputs = inputs.bind(f"in{i}", WDL.Value.File(uri))
+        inputs = inputs.bind("dir", WDL.Value.Directory("s3://bucket/dir/"))
+        completed = queue.SimpleQueue()
+        with patch("WDL.runtime.workflow.download", fake_download), patch(
+            "WDL.runtime.download.run_batch", fake_run_batch
+        ), WDL.runtime.cache.new(cfg, logger) as cache:
+            # one of the https URIs is already in the cache
+            cache.memo_download(https[2], os.path.join(run_dir, "cached.txt"))
+            downloads = WDL.runtime.workflow._InputDownloads(
+                cfg, logger, ["wdl"], run_dir, inputs, self.FakeThreadPools(), cache, completed.put
+            )
+            while downloads.busy:
+                downloads.finished(completed.get())
+            # https URIs were downloaded in batches of up to 3 (less the cached one), while the s3
+            # file (lone in its batch key) and directory were downloaded individually
+            self.assertEqual(
+                sorted(sorted(op) for op in ops),
+                [
+                    https[:2],
+                    https[3:],
+                    ["s3://bucket/dir"],
+                    ["s3://bucket/key.txt"],
+                ],
+            )
+            for uri in https:
+                self.assertEqual(
+                    cache.get_download(uri),
+                    os.path.join(
+                        run_dir, "cached.txt" if uri == https[2] else os.path.basename(uri)
+                    ),
+                )
+
+
+class TestHTTPDownload(unittest.TestCase):
+    # local stand-in server for http:// input downloads, supporting byte ranges & ETag
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            server = self.server
+            with server.lock:
+                server.requests.append((self.path, self.headers.get("Range", None)))
+                fail = server.fail.pop(0) if server.fail else False
+            if server.auth and self.headers.get("Authorization", None) != server.auth:
+                self.send_error(401)
+                return
+            location = server.redirects.get(self.path.lstrip("/"), None)
+            if location:
+                self.send_response(302)
+                self.send_header("Location", location)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = server.files.get(self.path.lstrip("/"), None)
+            if body is None:
+                self.send_error(404)
+                return
+            etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+            rng = self.headers.get("Range", None)
+            if_range = self.headers.get("If-Range", None)
+            if rng and (if_range is None or if_range == etag):
+                lo, hi = (int(x) for x in rng[len("bytes=") :].split("-"))
+                if lo >= len(body):
+                    self.send_response(416)
+                    self.send_header("Content-Range", f"bytes */{len(body)}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                hi = min(hi, len(body) - 1)
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {lo}-{hi}/{len(body)}")
+                chunk = body[lo : hi + 1]
+            else:
+                self.send_response(200)
+                chunk = body
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(chunk)))
+            self.end_headers()
+            if fail:
+                # send half the body & drop the connection
+                self.wfile.write(chunk[: len(chunk) // 2])
+                self.close_connection = True
+                return
+            self.wfile.write(chunk)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(http.server.ThreadingHTTPServer):
+        daemon_threads = True
+
+        def __init__(self, *args):
+            super().__init__(*args)
+            self.lock = threading.Lock()
+            self.requests = []
+            self.files = {}
+            self.fail = []
+            self.auth = None
+            self.redirects = {}
+            self.connections = 0
+
+        def get_request(self):
+            self.connections += 1
+            return super().get_request()
+
+    def setUp(self):
+        self.server = self.Server(("127.0.0.1", 0), self.Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        self.logger = logging.getLogger(self.id())
+        self.cfg = WDL.runtime.config.Loader(self.logger, [])
+        self.cfg.override({"download_http": {"segment_mb": 1, "connections": 4, "retries": 0}})
+        self.dir = tempfile.mkdtemp(prefix="miniwdl_test_http_download_")
+        WDL.runtime._http_download._connections.clear()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_small_and_segmented(self):
+        self.server.files["small.bed"] = b"chr1\t0\t100\n"
+        self.server.files["big.bin"] = os.urandom(5 * 1048576 + 123)
+        small = WDL.runtime.download.run(
+            self.cfg, self.logger, self.base + "small.bed", run_dir=os.path.join(self.dir, "1", ".")
+        )
+        self.assertEqual(small, os.path.join(self.dir, "1", "small.bed"))
+        with open(small, "rb") as infile:
+            self.assertEqual(infile.read(), self.server.files["small.bed"])
+        self.assertEqual(len(self.server.requests), 1)
+
+        big = WDL.runtime.download.run(
+            self.cfg, self.logger, self.base + "big.bin", run_dir=os.path.join(self.dir, "2", ".")
+        )
+        with open(big, "rb") as infile:
+            self.assertEqual(infile.read(), self.server.files["big.bin"])
+        # one request for each 1 MiB segment, over at most 4 (pooled) connections
+        ranges = sorted(rng for path, rng in self.server.requests if path == "/big.bin")
+        self.assertEqual(len(ranges), 6)
+        self.assertIn("bytes=5242880-5243002", ranges)
+        self.assertLessEqual(self.server.connections, 4)
+        self.assertEqual(os.listdir(os.path.join(self.dir, "2")), ["big.bin"])
+
+    def test_resume(self):
+        self.server.files["big.bin"] = os.urandom(4 * 1048576)
+        uri = self.base + "big.bin"
+        self.cfg.override({"download_http": {"connections": 1}})
+        # the 3rd request fails partway through
+        self.server.fail = [False, False, True]
+        with self.assertRaises(WDL.runtime.DownloadFailed):
+            WDL.runtime.download.run(self.cfg, self.logger, uri, run_dir=self.dir)
+        self.assertEqual(len(self.server.requests), 3, self.server.requests)
+        # retry resumes with the 3rd segment
+        self.server.requests = []
+        ans = WDL.runtime.download.run(self.cfg, self.logger, uri, run_dir=self.dir)
+        with open(ans, "rb") as infile:
+            self.assertEqual(infile.read(), self.server.files["big.bin"])
+        self.assertEqual(
+            [rng for _path, rng in self.server.requests],
+            ["bytes=2097152-3145727", "bytes=3145728-4194303"],
+        )
+        self.assertEqual(os.listdir(os.path.dirname(ans)), ["big.bin"])
+        # file changed since a partial download: start over
+        self.server.fail = [False, True]
+        with self.assertRaises(WDL.runtime.DownloadFailed):
+            WDL.runtime.download.run(self.cfg, self.logger, uri, run_dir=self.dir)
+        self.server.files["big.bin"] = os.urandom(3 * 1048576)
+        ans = WDL.runtime.download.run(self.cfg, self.logger, uri, run_dir=self.dir)
+        with open(ans, "rb") as infile:
+            self.assertEqual(infile.read(), self.server.files["big.bin"])
+
+    def test_resume_complete(self):
+        # a previous attempt completed all the segments, but not the final rename
+        body = os.urandom(2 * 1048576)
+        self.server.files["big.bin"] = body
+        uri = self.base + "big.bin"
+        self.server.fail = [False, True]
+        with self.assertRaises(WDL.runtime.DownloadFailed):
+            WDL.runtime.download.run(self.cfg, self.logger, uri, run_dir=self.dir)
+        (part,) = glob.glob(os.path.join(self.dir, "*", "big.bin.part"))
+        with open(part, "wb") as outfile:
+            outfile.write(body)
+        with open(part + ".json") as infile:
+            state = json.load(infile)
+        self.assertEqual(state["done"], [[0, 1048576]])
+        state["done"] = [[0, len(body)]]
+        with open(part + ".json", "w") as outfile:
+            json.dump(state, outfile)
+        self.server.requests = []
+        ans = WDL.runtime.download.run(self.cfg, self.logger, uri, run_dir=self.dir)
+        self.assertEqual(ans, os.path.join(os.path.dirname(part), "big.bin"))
+        with open(ans, "rb") as infile:
+            self.assertEqual(infile.read(), body)
+        self.assertEqual(self.server.requests, [])
+        self.assertEqual(os.listdir(os.path.dirname(ans)), ["big.bin"])
+
+    def test_basic_auth(self):
+        self.server.files["secret.txt"] = b"hunter2"
+        self.server.auth = "Basic " + base64.b64encode(b"alice:p@ss word").decode()
+        with self.assertRaises(WDL.runtime.DownloadFailed):
+            WDL.runtime.download.run(
+                self.cfg, self.logger, self.base + "secret.txt", run_dir=self.dir
+            )
+        uri = self.base.replace("http://", "http://alice:p%40ss%20word@") + "secret.txt"
+        ans = WDL.runtime.download.run(self.cfg, self.logger, uri, run_dir=self.dir)
+        with open(ans, "rb") as infile:
+            self.assertEqual(infile.read(), b"hunter2")
+
+    def test_cached_batch(self):
+        self.cfg.override(
+            {
+                "download_cache": {
+                    "put": True,
+                    "get": True,
+                    "dir": os.path.join(self.dir, "cache"),
+                }
+            }
+        )
+        uris = []
+        for i in range(5):
+            self.server.files[f"{i}.txt"] = str(i).encode() * 100
+            uris.append(self.base + f"{i}.txt")
+        with WDL.runtime.cache.new(self.cfg, self.logger) as cache:
+            ans = WDL.runtime.download.run_cached_batch(
+                self.cfg, self.logger, cache, uris, run_dir=os.path.join(self.dir, "run", ".")
+            )
+        for i, (cached, fn) in enumerate(ans):
+            self.assertFalse(cached)
+            self.assertTrue(fn.startswith(os.path.join(self.dir, "cache", "files")))
+            with open(fn, "rb") as infile:
+                self.assertEqual(infile.read(), self.server.files[f"{i}.txt"])
+        with self.assertRaises(WDL.runtime.DownloadFailed):
+            WDL.runtime.download.run(
+                self.cfg, self.logger, self.base + "nope.txt", run_dir=self.dir
+            )
+
+    def test_fallback(self):
+        # with a proxy configured, the container downloader takes over
+        with patch.dict(os.environ, {"http_proxy": "http://127.0.0.1:9"}):
+            gen = WDL.runtime.download.http_downloader(
+                self.cfg, self.logger, self.base + "x.txt", run_dir=self.dir
+            )
+            self.assertIn("aria2c", next(gen)["task_wdl"])
+        self.cfg.override({"download_http": {"in_process": False}})
+        gen = WDL.runtime.download.http_downloader(
+            self.cfg, self.logger, self.base + "x.txt", run_dir=self.dir
+        )
+        self.assertIn("aria2c", next(gen)["task_wdl"])
+        self.assertEqual(self.server.requests, [])
+
+        # in a batch, only the URIs the in-process downloader can't handle fall back
+        self.cfg.override({"download_http": {"in_process": True}})
+        for i in range(4):
+            self.server.files[f"{i}.txt"] = str(i).encode() * 100
+        self.server.redirects["2.txt"] = "ftp://127.0.0.1/2.txt"
+        uris = [self.base + f"{i}.txt" for i in range(4)]
+        gen = WDL.runtime.download.http_batch_downloader(
+            self.cfg, self.logger, uris, run_dir=os.path.join(self.dir, "batch", ".")
+        )
+        task = next(gen)
+        self.assertIn("aria2c", task["task_wdl"])
+        self.assertEqual(task["inputs"]["uris"], [uris[2]])
+        ans = gen.send({"outputs": {"files": ["/aria2c/2.txt"]}})["outputs"]["files"]
+        self.assertEqual(ans[2], "/aria2c/2.txt")
+        for i in (0, 1, 3):
+            with open(ans[i], "rb") as infile:
+                self.assertEqual(infile.read(), self.server.files[f"{i}.txt"])
+        self.assertEqual(len(self.server.requests), 4)
@@ -161,6 +161,41 @@ class TestCallCache(unittest.TestCase):
         unordered_digest = digest_inputs(unordered_inputs)
         self.assertEqual(ordered_digest, unordered_digest)
 
+    def test_value_digests(self):
+        files = WDL.Value.Array(
+            WDL.Type.File(), [WDL.Value.File(f"/tmp/{i}.txt") for i in range(1000)]
+        )
+        digest = files.digest
+        self.assertEqual(len(digest), 32)
+        # remembered on the value object, and reused by compound values containing it
+        with patch.object(WDL.Value.File, "_digest_parts") as parts:
+            self.assertEqual(files.digest, digest)
+            pair = WDL.Value.Pair(files.type, WDL.Type.Int(), (files, WDL.Value.Int(1)))
+            digest_inputs(WDL.Env.Bindings().bind("a", pair).bind("b", files))
+            parts.assert_not_called()
+        # equal values from separate objects have equal digests
+        files2 = WDL.Value.from_json(files.type, files.json)
+        self.assertIsNot(files2.value[0], files.value[0])
+        self.assertEqual(files2.digest, digest)
+        # but a File isn't confused with a String of the same text
+        self.assertNotEqual(
+            WDL.Value.String("/tmp/0.txt").digest, WDL.Value.File("/tmp/0.txt").digest
+        )
+        self.assertNotEqual(WDL.Value.Int(1).digest, WDL.Value.Float(1.0).digest)
+        # nested values are delimited
+        self.assertNotEqual(
+            WDL.Value.from_json(
+                WDL.Type.Array(WDL.Type.Array(WDL.Type.String())), [["a", "b"]]
+            ).digest,
+            WDL.Value.from_json(
+                WDL.Type.Array(WDL.Type.Array(WDL.Type.String())), [["a"], ["b"]]
+            ).digest,
+        )
+        # rewrite_paths copies don't carry over the remembered digest
+        rewritten = WDL.Value.rewrite_paths(files, lambda fd: fd.value + ".gz")
+        self.assertNotEqual(rewritten.digest, digest)
+        self.assertEqual(files.digest, digest)
+
     def test_normalization(self):
         desc = self.doc.tasks[0]._digest_source()
         self.assertEqual(
@@ -194,7 +229,7 @@ Int count = 12
             os.path.join(self.cache_dir, f"{self.doc.tasks[0].name}/{task_digest}/{digest}.json")
         ) as f:
             read_data = json.loads(f.read())
-        self.assertEqual(read_data["miniwdlCallCacheVersion"], 2)
+        self.assertEqual(read_data["miniwdlCallCacheVersion"], 3)
         self.assertEqual(read_data["inputs"], WDL.values_to_json(inputs))
         self.assertEqual(read_data["outputs"], WDL.values_to_json(outputs))
         self.assertEqual(read_data["additionalPaths"], [])
@@ -294,6 +329,11 @@ Int count = 12
 
         time.sleep(0.1)
         os.utime(nested_file)
+        # the directory fingerprint is memoized for the run (CallCache instance)
+        self.assertEqual(
+            WDL.values_to_json(cache.get(key1, inputs, output_types)), WDL.values_to_json(outputs)
+        )
+        cache = CallCache(cfg=self.cfg, logger=self.logger)
         self.assertIsNone(cache.get(key1, inputs, output_types))
 
         key2 = "direct/absent/" + digest_inputs(inputs)
@@ -318,6 +358,318 @@ Int count = 12
         cache.put(key4, outputs, inputs=inputs, add_paths=CallCacheAddPaths([present_dir]))
         self.assertIsNone(cache.get(key4, inputs, output_types))
 
+    def test_sqlite_backend(self):
+        from WDL.runtime.cache_sqlite import SQLiteCallCache, migrate_dir, DB_FILENAME
+
+        inputs = WDL.Env.Bindings()
+        outputs = WDL.Env.Bindings().bind("out", WDL.Value.String("ok"))
+        output_types = WDL.Env.Bindings().bind("out", WDL.Value.String("").type)
+        present_file = os.path.join(self._dir, "present.txt")
+        with open(present_file, "w") as outfile:
+            outfile.write("present\n")
+        old_mtime = time.time() - 10
+        os.utime(present_file, (old_mtime, old_mtime))
+
+        # entries stored by the default backend, migrated into the database
+        key1 = "migrated/digest/" + digest_inputs(inputs)
+        with CallCache(cfg=self.cfg, logger=self.logger) as cache:
+            cache.put(key1, outputs, inputs=inputs, add_paths=CallCacheAddPaths())
+            cache.put_task_runtime("migrated", "digest", 42.0)
+        self.assertEqual(migrate_dir(self.cfg, self.logger, remove=True), 1)
+        self.assertEqual(migrate_dir(self.cfg, self.logger), 0)
+        self.assertEqual(glob.glob(os.path.join(self.cache_dir, "migrated", "*", "*.json")), [])
+
+        with SQLiteCallCache(cfg=self.cfg, logger=self.logger) as cache:
+            self.assertEqual(
+                WDL.values_to_json(cache.get(key1, inputs, output_types)),
+                WDL.values_to_json(outputs),
+            )
+            self.assertEqual(cache.task_runtime("migrated", "digest"), 42.0)
+
+            key2 = "direct/digest/" + digest_inputs(inputs)
+            self.assertIsNone(cache.get(key2, inputs, output_types))
+            cache.put(key2, outputs, inputs=inputs, add_paths=CallCacheAddPaths([present_file]))
+            self.assertEqual(
+                WDL.values_to_json(cache.get(key2, inputs, output_types)),
+                WDL.values_to_json(outputs),
+            )
+            self.assertEqual(cache.get_add_paths(key2).add_paths, {present_file})
+
+            time.sleep(0.1)
+            os.utime(present_file)
+
+        # invalidated entry is deleted
+        with SQLiteCallCache(cfg=self.cfg, logger=self.logger) as cache:
+            self.assertIsNone(cache.get(key2, inputs, output_types))
+
+        import sqlite3
+
+        db = sqlite3.connect(os.path.join(self.cache_dir, DB_FILENAME))
+        try:
+            rows = db.execute("SELECT key, created_ns, accessed_ns FROM entries").fetchall()
+        finally:
+            db.close()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0][0], key1)
+        self.assertGreater(rows[0][2], rows[0][1])
+
+    def test_sqlite_network_filesystem(self):
+        import sqlite3
+        from WDL.runtime.cache_sqlite import sqlite_journal
+
+        # parse mount table, taking the longest mount point containing the path
+        mounts = os.path.join(self._dir, "mounts")
+        with open(mounts, "w") as outfile:
+            print("/dev/sda1 / ext4 rw 0 0", file=outfile)
+            print(r"server:/export /mnt/my\040share nfs4 rw 0 0", file=outfile)
+            print(r"tmpfs /mnt/my\040share/tmp tmpfs rw 0 0", file=outfile)
+        self.assertEqual(WDL._util.network_filesystem("/mnt/my share/x", mounts), "nfs4")
+        self.assertIsNone(WDL._util.network_filesystem("/mnt/my share/tmp/x", mounts))
+        self.assertIsNone(WDL._util.network_filesystem("/mnt/other", mounts))
+
+        # rollback journal on a network filesystem, WAL otherwise
+        for fstype, journal_mode in (("nfs", "delete"), (None, "wal")):
+            db_filename = os.path.join(self._dir, f"{journal_mode}.sqlite3")
+            db = sqlite3.connect(db_filename)
+            try:
+                with patch("WDL.runtime.cache_sqlite.network_filesystem", return_value=fstype):
+                    sqlite_journal(db, db_filename)
+                self.assertEqual(db.execute("PRAGMA journal_mode").fetchone()[0], journal_mode)
+            finally:
+                db.close()
+
+    def test_coherence_fingerprints(self):
+        from WDL.runtime.cache import _PathFingerprints
+
+        ref_dir = os.path.join(self._dir, "ref")
+        for i in range(100):
+            os.makedirs(os.path.join(ref_dir, str(i % 7)), exist_ok=True)
+            with open(os.path.join(ref_dir, str(i % 7), f"{i}.txt"), "w") as outfile:
+                outfile.write(f"{i}\n")
+        newest = os.path.join(ref_dir, "3", "52.txt")
+        os.utime(newest, ns=(0, time.time_ns() + 10**9))
+        single = os.path.join(ref_dir, "0", "0.txt")
+
+        fingerprints = _PathFingerprints(4)
+        walks = MagicMock(side_effect=WDL.runtime.cache._iter_directory_contents)
+        try:
+            with patch("WDL.runtime.cache._iter_directory_contents", walks):
+                ans = fingerprints.get_all(
+                    [(ref_dir, True), (single, False), (ref_dir + "/nonexistent", False)] * 8
+                )
+            self.assertEqual(walks.call_count, 1)
+            self.assertEqual(ans[0][0], os.stat(newest).st_mtime_ns)
+            self.assertTrue(stat.S_ISDIR(ans[0][1]))
+            self.assertEqual(ans[1], (os.stat(single).st_mtime_ns, os.stat(single).st_mode))
+            self.assertIsNone(ans[2])
+            self.assertIsNone(fingerprints.get(single, True))
+        finally:
+            fingerprints.shutdown()
+
+    def test_content_digest_keys(self):
+        cfg = WDL.runtime.config.Loader(self.logger, [])
+        cfg.override(
+            {
+                "call_cache": {
+                    "put": True,
+                    "get": True,
+                    "dir": self.cache_dir,
+                    "content_digest": True,
+                }
+            }
+        )
+        old_ns = time.time_ns() - 10**10
+        for subdir in ("a", "b", "c"):
+            os.makedirs(os.path.join(self._dir, subdir, "ref", "sub"))
+            for fn, content in (("x.txt", "x\n"), ("ref/y.txt", "y\n"), ("ref/sub/z", "z\n")):
+                with open(os.path.join(self._dir, subdir, fn), "w") as outfile:
+                    outfile.write(content if subdir != "c" or fn != "ref/sub/z" else "zz\n")
+                os.utime(os.path.join(self._dir, subdir, fn), ns=(old_ns, old_ns))
+
+        def inputs(subdir):
+            return WDL.Env.Bindings(
+                WDL.Env.Binding("x", WDL.Value.File(os.path.join(self._dir, subdir, "x.txt")))
+            ).bind("ref", WDL.Value.Directory(os.path.join(self._dir, subdir, "ref")))
+
+        with CallCache(cfg=cfg, logger=self.logger) as cache:
+            key_a = cache.call_key("t", "digest", inputs("a"))
+            self.assertEqual(cache.call_key("t", "digest", inputs("b")), key_a)
+            self.assertNotEqual(cache.call_key("t", "digest", inputs("c")), key_a)
+            self.assertNotEqual(WDL.runtime.cache.call_cache_key("t", "digest", inputs("a")), key_a)
+
+        # symlinked subdirectories are digested by their contents (with cycles cut off)
+        for subdir in ("t1", "t2"):
+            os.makedirs(os.path.join(self._dir, subdir))
+            with open(os.path.join(self._dir, subdir, "w.txt"), "w") as outfile:
+                outfile.write(subdir)
+            os.symlink(os.path.join(self._dir, subdir), os.path.join(self._dir, subdir, "loop"))
+        for subdir, target in (("d1", "t1"), ("d2", "t2"), ("d3", "t1")):
+            os.makedirs(os.path.join(self._dir, subdir))
+            os.symlink(os.path.join(self._dir, target), os.path.join(self._dir, subdir, "sub"))
+
+        def dir_inputs(subdir):
+            return WDL.Env.Bindings().bind(
+                "dir", WDL.Value.Directory(os.path.join(self._dir, subdir))
+            )
+
+        with CallCache(cfg=cfg, logger=self.logger) as cache:
+            key_d1 = cache.call_key("t", "digest", dir_inputs("d1"))
+            self.assertNotEqual(cache.call_key("t", "digest", dir_inputs("d2")), key_d1)
+            self.assertEqual(cache.call_key("t", "digest", dir_inputs("d3")), key_d1)
+
+        # digests of unmodified files are remembered persistently
+        hasher = MagicMock(side_effect=WDL.runtime._file_digest.sha256_file)
+        with patch("WDL.runtime._file_digest.sha256_file", hasher):
+            with CallCache(cfg=cfg, logger=self.logger) as cache:
+                self.assertEqual(cache.call_key("t", "digest", inputs("b")), key_a)
+                self.assertEqual(hasher.call_count, 0)
+                with open(os.path.join(self._dir, "b", "ref", "y.txt"), "w") as outfile:
+                    outfile.write("y\n")
+            with CallCache(cfg=cfg, logger=self.logger) as cache:
+                self.assertEqual(cache.call_key("t", "digest", inputs("b")), key_a)
+                self.assertEqual(hasher.call_count, 1)
+
+        # failure to hash an input makes the call uncacheable, rather than failing it
+        outputs = WDL.Env.Bindings().bind("out", WDL.Value.String("ok"))
+        output_types = WDL.Env.Bindings().bind("out", WDL.Type.String())
+        with CallCache(cfg=cfg, logger=self.logger) as cache:
+            cache.put(key_a, outputs, inputs=inputs("a"), add_paths=CallCacheAddPaths())
+            with open(os.path.join(self._dir, "a", "x.txt"), "w") as outfile:
+                outfile.write("x2\n")
+            with patch(
+                "WDL.runtime._file_digest.sha256_file",
+                side_effect=PermissionError(13, "Permission denied"),
+            ):
+                key = cache.call_key("t", "digest", inputs("a"))
+            self.assertIsNone(cache.get(key, inputs("a"), output_types))
+            cache.put(key, outputs, inputs=inputs("a"), add_paths=CallCacheAddPaths())
+            self.assertFalse(os.path.exists(os.path.join(self.cache_dir, key + ".json")))
+
+    def test_gc(self):
+        from WDL.runtime import cache_gc
+
+        cfg = WDL.runtime.config.Loader(self.logger, [])
+        cfg.override(
+            {
+                "call_cache": {"put": True, "get": True, "dir": self.cache_dir},
+                "download_cache": {"put": True, "dir": os.path.join(self._dir, "downloads")},
+            }
+        )
+        mib = b"\xff" * (1 << 20)
+        now_ns = time.time_ns()
+
+        # call cache entries A, B, C whose outputs are symlinks out/x -> work/x; and D, a
+        # "workflow" containing C, whose output links to C's
+        def entry(name, run_dir, target=None, age=0):
+            os.makedirs(os.path.join(run_dir, "out"))
+            if not target:
+                os.makedirs(os.path.join(run_dir, "work"))
+                target = os.path.join(run_dir, "work", "x")
+                with open(target, "wb") as outfile:
+                    outfile.write(mib)
+            os.symlink(target, os.path.join(run_dir, "out", "x"))
+            with open(os.path.join(run_dir, "outputs.json"), "w") as outfile:
+                outfile.write("{}")
+            key = f"{name}/digest/" + digest_inputs(WDL.Env.Bindings())
+            cache.put(
+                key,
+                WDL.Env.Bindings().bind("x", WDL.Value.File(os.path.join(run_dir, "out", "x"))),
+                run_dir=run_dir,
+                inputs=WDL.Env.Bindings(),
+                add_paths=CallCacheAddPaths(),
+            )
+            entry_file = os.path.join(self.cache_dir, key + ".json")
+            os.utime(entry_file, ns=(now_ns - age, os.stat(entry_file).st_mtime_ns))
+            return target
+
+        with CallCache(cfg=cfg, logger=self.logger) as cache:
+            a = entry("A", os.path.join(self._dir, "A"), age=4 * 10**9)
+            b = entry("B", os.path.join(self._dir, "B"), age=2 * 10**9)
+            c = entry("C", os.path.join(self._dir, "D", "C"), age=3 * 10**9)
+            entry("D", os.path.join(self._dir, "D"), target=c, age=1 * 10**9)
+
+        with WDL._util.FlockHolder(self.logger) as flocks:
+            # A is in use
+            flocks.flock(os.path.join(self._dir, "A", "outputs.json"))
+            ans = cache_gc.gc(cfg, self.logger, call_max_bytes=(5 << 20) // 2)
+        self.assertEqual(ans["call_cache"]["in_use"], 1)
+        self.assertEqual(ans["call_cache"]["evicted"], 2)
+        self.assertGreaterEqual(ans["call_cache"]["used_bytes"], 3 << 20)
+        self.assertGreaterEqual(ans["call_cache"]["reclaimed_bytes"], 1 << 20)
+        self.assertTrue(os.path.isfile(a))
+        self.assertFalse(os.path.exists(b))
+        self.assertTrue(os.path.isfile(c))  # still referenced by D
+        self.assertFalse(os.path.lexists(os.path.join(self._dir, "D", "C", "out", "x")))
+        self.assertEqual(
+            sorted(fn.split("/")[-3] for fn in glob.glob(self.cache_dir + "/*/*/*.json")),
+            ["A", "D"],
+        )
+
+        # download cache: evict least-recently-used items not in use
+        with CallCache(cfg=cfg, logger=self.logger) as cache:
+            for i, fn in enumerate(["a", "b", "c"]):
+                downloaded = os.path.join(self._dir, fn)
+                with open(downloaded, "wb") as outfile:
+                    outfile.write(mib)
+                path = cache.put_download(f"https://example.com/data/{fn}", downloaded)
+                os.utime(path, ns=(now_ns - (3 - i) * 10**9, now_ns))
+            downloaded = os.path.join(self._dir, "d")
+            os.makedirs(downloaded)
+            with open(os.path.join(downloaded, "y"), "wb") as outfile:
+                outfile.write(mib)
+            d = cache.put_download("https://example.com/data/d", downloaded, directory=True)
+            os.utime(d, ns=(now_ns - 10 * 10**9, now_ns))
+        with WDL._util.FlockHolder(self.logger) as flocks:
+            # a is in use
+            flocks.flock(cache.download_path("https://example.com/data/a"))
+            ans = cache_gc.gc(cfg, self.logger, download_max_bytes=(5 << 20) // 2)
+        self.assertEqual(ans["download_cache"]["in_use"], 1)
+        self.assertEqual(ans["download_cache"]["evicted"], 2)
+        self.assertFalse(os.path.exists(d))
+        self.assertEqual(
+            sorted(os.listdir(os.path.dirname(cache.download_path("https://example.com/data/a")))),
+            ["a", "c"],
+        )
+
+    def test_gc_entry_use(self):
+        cfg = WDL.runtime.config.Loader(self.logger, [])
+        cfg.override({"call_cache": {"put": True, "get": True, "dir": self.cache_dir}})
+        outputs = WDL.Env.Bindings().bind("out", WDL.Value.String("ok"))
+        output_types = WDL.Env.Bindings().bind("out", WDL.Type.String())
+        key = "t/digest/" + digest_inputs(WDL.Env.Bindings())
+        entry_file = os.path.join(self.cache_dir, key + ".json")
+        with CallCache(cfg=cfg, logger=self.logger) as cache:
+            cache.put(key, outputs, inputs=WDL.Env.Bindings(), add_paths=CallCacheAddPaths())
+            mtime_ns = os.stat(entry_file).st_mtime_ns
+
+            # reading an entry (as gc does) leaves its last-use time alone, even where the kernel
+            # would update the atime (with relatime, if older than the mtime); with O_NOATIME, or
+            # without (restoring the atime)
+            for noatime in (True, False):
+                os.utime(entry_file, ns=(mtime_ns - 10**10, mtime_ns))
+                saved = getattr(os, "O_NOATIME", None)
+                if not noatime and saved is not None:
+                    del os.O_NOATIME
+                try:
+                    self.assertIsNotNone(cache._read_entry(key))
+                finally:
+                    if saved is not None:
+                        os.O_NOATIME = saved
+                self.assertEqual(os.stat(entry_file).st_atime_ns, mtime_ns - 10**10)
+            # while a hit bumps it
+            self.assertIsNotNone(cache.get(key, WDL.Env.Bindings(), output_types))
+            self.assertGreater(os.stat(entry_file).st_atime_ns, mtime_ns - 10**10)
+
+            # eviction between reading the entry & flocking its outputs is a miss
+            use_entry = cache._use_entry
+
+            def evicted_meanwhile(key, run_dir):
+                os.unlink(entry_file)
+                use_entry(key, run_dir)
+
+            with patch.object(cache, "_use_entry", side_effect=evicted_meanwhile):
+                self.assertIsNone(cache.get(key, WDL.Env.Bindings(), output_types))
+
     def test_directory_download_cache_normalizes_trailing_slash(self):
         cfg = WDL.runtime.config.Loader(self.logger, [])
         cfg.override(